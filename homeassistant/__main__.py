@@ -106,6 +106,10 @@ def get_arguments() -> argparse.Namespace:
         '--skip-pip',
         action='store_true',
         help='Skips pip install of required packages on startup')
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Save a report of the startup time spent per component')
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -259,13 +263,14 @@ def setup_and_run_hass(config_dir: str,
         hass = bootstrap.from_config_dict(
             config, config_dir=config_dir, verbose=args.verbose,
             skip_pip=args.skip_pip, log_rotate_days=args.log_rotate_days,
-            log_file=args.log_file)
+            log_file=args.log_file, profile_startup=args.profile_startup)
     else:
         config_file = ensure_config_file(config_dir)
         print('Config directory:', config_dir)
         hass = bootstrap.from_config_file(
             config_file, verbose=args.verbose, skip_pip=args.skip_pip,
-            log_rotate_days=args.log_rotate_days, log_file=args.log_file)
+            log_rotate_days=args.log_rotate_days, log_file=args.log_file,
+            profile_startup=args.profile_startup)
 
     if hass is None:
         return None
@@ -12,7 +12,6 @@ from aiohttp import web
 import async_timeout
 
 import homeassistant.core as ha
-import homeassistant.remote as rem
 from homeassistant.bootstrap import DATA_LOGGING
 from homeassistant.const import (
     EVENT_HOMEASSISTANT_STOP, EVENT_TIME_CHANGED,
@@ -103,7 +102,7 @@ class APIEventStream(HomeAssistantView):
             if event.event_type == EVENT_HOMEASSISTANT_STOP:
                 data = stop_obj
             else:
-                data = json.dumps(event, cls=rem.JSONEncoder)
+                data = event.as_json()
 
             yield from to_write.put(data)
 
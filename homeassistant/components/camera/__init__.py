@@ -51,6 +51,9 @@ DEFAULT_CONTENT_TYPE = 'image/jpeg'
 ENTITY_IMAGE_URL = '/api/camera_proxy/{0}?token={1}'
 
 TOKEN_CHANGE_INTERVAL = timedelta(minutes=5)
+
+# Seconds between two images fetched for MJPEG streams
+STREAM_INTERVAL = .5
 _RND = SystemRandom()
 
 CAMERA_SERVICE_SCHEMA = vol.Schema({
@@ -209,6 +212,7 @@ class Camera(Entity):
         self.is_streaming = False
         self.content_type = DEFAULT_CONTENT_TYPE
         self.access_tokens = collections.deque([], 2)
+        self.stream_hub = StreamHub(self)
         self.async_update_token()
 
     @property
@@ -250,12 +254,16 @@ class Camera(Entity):
 
         This method must be run in the event loop and returns a coroutine.
         """
-        return self.hass.async_add_job(self.camera_image)
+        return self.hass.async_add_executor_job(
+            self.camera_image, pool=self.executor_pool)
 
     @asyncio.coroutine
     def handle_async_mjpeg_stream(self, request):
         """Generate an HTTP MJPEG stream from camera images.
 
+        The frames are fetched by the stream hub of the camera, which is
+        shared by all clients streaming this camera.
+
         This method must be run in the event loop.
         """
         response = web.StreamResponse()
@@ -264,40 +272,31 @@ class Camera(Entity):
                                  'boundary=--frameboundary')
         yield from response.prepare(request)
 
-        async def write(img_bytes):
-            """Write image to stream."""
-            await response.write(bytes(
-                '--frameboundary\r\n'
-                'Content-Type: {}\r\n'
-                'Content-Length: {}\r\n\r\n'.format(
-                    self.content_type, len(img_bytes)),
-                'utf-8') + img_bytes + b'\r\n')
-
-        last_image = None
+        client = self.stream_hub.async_add_client()
+        first_frame = True
 
         try:
             while True:
-                img_bytes = yield from self.async_camera_image()
-                if not img_bytes:
+                frame = yield from client.async_get_frame()
+                if frame is None:
                     break
 
-                if img_bytes and img_bytes != last_image:
-                    yield from write(img_bytes)
+                yield from response.write(frame)
 
-                    # Chrome seems to always ignore first picture,
-                    # print it twice.
-                    if last_image is None:
-                        yield from write(img_bytes)
-
-                    last_image = img_bytes
-
-                yield from asyncio.sleep(.5)
+                # Chrome seems to always ignore first picture,
+                # print it twice.
+                if first_frame:
+                    yield from response.write(frame)
+                    first_frame = False
 
         except asyncio.CancelledError:
             _LOGGER.debug("Stream closed by frontend.")
             response = None
 
         finally:
+            self.stream_hub.async_remove_client(client)
+            _LOGGER.debug("Stream client of %s sent %d frames, dropped %d",
+                          self.entity_id, client.sent, client.dropped)
             if response is not None:
                 yield from response.write_eof()
 
@@ -352,6 +351,136 @@ class Camera(Entity):
                 _RND.getrandbits(256).to_bytes(32, 'little')).hexdigest())
 
 
+class StreamClient(object):
+    """Latest frame not yet sent to an MJPEG client.
+
+    A frame that replaces one that was not sent yet is counted as
+    dropped, so a slow client skips frames instead of queueing them.
+    """
+
+    __slots__ = ['frame', 'closed', 'sent', 'dropped', '_ready']
+
+    def __init__(self, loop):
+        """Initialize the client."""
+        self.frame = None
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self._ready = asyncio.Event(loop=loop)
+
+    @callback
+    def async_put_frame(self, frame):
+        """Set the next frame to send."""
+        if self.frame is not None:
+            self.dropped += 1
+        self.frame = frame
+        self._ready.set()
+
+    @callback
+    def async_close(self):
+        """End the stream once the pending frame is sent."""
+        self.closed = True
+        self._ready.set()
+
+    @asyncio.coroutine
+    def async_get_frame(self):
+        """Wait for the next frame, None if the stream has ended."""
+        while self.frame is None:
+            if self.closed:
+                return None
+            self._ready.clear()
+            yield from self._ready.wait()
+
+        frame = self.frame
+        self.frame = None
+        self.sent += 1
+        return frame
+
+
+class StreamHub(object):
+    """Fetch the frames of a camera once for all its MJPEG clients.
+
+    Images are fetched while there are clients. A changed image is
+    framed as a multipart part once and handed to every client.
+    """
+
+    def __init__(self, camera):
+        """Initialize the hub."""
+        self.camera = camera
+        self.clients = set()
+        self.frame = None
+        self._task = None
+
+    @callback
+    def async_add_client(self):
+        """Add a client and start fetching frames if needed."""
+        client = StreamClient(self.camera.hass.loop)
+        self.clients.add(client)
+
+        if self.frame is not None:
+            client.async_put_frame(self.frame)
+
+        # Not tracked, the task runs as long as there are clients
+        if self._task is None:
+            self._task = self.camera.hass.loop.create_task(
+                self._async_fetch())
+
+        return client
+
+    @callback
+    def async_remove_client(self, client):
+        """Remove a client and stop fetching frames if it was the last."""
+        self.clients.discard(client)
+
+        if not self.clients and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.frame = None
+
+    @asyncio.coroutine
+    def _async_fetch(self):
+        """Fetch images until the last client is gone."""
+        last_image = None
+
+        try:
+            while True:
+                img_bytes = yield from self.camera.async_camera_image()
+                if not img_bytes:
+                    break
+
+                if img_bytes != last_image:
+                    last_image = img_bytes
+                    self.frame = bytes(
+                        '--frameboundary\r\n'
+                        'Content-Type: {}\r\n'
+                        'Content-Length: {}\r\n\r\n'.format(
+                            self.camera.content_type, len(img_bytes)),
+                        'utf-8') + img_bytes + b'\r\n'
+
+                    for client in self.clients:
+                        client.async_put_frame(self.frame)
+
+                yield from asyncio.sleep(
+                    STREAM_INTERVAL, loop=self.camera.hass.loop)
+
+        except asyncio.CancelledError:
+            pass
+
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error fetching image of %s",
+                              self.camera.entity_id)
+
+        finally:
+            # Unless cancelled because the last client is gone
+            if self._task is asyncio.Task.current_task(
+                    loop=self.camera.hass.loop):
+                self._task = None
+                self.frame = None
+                for client in self.clients:
+                    client.async_close()
+                self.clients.clear()
+
+
 class CameraView(HomeAssistantView):
     """Base CameraView."""
 
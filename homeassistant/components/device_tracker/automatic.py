@@ -212,7 +212,7 @@ class AutomaticData(object):
             lambda name, event: self.hass.async_add_job(
                 self.handle_event(name, event)))
 
-        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self.ws_close())
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self.ws_close)
 
     @asyncio.coroutine
     def handle_event(self, name, event):
@@ -299,7 +299,7 @@ class AutomaticData(object):
             self.hass.loop.create_task(self.ws_connect())
 
     @asyncio.coroutine
-    def ws_close(self):
+    def ws_close(self, event):
         """Close the websocket connection."""
         self.ws_close_requested = True
         if self.ws_reconnect_handle is not None:
@@ -14,6 +14,7 @@ from homeassistant.const import (
 )
 from homeassistant.components.http import REQUIREMENTS  # NOQA
 from homeassistant.components.http import HomeAssistantHTTP
+from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.deprecation import get_deprecated
 import homeassistant.helpers.config_validation as cv
@@ -28,6 +29,7 @@ DOMAIN = 'emulated_hue'
 _LOGGER = logging.getLogger(__name__)
 
 NUMBERS_FILE = 'emulated_hue_ids.json'
+SAVE_DELAY = 10
 
 CONF_HOST_IP = 'host_ip'
 CONF_LISTEN_PORT = 'listen_port'
@@ -84,6 +86,9 @@ ATTR_EMULATED_HUE_HIDDEN = 'emulated_hue_hidden'
 def setup(hass, yaml_config):
     """Activate the emulated_hue component."""
     config = Config(hass, yaml_config.get(DOMAIN, {}))
+    if config.type != TYPE_ALEXA:
+        # Load the numbers now instead of on the event loop
+        config.load_numbers()
 
     server = HomeAssistantHTTP(
         hass,
@@ -114,6 +119,7 @@ def setup(hass, yaml_config):
         """Stop the emulated hue bridge."""
         upnp_listener.stop()
         await server.stop()
+        await config.async_save_numbers()
 
     async def start_emulated_hue_bridge(event):
         """Start the emulated hue bridge."""
@@ -136,6 +142,9 @@ class Config(object):
         self.type = conf.get(CONF_TYPE)
         self.numbers = None
         self.cached_states = {}
+        self._entity_numbers = None
+        self._next_number = None
+        self._sched_save = None
 
         if self.type == TYPE_ALEXA:
             _LOGGER.warning(
@@ -199,18 +208,18 @@ class Config(object):
             return entity_id
 
         if self.numbers is None:
-            self.numbers = _load_json(self.hass.config.path(NUMBERS_FILE))
+            self.load_numbers()
 
         # Google Home
-        for number, ent_id in self.numbers.items():
-            if entity_id == ent_id:
-                return number
+        number = self._entity_numbers.get(entity_id)
+        if number is not None:
+            return number
 
-        number = '1'
-        if self.numbers:
-            number = str(max(int(k) for k in self.numbers) + 1)
+        number = str(self._next_number)
+        self._next_number += 1
         self.numbers[number] = entity_id
-        save_json(self.hass.config.path(NUMBERS_FILE), self.numbers)
+        self._entity_numbers[entity_id] = number
+        self._async_schedule_save()
         return number
 
     def number_to_entity_id(self, number):
@@ -219,12 +228,40 @@ class Config(object):
             return number
 
         if self.numbers is None:
-            self.numbers = _load_json(self.hass.config.path(NUMBERS_FILE))
+            self.load_numbers()
 
         # Google Home
         assert isinstance(number, str)
         return self.numbers.get(number)
 
+    def load_numbers(self):
+        """Load the numbers file and index it by entity id."""
+        self.numbers = _load_json(self.hass.config.path(NUMBERS_FILE))
+        self._entity_numbers = {
+            entity_id: number for number, entity_id in self.numbers.items()}
+        self._next_number = max(
+            (int(number) for number in self.numbers), default=0) + 1
+
+    @callback
+    def _async_schedule_save(self):
+        """Schedule saving the numbers file."""
+        if self._sched_save is not None:
+            self._sched_save.cancel()
+
+        self._sched_save = self.hass.loop.call_later(
+            SAVE_DELAY, self.hass.async_add_job, self.async_save_numbers
+        )
+
+    async def async_save_numbers(self):
+        """Save the numbers file if a save is scheduled."""
+        if self._sched_save is None:
+            return
+
+        self._sched_save.cancel()
+        self._sched_save = None
+        await self.hass.async_add_job(
+            save_json, self.hass.config.path(NUMBERS_FILE), dict(self.numbers))
+
     def get_entity_name(self, entity):
         """Get the name of an entity."""
         if entity.entity_id in self.entities and \
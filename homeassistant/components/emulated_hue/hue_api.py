@@ -1,5 +1,6 @@
 """Provides a Hue API to control Home Assistant."""
 import asyncio
+import json
 import logging
 
 from aiohttp import web
@@ -9,6 +10,7 @@ from homeassistant.const import (
     ATTR_ENTITY_ID, SERVICE_TURN_OFF, SERVICE_TURN_ON, SERVICE_VOLUME_SET,
     SERVICE_OPEN_COVER, SERVICE_CLOSE_COVER, STATE_ON, STATE_OFF,
     HTTP_BAD_REQUEST, HTTP_NOT_FOUND, ATTR_SUPPORTED_FEATURES,
+    CONTENT_TYPE_JSON,
 )
 from homeassistant.components.light import (
     ATTR_BRIGHTNESS, SUPPORT_BRIGHTNESS
@@ -21,6 +23,7 @@ from homeassistant.components.fan import (
     SPEED_MEDIUM, SPEED_HIGH
 )
 from homeassistant.components.http import HomeAssistantView
+from homeassistant.remote import JSONEncoder
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -61,22 +64,59 @@ class HueAllLightsStateView(HomeAssistantView):
     def __init__(self, config):
         """Initialize the instance of the view."""
         self.config = config
+        # entity_id -> (state, cached state, number, JSON) of the last
+        # response. Number and JSON are None if the entity is not exposed.
+        self._lights = {}
+        self._body = None
 
     @core.callback
     def get(self, request, username):
-        """Process a request to get the list of available lights."""
+        """Process a request to get the list of available lights.
+
+        Only entities whose state changed since the last request are
+        converted and encoded again.
+        """
         hass = request.app['hass']
-        json_response = {}
+        lights = {}
+        changed = False
 
         for entity in hass.states.async_all():
-            if self.config.is_entity_exposed(entity):
-                state, brightness = get_entity_state(self.config, entity)
-
-                number = self.config.entity_id_to_number(entity.entity_id)
-                json_response[number] = entity_to_json(
-                    self.config, entity, state, brightness)
+            entity_id = entity.entity_id
+            cached_state = self.config.cached_states.get(entity_id)
+            light = self._lights.get(entity_id)
+
+            if (light is None or light[0] is not entity or
+                    light[1] != cached_state):
+                light = (entity, cached_state) + self._encode(entity)
+                changed = True
+
+            lights[entity_id] = light
+
+        if changed or self._body is None or len(lights) != len(self._lights):
+            encoded = sorted(
+                (number, light_json)
+                for _, _, number, light_json in lights.values()
+                if number is not None)
+            self._body = '{{{}}}'.format(', '.join(
+                '{}: {}'.format(json.dumps(number), light_json)
+                for number, light_json in encoded)).encode('UTF-8')
+        self._lights = lights
+
+        response = web.Response(
+            body=self._body, content_type=CONTENT_TYPE_JSON)
+        response.enable_compression()
+        return response
+
+    def _encode(self, entity):
+        """Return the number and encoded JSON of an entity if exposed."""
+        if not self.config.is_entity_exposed(entity):
+            return None, None
 
-        return self.json(json_response)
+        state, brightness = get_entity_state(self.config, entity)
+        number = self.config.entity_id_to_number(entity.entity_id)
+        return number, json.dumps(
+            entity_to_json(self.config, entity, state, brightness),
+            sort_keys=True, cls=JSONEncoder)
 
 
 class HueOneLightStateView(HomeAssistantView):
@@ -21,3 +21,7 @@ class Config:
         self.should_expose = should_expose
         self.agent_user_id = agent_user_id
         self.entity_config = entity_config or {}
+        # entity_id -> (state, payload) as last serialized for SYNC and
+        # QUERY. A payload is reused as long as the state object is the same.
+        self.sync_cache = {}
+        self.query_cache = {}
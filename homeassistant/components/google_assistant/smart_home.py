@@ -224,18 +224,29 @@ async def async_devices_sync(hass, config, payload):
     https://developers.google.com/actions/smarthome/create-app#actiondevicessync
     """
     devices = []
+    sync_cache = {}
+
     for state in hass.states.async_all():
-        if not config.should_expose(state):
-            continue
+        cached = config.sync_cache.get(state.entity_id)
 
-        entity = _GoogleEntity(hass, config, state)
-        serialized = entity.sync_serialize()
+        if cached is not None and cached[0] is state:
+            serialized = cached[1]
+        elif not config.should_expose(state):
+            serialized = None
+        else:
+            entity = _GoogleEntity(hass, config, state)
+            serialized = entity.sync_serialize()
 
-        if serialized is None:
-            _LOGGER.debug("No mapping for %s domain", entity.state)
-            continue
+            if serialized is None:
+                _LOGGER.debug("No mapping for %s domain", entity.state)
 
-        devices.append(serialized)
+        sync_cache[state.entity_id] = (state, serialized)
+
+        if serialized is not None:
+            devices.append(serialized)
+
+    # Entities that have been removed are dropped from the cache
+    config.sync_cache = sync_cache
 
     return {
         'agentUserId': config.agent_user_id,
@@ -256,10 +267,17 @@ async def async_devices_query(hass, config, payload):
 
         if not state:
             # If we can't find a state, the device is offline
+            config.query_cache.pop(devid, None)
             devices[devid] = {'online': False}
             continue
 
-        devices[devid] = _GoogleEntity(hass, config, state).query_serialize()
+        cached = config.query_cache.get(devid)
+
+        if cached is None or cached[0] is not state:
+            cached = config.query_cache[devid] = (
+                state, _GoogleEntity(hass, config, state).query_serialize())
+
+        devices[devid] = cached[1]
 
     return {'devices': devices}
 
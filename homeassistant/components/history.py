@@ -11,15 +11,18 @@ from itertools import groupby
 import logging
 import time
 
+from aiohttp import web
 import voluptuous as vol
 
 from homeassistant.const import (
-    HTTP_BAD_REQUEST, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE)
+    HTTP_BAD_REQUEST, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE,
+    CONTENT_TYPE_JSON)
 import homeassistant.util.dt as dt_util
 from homeassistant.components import recorder, script
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.const import ATTR_HIDDEN
 from homeassistant.components.recorder.util import session_scope, execute
+from homeassistant.remote import json_dumps
 import homeassistant.helpers.config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
@@ -38,6 +41,9 @@ CONFIG_SCHEMA = vol.Schema({
 SIGNIFICANT_DOMAINS = ('thermostat', 'climate')
 IGNORE_DOMAINS = ('zone', 'scene',)
 
+# Number of rows fetched from the database at a time
+QUERY_CHUNK_SIZE = 1000
+
 
 def last_recorder_run(hass):
     """Retrieve the last closed recorder run from the database."""
@@ -63,10 +69,33 @@ def get_significant_states(hass, start_time, end_time=None, entity_ids=None,
     thermostat so that we get current temperature in our graphs).
     """
     timer_start = time.perf_counter()
-    from homeassistant.components.recorder.models import States
+
+    states = _stream_significant_states(
+        hass, start_time, end_time, entity_ids, filters)
+
+    result = states_to_json(
+        hass, states, start_time, entity_ids, filters,
+        include_start_time_state)
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        elapsed = time.perf_counter() - timer_start
+        _LOGGER.debug(
+            'get_significant_states took %fs', elapsed)
+
+    return result
+
+
+def _stream_significant_states(hass, start_time, end_time, entity_ids,
+                               filters):
+    """Yield the significant states, fetching rows in chunks.
+
+    Only the columns needed to build a state are selected and the
+    attributes are not decoded unless somebody looks at them.
+    """
+    from homeassistant.components.recorder.models import States, LazyState
 
     with session_scope(hass=hass) as session:
-        query = session.query(States).filter(
+        query = _query_state_columns(session).filter(
             (States.domain.in_(SIGNIFICANT_DOMAINS) |
              (States.last_changed == States.last_updated)) &
             (States.last_updated > start_time))
@@ -79,19 +108,11 @@ def get_significant_states(hass, start_time, end_time=None, entity_ids=None,
 
         query = query.order_by(States.last_updated)
 
-        states = (
-            state for state in execute(query)
-            if (_is_significant(state) and
-                not state.attributes.get(ATTR_HIDDEN, False)))
+        for row in query.yield_per(QUERY_CHUNK_SIZE):
+            state = LazyState(row)
 
-    if _LOGGER.isEnabledFor(logging.DEBUG):
-        elapsed = time.perf_counter() - timer_start
-        _LOGGER.debug(
-            'get_significant_states took %fs', elapsed)
-
-    return states_to_json(
-        hass, states, start_time, entity_ids, filters,
-        include_start_time_state)
+            if _is_significant(state) and not _is_hidden(state):
+                yield state
 
 
 def state_changes_during_period(hass, start_time, end_time=None,
@@ -121,7 +142,7 @@ def state_changes_during_period(hass, start_time, end_time=None,
 def get_states(hass, utc_point_in_time, entity_ids=None, run=None,
                filters=None):
     """Return the states at a specific point in time."""
-    from homeassistant.components.recorder.models import States
+    from homeassistant.components.recorder.models import States, LazyState
 
     if run is None:
         run = recorder.run_information(hass, utc_point_in_time)
@@ -180,7 +201,7 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None,
 
         most_recent_state_ids = most_recent_state_ids.subquery()
 
-        query = session.query(States).join(
+        query = _query_state_columns(session).join(
             most_recent_state_ids,
             States.state_id == most_recent_state_ids.c.max_state_id
         ).filter((~States.domain.in_(IGNORE_DOMAINS)))
@@ -188,8 +209,26 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None,
         if filters:
             query = filters.apply(query, entity_ids)
 
-        return [state for state in execute(query)
-                if not state.attributes.get(ATTR_HIDDEN, False)]
+        states = (LazyState(row) for row in query)
+
+        return [state for state in states if not _is_hidden(state)]
+
+
+def _query_state_columns(session):
+    """Return a query for the columns needed to build a LazyState."""
+    from homeassistant.components.recorder.models import (
+        States, StateAttributes)
+    from sqlalchemy import func
+
+    return session.query(
+        States.entity_id, States.state,
+        func.coalesce(
+            States.attributes, StateAttributes.shared_attrs
+        ).label('attributes'),
+        States.last_changed, States.last_updated
+    ).outerjoin(
+        StateAttributes,
+        States.attributes_id == StateAttributes.attributes_id)
 
 
 def states_to_json(
@@ -302,6 +341,7 @@ class HistoryPeriodView(HomeAssistantView):
         if entity_ids:
             entity_ids = entity_ids.lower().split(',')
         include_start_time_state = 'skip_initial_state' not in request.query
+        minimal_response = 'minimal_response' in request.query
 
         hass = request.app['hass']
 
@@ -329,10 +369,36 @@ class HistoryPeriodView(HomeAssistantView):
             sorted_result.extend(result)
             result = sorted_result
 
-        response = yield from hass.async_add_job(self.json, result)
+        response = yield from hass.async_add_job(
+            _history_response, result, minimal_response)
         return response
 
 
+def _history_response(result, minimal_response):
+    """Return the JSON response for lists of states.
+
+    The JSON of the states is reused instead of encoding them again. With
+    minimal_response only the first state of each entity is complete, the
+    others only contain state and last_changed.
+    """
+    def state_json(idx, state):
+        """Return the JSON of a state in the response."""
+        if minimal_response and idx > 0:
+            return '{{"state": {}, "last_changed": {}}}'.format(
+                json_dumps(state.state), json_dumps(state.last_changed))
+        return state.as_json()
+
+    body = '[{}]'.format(', '.join(
+        '[{}]'.format(', '.join(
+            state_json(idx, state) for idx, state in enumerate(states)))
+        for states in result))
+
+    response = web.Response(
+        body=body.encode('UTF-8'), content_type=CONTENT_TYPE_JSON)
+    response.enable_compression()
+    return response
+
+
 class Filters(object):
     """Container for the configured include and exclude filters."""
 
@@ -393,6 +459,17 @@ class Filters(object):
         return query
 
 
+def _is_hidden(state):
+    """Test if a state is hidden.
+
+    The attributes are only decoded if their JSON mentions the attribute.
+    """
+    if ATTR_HIDDEN not in state.attributes_json:
+        return False
+
+    return state.attributes.get(ATTR_HIDDEN, False)
+
+
 def _is_significant(state):
     """Test if state is significant for history charts.
 
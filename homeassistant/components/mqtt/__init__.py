@@ -6,14 +6,15 @@ https://home-assistant.io/components/mqtt/
 """
 import asyncio
 from itertools import groupby
-from typing import Optional, Any, Union, Callable, List, cast  # noqa: F401
+from typing import (  # noqa: F401
+    Optional, Any, Union, Callable, Dict, List, cast)
 from operator import attrgetter
 import logging
 import os
 import socket
+import threading
 import time
 import ssl
-import re
 import requests.certs
 import attr
 
@@ -470,6 +471,11 @@ class MQTT(object):
         self.birth_message = birth_message
         self._mqttc = None  # type: mqtt.Client
         self._paho_lock = asyncio.Lock(loop=hass.loop)
+        self._subscription_trie = _SubscriptionTrie()
+        # Messages received by the paho thread that wait to be handled
+        # in the event loop
+        self._pending_messages = []  # type: List[Message]
+        self._pending_lock = threading.Lock()
 
         if protocol == PROTOCOL_31:
             proto = mqtt.MQTTv31  # type: int
@@ -551,6 +557,7 @@ class MQTT(object):
 
         subscription = Subscription(topic, msg_callback, qos, encoding)
         self.subscriptions.append(subscription)
+        self._subscription_trie.add(subscription)
 
         await self._async_perform_subscription(topic, qos)
 
@@ -560,6 +567,7 @@ class MQTT(object):
             if subscription not in self.subscriptions:
                 raise HomeAssistantError("Can't remove subscription twice")
             self.subscriptions.remove(subscription)
+            self._subscription_trie.remove(subscription)
 
             if any(other.topic == topic for other in self.subscriptions):
                 # Other subscriptions on topic remaining - don't unsubscribe.
@@ -617,17 +625,37 @@ class MQTT(object):
                 self.async_publish(*attr.astuple(self.birth_message)))
 
     def _mqtt_on_message(self, _mqttc, _userdata, msg) -> None:
-        """Message received callback."""
-        self.hass.add_job(self._mqtt_handle_message, msg)
+        """Message received callback.
+
+        Messages are handed to the event loop in batches: only the first
+        message received since the last batch was handled schedules the
+        next one.
+        """
+        with self._pending_lock:
+            self._pending_messages.append(msg)
+            if len(self._pending_messages) > 1:
+                return
+
+        self.hass.loop.call_soon_threadsafe(self._mqtt_handle_messages)
+
+    @callback
+    def _mqtt_handle_messages(self) -> None:
+        """Handle the messages received since the last batch."""
+        with self._pending_lock:
+            messages = self._pending_messages
+            self._pending_messages = []
+
+        for msg in messages:
+            try:
+                self._mqtt_handle_message(msg)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling message on %s", msg.topic)
 
     @callback
     def _mqtt_handle_message(self, msg) -> None:
         _LOGGER.debug("Received message on %s: %s", msg.topic, msg.payload)
 
-        for subscription in self.subscriptions:
-            if not _match_topic(subscription.topic, msg.topic):
-                continue
-
+        for subscription in self._subscription_trie.matches(msg.topic):
             payload = msg.payload  # type: SubscribePayloadType
             if subscription.encoding is not None:
                 try:
@@ -676,25 +704,78 @@ def _raise_on_error(result_code: int) -> None:
             'Error talking to MQTT: {}'.format(mqtt.error_string(result_code)))
 
 
-def _match_topic(subscription: str, topic: str) -> bool:
-    """Test if topic matches subscription."""
-    reg_ex_parts = []  # type: List[str]
-    suffix = ""
-    if subscription.endswith('#'):
-        subscription = subscription[:-2]
-        suffix = "(.*)"
-    sub_parts = subscription.split('/')
-    for sub_part in sub_parts:
-        if sub_part == "+":
-            reg_ex_parts.append(r"([^\/]+)")
-        else:
-            reg_ex_parts.append(re.escape(sub_part))
+class _TopicNode(object):
+    """Level of a subscription topic in the subscription trie."""
 
-    reg_ex = "^" + (r'\/'.join(reg_ex_parts)) + suffix + "$"
+    __slots__ = ['children', 'subscriptions']
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children = {}  # type: Dict[str, _TopicNode]
+        self.subscriptions = []  # type: List[Subscription]
 
-    reg = re.compile(reg_ex)
 
-    return reg.match(topic) is not None
+class _SubscriptionTrie(object):
+    """Subscriptions indexed by the levels of their topic.
+
+    Matching a topic visits one node per level for each literal or '+'
+    path that matches, instead of testing every subscription.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the trie."""
+        self._root = _TopicNode()
+
+    def add(self, subscription: Subscription) -> None:
+        """Add a subscription."""
+        node = self._root
+        for level in subscription.topic.split('/'):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _TopicNode()
+            node = child
+        node.subscriptions.append(subscription)
+
+    def remove(self, subscription: Subscription) -> None:
+        """Remove a subscription and prune the levels left empty."""
+        path = [self._root]
+        levels = subscription.topic.split('/')
+        for level in levels:
+            path.append(path[-1].children[level])
+        path[-1].subscriptions.remove(subscription)
+
+        for index in range(len(levels), 0, -1):
+            node = path[index]
+            if node.subscriptions or node.children:
+                break
+            del path[index - 1].children[levels[index - 1]]
+
+    def matches(self, topic: str) -> List[Subscription]:
+        """Return the subscriptions matching a topic."""
+        result = []  # type: List[Subscription]
+        nodes = [self._root]
+
+        for level in topic.split('/'):
+            next_nodes = []
+            for node in nodes:
+                children = node.children
+                if '#' in children:
+                    result.extend(children['#'].subscriptions)
+                if level in children:
+                    next_nodes.append(children[level])
+                if '+' in children:
+                    next_nodes.append(children['+'])
+            nodes = next_nodes
+            if not nodes:
+                return result
+
+        for node in nodes:
+            result.extend(node.subscriptions)
+            # 'a/#' also matches 'a'
+            if '#' in node.children:
+                result.extend(node.children['#'].subscriptions)
+
+        return result
 
 
 class MqttAvailability(Entity):
@@ -5,6 +5,7 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/prometheus/
 """
 import asyncio
+from collections import OrderedDict
 import logging
 
 import voluptuous as vol
@@ -38,13 +39,13 @@ def setup(hass, config):
     """Activate Prometheus component."""
     import prometheus_client
 
-    hass.http.register_view(PrometheusView(prometheus_client))
-
     conf = config.get(DOMAIN, {})
     exclude = conf.get(CONF_EXCLUDE, {})
     include = conf.get(CONF_INCLUDE, {})
     metrics = Metrics(prometheus_client, exclude, include)
 
+    hass.http.register_view(PrometheusView(prometheus_client, metrics))
+
     hass.bus.listen(EVENT_STATE_CHANGED, metrics.handle_event)
     return True
 
@@ -59,8 +60,14 @@ class Metrics(object):
             exclude.get(CONF_DOMAINS, [])
         self.include_domains = include.get(CONF_DOMAINS, [])
         self.include_entities = include.get(CONF_ENTITIES, [])
-        self._metrics = {}
-
+        self._metrics = OrderedDict()
+        # Handler per entity id, None for entities that are not exported
+        self._handlers = {}
+        # Exposition text per metric and the metrics changed since
+        self._rendered = {}
+        self._changed = set()
+
+    @hacore.callback
     def handle_event(self, event):
         """Listen for new messages on the bus, and add them to Prometheus."""
         state = event.data.get('new_state')
@@ -68,32 +75,60 @@ class Metrics(object):
             return
 
         entity_id = state.entity_id
-        _LOGGER.debug("Handling state update for %s", entity_id)
+
+        try:
+            handler = self._handlers[entity_id]
+        except KeyError:
+            handler = self._handlers[entity_id] = self._handler(entity_id)
+
+        if handler is not None:
+            handler(state)
+
+    def _handler(self, entity_id):
+        """Return the handler for the states of an entity, if exported."""
         domain, _ = hacore.split_entity_id(entity_id)
 
         if entity_id in self.exclude:
-            return
+            return None
         if domain in self.exclude and entity_id not in self.include_entities:
-            return
+            return None
         if self.include_domains and domain not in self.include_domains:
-            return
+            return None
         if not self.exclude and (self.include_entities and
                                  entity_id not in self.include_entities):
-            return
+            return None
 
-        handler = '_handle_{}'.format(domain)
+        return getattr(self, '_handle_{}'.format(domain), None)
 
-        if hasattr(self, handler):
-            getattr(self, handler)(state)
+    def render(self):
+        """Return the exposition of all metrics.
+
+        Only the metrics that changed since the last call are rendered again.
+        """
+        generate_latest = self.prometheus_client.generate_latest
+
+        for metric in self._changed:
+            self._rendered[metric] = generate_latest(self._metrics[metric])
+        self._changed.clear()
+
+        # Process and platform metrics of the default registry
+        output = [generate_latest()]
+        output.extend(self._rendered[metric] for metric in self._metrics)
+        return b''.join(output)
 
     def _metric(self, metric, factory, documentation, labels=None):
+        """Return a metric that is about to be updated."""
         if labels is None:
             labels = ['entity', 'friendly_name']
 
+        self._changed.add(metric)
+
         try:
             return self._metrics[metric]
         except KeyError:
-            self._metrics[metric] = factory(metric, documentation, labels)
+            # Not registered globally, the metrics are rendered by render()
+            self._metrics[metric] = factory(
+                metric, documentation, labels, registry=None)
             return self._metrics[metric]
 
     @staticmethod
@@ -236,9 +271,10 @@ class PrometheusView(HomeAssistantView):
     url = API_ENDPOINT
     name = 'api:prometheus'
 
-    def __init__(self, prometheus_client):
+    def __init__(self, prometheus_client, metrics):
         """Initialize Prometheus view."""
         self.prometheus_client = prometheus_client
+        self.metrics = metrics
 
     @asyncio.coroutine
     def get(self, request):
@@ -246,5 +282,5 @@ class PrometheusView(HomeAssistantView):
         _LOGGER.debug("Received Prometheus metrics request")
 
         return web.Response(
-            body=self.prometheus_client.generate_latest(),
+            body=self.metrics.render(),
             content_type=CONTENT_TYPE_TEXT_PLAIN)
@@ -8,10 +8,11 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/recorder/
 """
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
 from datetime import datetime, timedelta
 import logging
+import os
 import queue
 import threading
 import time
@@ -24,11 +25,13 @@ from homeassistant.const import (
     ATTR_ENTITY_ID, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE,
     EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED,
     EVENT_TIME_CHANGED, MATCH_ALL)
-from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.core import CoreState, HomeAssistant, State, callback
+from homeassistant.exceptions import HomeAssistantError
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entityfilter import generate_filter
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.util.dt as dt_util
+from homeassistant.util.json import load_json
 
 from . import migration, purge
 from .const import DATA_INSTANCE
@@ -54,13 +57,21 @@ SERVICE_PURGE_SCHEMA = vol.Schema({
 DEFAULT_URL = 'sqlite:///{hass_config_path}'
 DEFAULT_DB_FILE = 'home-assistant_v2.db'
 
+SNAPSHOT_FILE = '.recorder_snapshot.json'
+SNAPSHOT_MAX_AGE = timedelta(seconds=30)
+
 CONF_DB_URL = 'db_url'
 CONF_PURGE_KEEP_DAYS = 'purge_keep_days'
 CONF_PURGE_INTERVAL = 'purge_interval'
 CONF_EVENT_TYPES = 'event_types'
+CONF_COMMIT_INTERVAL = 'commit_interval'
+CONF_MAX_BATCH_SIZE = 'max_batch_size'
 
 CONNECT_RETRY_WAIT = 3
 
+# Number of attribute ids the writer remembers to skip duplicate inserts
+STATE_ATTRIBUTES_CACHE_SIZE = 2048
+
 FILTER_SCHEMA = vol.Schema({
     vol.Optional(CONF_EXCLUDE, default={}): vol.Schema({
         vol.Optional(CONF_ENTITIES): cv.entity_ids,
@@ -83,6 +94,10 @@ CONFIG_SCHEMA = vol.Schema({
         vol.Optional(CONF_PURGE_INTERVAL, default=1):
             vol.All(vol.Coerce(int), vol.Range(min=0)),
         vol.Optional(CONF_DB_URL): cv.string,
+        vol.Optional(CONF_COMMIT_INTERVAL, default=1):
+            vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_MAX_BATCH_SIZE, default=1000):
+            vol.All(vol.Coerce(int), vol.Range(min=1)),
     })
 }, extra=vol.ALLOW_EXTRA)
 
@@ -124,17 +139,27 @@ def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     conf = config.get(DOMAIN, {})
     keep_days = conf.get(CONF_PURGE_KEEP_DAYS)
     purge_interval = conf.get(CONF_PURGE_INTERVAL)
+    commit_interval = conf.get(CONF_COMMIT_INTERVAL, 1)
+    max_batch_size = conf.get(CONF_MAX_BATCH_SIZE, 1000)
 
     db_url = conf.get(CONF_DB_URL, None)
     if not db_url:
         db_url = DEFAULT_URL.format(
             hass_config_path=hass.config.path(DEFAULT_DB_FILE))
 
+    # A snapshot of an in-memory database would outlive its states
+    if db_url == 'sqlite://':
+        snapshot_path = None
+    else:
+        snapshot_path = hass.config.path(SNAPSHOT_FILE)
+
     include = conf.get(CONF_INCLUDE, {})
     exclude = conf.get(CONF_EXCLUDE, {})
     instance = hass.data[DATA_INSTANCE] = Recorder(
         hass=hass, keep_days=keep_days, purge_interval=purge_interval,
-        uri=db_url, include=include, exclude=exclude)
+        uri=db_url, include=include, exclude=exclude,
+        commit_interval=commit_interval, max_batch_size=max_batch_size,
+        snapshot_path=snapshot_path)
     instance.async_initialize()
     instance.start()
 
@@ -150,7 +175,36 @@ def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     return (yield from instance.async_db_ready)
 
 
+def load_state_snapshot(hass: HomeAssistant, run_end: datetime):
+    """Return the states of the snapshot taken when a run was shut down.
+
+    The snapshot is only written on a clean shutdown, right before the run
+    is closed. Returns None if the snapshot was not taken within
+    SNAPSHOT_MAX_AGE before run_end, like after a crash.
+    """
+    instance = hass.data.get(DATA_INSTANCE)
+    if instance is None or not instance.snapshot_path:
+        return None
+
+    try:
+        data = load_json(instance.snapshot_path, default=None)
+    except HomeAssistantError:
+        return None
+
+    if not isinstance(data, dict):
+        return None
+
+    taken = dt_util.parse_datetime(data.get('time') or '')
+    if taken is None or not run_end - SNAPSHOT_MAX_AGE <= taken <= run_end:
+        _LOGGER.debug("Ignoring state snapshot from %s", taken)
+        return None
+
+    states = (State.from_dict(state) for state in data.get('states', []))
+    return [state for state in states if state is not None]
+
+
 PurgeTask = namedtuple('PurgeTask', ['keep_days', 'repack'])
+SnapshotTask = namedtuple('SnapshotTask', ['time', 'states'])
 
 
 class Recorder(threading.Thread):
@@ -158,13 +212,18 @@ class Recorder(threading.Thread):
 
     def __init__(self, hass: HomeAssistant, keep_days: int,
                  purge_interval: int, uri: str,
-                 include: Dict, exclude: Dict) -> None:
+                 include: Dict, exclude: Dict, commit_interval: float = 0,
+                 max_batch_size: int = 1,
+                 snapshot_path: Optional[str] = None) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self, name='Recorder')
 
         self.hass = hass
         self.keep_days = keep_days
         self.purge_interval = purge_interval
+        self.commit_interval = commit_interval
+        self.max_batch_size = max_batch_size
+        self.snapshot_path = snapshot_path
         self.queue = queue.Queue()  # type: Any
         self.recording_start = dt_util.utcnow()
         self.db_url = uri
@@ -179,6 +238,10 @@ class Recorder(threading.Thread):
 
         self.get_session = None
 
+        # Ids of recently written attributes, least recently used first
+        self.state_attributes_ids = (
+            OrderedDict())  # type: OrderedDict[str, int]
+
     @callback
     def async_initialize(self):
         """Initialize the recorder."""
@@ -193,9 +256,8 @@ class Recorder(threading.Thread):
 
     def run(self):
         """Start processing events to save."""
-        from .models import States, Events
+        from .models import Events
         from homeassistant.components import persistent_notification
-        from sqlalchemy import exc
 
         tries = 1
         connected = False
@@ -239,6 +301,9 @@ class Recorder(threading.Thread):
                 """Shut down the Recorder."""
                 if not hass_started.done():
                     hass_started.set_result(shutdown_task)
+                elif self.snapshot_path:
+                    self.queue.put(SnapshotTask(
+                        dt_util.utcnow(), self.hass.states.all()))
                 self.queue.put(None)
                 self.join()
 
@@ -285,16 +350,43 @@ class Recorder(threading.Thread):
 
             self.hass.helpers.event.track_point_in_time(async_purge, run)
 
+        # Events that are written to the database but not yet committed.
+        # The transaction is committed once it holds max_batch_size events,
+        # has been open for commit_interval seconds or the queue runs dry
+        # while no commit interval is configured.
+        batch = []
+        batch_started = None
+
         while True:
-            event = self.queue.get()
+            if batch:
+                wait = max(
+                    0, batch_started + self.commit_interval - time.monotonic())
+            else:
+                wait = None
+
+            try:
+                event = self.queue.get(timeout=wait)
+            except queue.Empty:
+                self._commit_batch(batch)
+                continue
 
             if event is None:
+                self._commit_batch(batch)
                 self._close_run()
                 self._close_connection()
                 self.queue.task_done()
                 return
             elif isinstance(event, PurgeTask):
-                purge.purge_old_data(self, event.keep_days, event.repack)
+                self._commit_batch(batch)
+                if not purge.purge_old_data(
+                        self, event.keep_days, event.repack):
+                    # Queue the next batch behind the events that arrived
+                    # while purging so they are not held up
+                    self.queue.put(event)
+                self.queue.task_done()
+                continue
+            elif isinstance(event, SnapshotTask):
+                self._save_snapshot(event)
                 self.queue.task_done()
                 continue
             elif event.event_type == EVENT_TIME_CHANGED:
@@ -310,34 +402,142 @@ class Recorder(threading.Thread):
                     self.queue.task_done()
                     continue
 
-            tries = 1
-            updated = False
-            while not updated and tries <= 10:
-                if tries != 1:
-                    time.sleep(CONNECT_RETRY_WAIT)
-                try:
-                    with session_scope(session=self.get_session()) as session:
-                        dbevent = Events.from_event(event)
-                        session.add(dbevent)
-                        session.flush()
-
-                        if event.event_type == EVENT_STATE_CHANGED:
-                            dbstate = States.from_event(event)
-                            dbstate.event_id = dbevent.event_id
-                            session.add(dbstate)
-                    updated = True
-
-                except exc.OperationalError as err:
-                    _LOGGER.error("Error in database connectivity: %s. "
-                                  "(retrying in %s seconds)", err,
-                                  CONNECT_RETRY_WAIT)
-                    tries += 1
-
-            if not updated:
-                _LOGGER.error("Error in database update. Could not save "
-                              "after %d tries. Giving up", tries)
+            if not batch:
+                batch_started = time.monotonic()
+            batch.append(event)
+
+            if len(batch) >= self.max_batch_size:
+                self._commit_batch(batch)
 
+    def _commit_batch(self, batch):
+        """Write a batch of events to the database in one transaction.
+
+        The batch is emptied and its queue items are marked as done.
+        """
+        from .models import States, Events
+        from sqlalchemy import exc
+
+        if not batch:
+            return
+
+        tries = 1
+        updated = False
+        while not updated and tries <= 10:
+            if tries != 1:
+                time.sleep(CONNECT_RETRY_WAIT)
+            try:
+                with session_scope(session=self.get_session()) as session:
+                    dbevents = [Events.from_event(event) for event in batch]
+                    session.add_all(dbevents)
+                    session.flush()
+
+                    dbstates = []
+                    for event, dbevent in zip(batch, dbevents):
+                        if event.event_type != EVENT_STATE_CHANGED:
+                            continue
+                        dbstate = States.from_event(event)
+                        dbstate.event_id = dbevent.event_id
+                        dbstates.append(dbstate)
+
+                    new_attributes_ids = self._link_state_attributes(
+                        session, dbstates)
+                    session.bulk_save_objects(dbstates)
+                updated = True
+
+                # Only cache ids of attributes that made it to the database
+                for shared_attrs, attributes_id in new_attributes_ids.items():
+                    self._cache_attributes_id(shared_attrs, attributes_id)
+
+            except exc.OperationalError as err:
+                _LOGGER.error("Error in database connectivity: %s. "
+                              "(retrying in %s seconds)", err,
+                              CONNECT_RETRY_WAIT)
+                tries += 1
+
+        if not updated:
+            _LOGGER.error("Error in database update. Could not save %d "
+                          "events after %d tries. Giving up",
+                          len(batch), tries)
+
+        for _ in batch:
             self.queue.task_done()
+        batch.clear()
+
+    def _save_snapshot(self, snapshot):
+        """Write the recorded entities of a snapshot to the snapshot file."""
+        states = ','.join(
+            state.as_json() for state in snapshot.states
+            if self.entity_filter(state.entity_id))
+        data = '{{"time": "{}", "states": [{}]}}'.format(
+            snapshot.time.isoformat(), states)
+
+        # Write to a temporary file first so a crash never leaves a
+        # truncated snapshot behind
+        tmp_path = '{}.tmp'.format(self.snapshot_path)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as fdesc:
+                fdesc.write(data)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as err:
+            _LOGGER.error("Error saving state snapshot: %s", err)
+
+    def _link_state_attributes(self, session, dbstates):
+        """Point states at deduplicated rows in the state_attributes table.
+
+        Returns the attribute ids that were not cached yet.
+        """
+        from .models import StateAttributes
+
+        new_attributes_ids = {}
+        new_attributes = {}
+        unlinked = []
+
+        for dbstate in dbstates:
+            shared_attrs = dbstate.attributes
+            dbstate.attributes = None
+
+            attributes_id = self.state_attributes_ids.get(shared_attrs)
+            if attributes_id is not None:
+                self.state_attributes_ids.move_to_end(shared_attrs)
+                dbstate.attributes_id = attributes_id
+                continue
+
+            if (shared_attrs not in new_attributes_ids and
+                    shared_attrs not in new_attributes):
+                attr_hash = StateAttributes.hash_shared_attrs(shared_attrs)
+                row = session.query(StateAttributes.attributes_id).filter(
+                    (StateAttributes.hash == attr_hash) &
+                    (StateAttributes.shared_attrs == shared_attrs)).first()
+
+                if row is not None:
+                    new_attributes_ids[shared_attrs] = row[0]
+                else:
+                    new_attributes[shared_attrs] = StateAttributes(
+                        hash=attr_hash, shared_attrs=shared_attrs)
+
+            if shared_attrs in new_attributes_ids:
+                dbstate.attributes_id = new_attributes_ids[shared_attrs]
+            else:
+                unlinked.append((dbstate, new_attributes[shared_attrs]))
+
+        if new_attributes:
+            session.add_all(new_attributes.values())
+            session.flush()
+
+            for dbstate, dbattr in unlinked:
+                dbstate.attributes_id = dbattr.attributes_id
+
+            for shared_attrs, dbattr in new_attributes.items():
+                new_attributes_ids[shared_attrs] = dbattr.attributes_id
+
+        return new_attributes_ids
+
+    def _cache_attributes_id(self, shared_attrs, attributes_id):
+        """Remember the id of recently written attributes."""
+        self.state_attributes_ids[shared_attrs] = attributes_id
+
+        if len(self.state_attributes_ids) > STATE_ATTRIBUTES_CACHE_SIZE:
+            self.state_attributes_ids.popitem(last=False)
 
     @callback
     def event_listener(self, event):
@@ -57,6 +57,40 @@ def _create_index(engine, table_name, index_name):
     _LOGGER.debug("Finished creating %s", index_name)
 
 
+def _create_table(engine, table_name):
+    """Create a table of the models if it does not exist yet."""
+    from . import models
+
+    _LOGGER.debug("Creating table %s", table_name)
+    models.Base.metadata.tables[table_name].create(engine, checkfirst=True)
+
+
+def _add_columns(engine, table_name, columns_def):
+    """Add columns to a table.
+
+    The column definitions are passed to ALTER TABLE as they are, DO NOT USE
+    THIS FUNCTION IN ANY OPERATION THAT TAKES USER INPUT.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    _LOGGER.info("Adding columns %s to table %s. Note: this can take several "
+                 "minutes on large databases and slow computers. Please "
+                 "be patient!", ', '.join(columns_def), table_name)
+
+    for column_def in columns_def:
+        try:
+            engine.execute(text("ALTER TABLE {table} ADD COLUMN {column_def}"
+                                .format(table=table_name,
+                                        column_def=column_def)))
+        except OperationalError as err:
+            if 'duplicate' not in str(err).lower():
+                raise
+
+            _LOGGER.warning("Column %s already exists on %s, continuing",
+                            column_def.split(' ')[0], table_name)
+
+
 def _drop_index(engine, table_name, index_name):
     """Drop an index from a specified table.
 
@@ -146,6 +180,13 @@ def _apply_update(engine, new_version, old_version):
     elif new_version == 5:
         # Create supporting index for States.event_id foreign key
         _create_index(engine, "states", "ix_states_event_id")
+    elif new_version == 6:
+        # Attributes of new states are stored once in state_attributes
+        _create_table(engine, "state_attributes")
+        _add_columns(engine, "states", [
+            'attributes_id INTEGER REFERENCES state_attributes(attributes_id)'
+        ])
+        _create_index(engine, "states", "ix_states_attributes_id")
     else:
         raise ValueError("No schema migration defined for version {}"
                          .format(new_version))
@@ -2,21 +2,24 @@
 import json
 from datetime import datetime
 import logging
+from types import MappingProxyType
+import zlib
 
 from sqlalchemy import (
-    Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text,
-    distinct)
+    BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, String,
+    Text, distinct)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 
 import homeassistant.util.dt as dt_util
 from homeassistant.core import Event, EventOrigin, State, split_entity_id
-from homeassistant.remote import JSONEncoder
+from homeassistant.remote import json_dumps
 
 # SQLAlchemy Schema
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 5
+SCHEMA_VERSION = 6
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,7 +39,7 @@ class Events(Base):  # type: ignore
     def from_event(event):
         """Create an event database object from a native event."""
         return Events(event_type=event.event_type,
-                      event_data=json.dumps(event.data, cls=JSONEncoder),
+                      event_data=event.data_json(),
                       origin=str(event.origin),
                       time_fired=event.time_fired)
 
@@ -63,8 +66,11 @@ class States(Base):   # type: ignore
     domain = Column(String(64))
     entity_id = Column(String(255))
     state = Column(String(255))
+    # Only set for rows written before attributes were deduplicated
     attributes = Column(Text)
     event_id = Column(Integer, ForeignKey('events.event_id'), index=True)
+    attributes_id = Column(
+        Integer, ForeignKey('state_attributes.attributes_id'), index=True)
     last_changed = Column(DateTime(timezone=True), default=datetime.utcnow)
     last_updated = Column(DateTime(timezone=True), default=datetime.utcnow,
                           index=True)
@@ -76,9 +82,15 @@ class States(Base):   # type: ignore
         Index(
             'ix_states_entity_id_last_updated', 'entity_id', 'last_updated'),)
 
+    state_attributes = relationship('StateAttributes', lazy='joined')
+
     @staticmethod
     def from_event(event):
-        """Create object from a state_changed event."""
+        """Create object from a state_changed event.
+
+        The attributes are stored on the object until the recorder links it
+        to a row in the state_attributes table.
+        """
         entity_id = event.data['entity_id']
         state = event.data.get('new_state')
 
@@ -94,19 +106,25 @@ class States(Base):   # type: ignore
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes),
-                                            cls=JSONEncoder)
+            dbstate.attributes = json_dumps(dict(state.attributes))
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
 
         return dbstate
 
+    @property
+    def shared_attrs(self):
+        """Return the JSON encoded attributes of this state."""
+        if self.attributes is None and self.state_attributes is not None:
+            return self.state_attributes.shared_attrs
+        return self.attributes
+
     def to_native(self):
         """Convert to an HA state object."""
         try:
             return State(
                 self.entity_id, self.state,
-                json.loads(self.attributes),
+                json.loads(self.shared_attrs),
                 _process_timestamp(self.last_changed),
                 _process_timestamp(self.last_updated)
             )
@@ -116,6 +134,72 @@ class States(Base):   # type: ignore
             return None
 
 
+class StateAttributes(Base):   # type: ignore
+    """Attributes shared by states, stored once."""
+
+    __tablename__ = 'state_attributes'
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(BigInteger, index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the hash of the JSON encoded attributes."""
+        return zlib.crc32(shared_attrs.encode('utf-8'))
+
+
+class LazyState(State):
+    """A state built from a query row that decodes its attributes lazily.
+
+    The row needs the entity_id, state, attributes, last_changed and
+    last_updated columns of the states table.
+    """
+
+    __slots__ = ['attributes_json', '_attributes']
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, row):
+        """Initialize the state from a row."""
+        self.entity_id = row.entity_id
+        self.state = row.state
+        self.attributes_json = row.attributes
+        self._attributes = None
+        self.last_changed = _process_timestamp(row.last_changed)
+        self.last_updated = _process_timestamp(row.last_updated)
+        self._as_json = None
+
+    @property
+    def attributes(self):
+        """Decode the attributes on first access."""
+        if self._attributes is None:
+            try:
+                self._attributes = MappingProxyType(
+                    json.loads(self.attributes_json))
+            except ValueError:
+                # When json.loads fails
+                self._attributes = MappingProxyType({})
+                _LOGGER.exception("Error converting row to state: %s", self)
+
+        return self._attributes
+
+    def as_json(self):
+        """Return the JSON representation without decoding attributes."""
+        if self._as_json is None:
+            if self._attributes is None:
+                attributes_json = self.attributes_json
+            else:
+                attributes_json = json_dumps(dict(self._attributes))
+
+            self._as_json = (
+                '{{"entity_id": {}, "state": {}, "attributes": {}, '
+                '"last_changed": {}, "last_updated": {}}}'.format(
+                    json_dumps(self.entity_id), json_dumps(self.state),
+                    attributes_json, json_dumps(self.last_changed),
+                    json_dumps(self.last_updated)))
+
+        return self._as_json
+
+
 class RecorderRuns(Base):   # type: ignore
     """Representation of recorder run."""
 
@@ -1,6 +1,7 @@
 """Purge old data helper."""
 from datetime import timedelta
 import logging
+import time
 
 import homeassistant.util.dt as dt_util
 
@@ -8,55 +9,44 @@ from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+# Rows deleted per batch. Ids are passed as bound parameters, so this has to
+# stay below the SQLite default limit of 999 host parameters.
+PURGE_BATCH_SIZE = 900
+
 
 def purge_old_data(instance, purge_days, repack):
-    """Purge events and states older than purge_days ago."""
-    from .models import States, Events
-    from sqlalchemy import func
+    """Purge a batch of events and states older than purge_days ago.
 
+    Every call deletes at most PURGE_BATCH_SIZE states, events and state
+    attributes in its own transaction. Returns True once nothing is left to
+    purge; otherwise the caller is expected to call again, giving the
+    recorder a chance to write the events that were queued in between.
+    """
     purge_before = dt_util.utcnow() - timedelta(days=purge_days)
     _LOGGER.debug("Purging events before %s", purge_before)
 
-    with session_scope(session=instance.get_session()) as session:
-        delete_states = session.query(States) \
-                            .filter((States.last_updated < purge_before))
-
-        # For each entity, the most recent state is protected from deletion
-        # s.t. we can properly restore state even if the entity has not been
-        # updated in a long time
-        protected_states = session.query(func.max(States.state_id)) \
-            .group_by(States.entity_id).all()
-
-        protected_state_ids = tuple(state[0] for state in protected_states)
-
-        if protected_state_ids:
-            delete_states = delete_states \
-                .filter(~States.state_id.in_(protected_state_ids))
-
-        deleted_rows = delete_states.delete(synchronize_session=False)
-        _LOGGER.debug("Deleted %s states", deleted_rows)
+    start = time.perf_counter()
 
-        delete_events = session.query(Events) \
-            .filter((Events.time_fired < purge_before))
-
-        # We also need to protect the events belonging to the protected states.
-        # Otherwise, if the SQL server has "ON DELETE CASCADE" as default, it
-        # will delete the protected state when deleting its associated
-        # event. Also, we would be producing NULLed foreign keys otherwise.
-        if protected_state_ids:
-            protected_events = session.query(States.event_id) \
-                .filter(States.state_id.in_(protected_state_ids)) \
-                .filter(States.event_id.isnot(None)) \
-                .all()
-
-            protected_event_ids = tuple(state[0] for state in protected_events)
-
-            if protected_event_ids:
-                delete_events = delete_events \
-                    .filter(~Events.event_id.in_(protected_event_ids))
-
-        deleted_rows = delete_events.delete(synchronize_session=False)
-        _LOGGER.debug("Deleted %s events", deleted_rows)
+    with session_scope(session=instance.get_session()) as session:
+        deleted_states = _purge_states(session, purge_before)
+        deleted_attributes = _purge_state_attributes(session)
+        deleted_events = _purge_events(session, purge_before)
+
+        # The writer could otherwise link new states to deleted attributes
+        if deleted_attributes:
+            instance.state_attributes_ids.clear()
+
+    deleted_rows = deleted_states + deleted_attributes + deleted_events
+    elapsed = time.perf_counter() - start
+    _LOGGER.debug(
+        "Deleted %s states, %s state attributes and %s events in %.3fs "
+        "(%.0f rows/s)", deleted_states, deleted_attributes, deleted_events,
+        elapsed, deleted_rows / elapsed if elapsed else 0)
+
+    if max(deleted_states, deleted_attributes,
+           deleted_events) >= PURGE_BATCH_SIZE:
+        _LOGGER.debug("Purge not finished, continuing with next batch")
+        return False
 
     # Execute sqlite vacuum command to free up space on disk
     _LOGGER.debug("DB engine driver: %s", instance.engine.driver)
@@ -68,3 +58,73 @@ def purge_old_data(instance, purge_days, repack):
             instance.engine.execute("VACUUM")
         except exc.OperationalError as err:
             _LOGGER.error("Error vacuuming SQLite: %s.", err)
+
+    return True
+
+
+def _purge_states(session, purge_before):
+    """Delete a batch of states older than purge_before."""
+    from .models import States
+    from sqlalchemy import exists
+    from sqlalchemy.orm import aliased
+
+    # For each entity, the most recent state is protected from deletion
+    # s.t. we can properly restore state even if the entity has not been
+    # updated in a long time. Checking for a newer state is an index lookup
+    # on (entity_id, last_updated) per candidate row.
+    newer = aliased(States)
+    state_ids = [row[0] for row in session.query(States.state_id)
+                 .filter(States.last_updated < purge_before)
+                 .filter(exists()
+                         .where(newer.entity_id == States.entity_id)
+                         .where(newer.last_updated > States.last_updated))
+                 .order_by(States.last_updated)
+                 .limit(PURGE_BATCH_SIZE)]
+
+    if not state_ids:
+        return 0
+
+    return session.query(States) \
+        .filter(States.state_id.in_(state_ids)) \
+        .delete(synchronize_session=False)
+
+
+def _purge_state_attributes(session):
+    """Delete a batch of state attributes no state refers to anymore."""
+    from .models import States, StateAttributes
+    from sqlalchemy import exists
+
+    unused = ~exists().where(
+        States.attributes_id == StateAttributes.attributes_id)
+    attributes_ids = [row[0] for row in session.query(
+        StateAttributes.attributes_id).filter(unused).limit(PURGE_BATCH_SIZE)]
+
+    if not attributes_ids:
+        return 0
+
+    return session.query(StateAttributes) \
+        .filter(StateAttributes.attributes_id.in_(attributes_ids)) \
+        .delete(synchronize_session=False)
+
+
+def _purge_events(session, purge_before):
+    """Delete a batch of events older than purge_before."""
+    from .models import Events, States
+    from sqlalchemy import exists
+
+    # Events still referenced by a state are kept. Otherwise, if the SQL
+    # server has "ON DELETE CASCADE" as default, it will delete the
+    # protected state when deleting its associated event. Also, we would be
+    # producing NULLed foreign keys otherwise.
+    event_ids = [row[0] for row in session.query(Events.event_id)
+                 .filter(Events.time_fired < purge_before)
+                 .filter(~exists().where(States.event_id == Events.event_id))
+                 .order_by(Events.time_fired)
+                 .limit(PURGE_BATCH_SIZE)]
+
+    if not event_ids:
+        return 0
+
+    return session.query(Events) \
+        .filter(Events.event_id.in_(event_ids)) \
+        .delete(synchronize_session=False)
@@ -90,10 +90,10 @@ def async_setup(hass, config):
         return False
 
     @asyncio.coroutine
-    def _close():
+    def _close(event):
         controller.close()
 
-    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _close())
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _close)
 
     _LOGGER.debug("Arm home config: %s, mode: %s ",
                   conf,
@@ -53,7 +53,7 @@ async def async_setup_platform(hass,
     if not await sensor.connection():
         raise PlatformNotReady
 
-    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, sensor.shutdown())
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, sensor.shutdown)
     async_add_devices([sensor], True)
 
 
@@ -162,7 +162,7 @@ class ImapSensor(Entity):
         _LOGGER.warning("Lost %s (will attempt to reconnect)", self._server)
         self._connection = None
 
-    async def shutdown(self):
+    async def shutdown(self, event):
         """Close resources."""
         if self._connection:
             if self._connection.has_pending_idle():
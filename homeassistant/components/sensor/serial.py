@@ -49,7 +49,7 @@ def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
     sensor = SerialSensor(name, port, baudrate, value_template)
 
     hass.bus.async_listen_once(
-        EVENT_HOMEASSISTANT_STOP, sensor.stop_serial_read())
+        EVENT_HOMEASSISTANT_STOP, sensor.stop_serial_read)
     async_add_devices([sensor], True)
 
 
@@ -98,7 +98,7 @@ class SerialSensor(Entity):
             self.async_schedule_update_ha_state()
 
     @asyncio.coroutine
-    def stop_serial_read(self):
+    def stop_serial_read(self, event):
         """Close resources."""
         if self._serial_loop_task:
             self._serial_loop_task.cancel()
@@ -18,7 +18,8 @@ from homeassistant.const import (
 from homeassistant.exceptions import TemplateError
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import (
+    async_track_state_change, async_track_template_result)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,8 +49,7 @@ def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
         icon_template = device_config.get(CONF_ICON_TEMPLATE)
         entity_picture_template = device_config.get(
             CONF_ENTITY_PICTURE_TEMPLATE)
-        entity_ids = (device_config.get(ATTR_ENTITY_ID) or
-                      state_template.extract_entities())
+        entity_ids = device_config.get(ATTR_ENTITY_ID)
         friendly_name = device_config.get(ATTR_FRIENDLY_NAME, device)
         friendly_name_template = device_config.get(CONF_FRIENDLY_NAME_TEMPLATE)
         unit_of_measurement = device_config.get(ATTR_UNIT_OF_MEASUREMENT)
@@ -114,13 +114,34 @@ class SensorTemplate(Entity):
             """Handle device state changes."""
             self.async_schedule_update_ha_state(True)
 
+        def template_sensor_result_listener(property_name):
+            """Return a listener that stores the results of a template."""
+            @callback
+            def result_listener(last_result, result):
+                """Handle a new result of the template."""
+                self._async_set_result(property_name, result)
+                # The first results are written together on startup
+                if last_result is not None:
+                    self.async_schedule_update_ha_state()
+
+            return result_listener
+
         @callback
         def template_sensor_startup(event):
             """Update template on startup."""
-            async_track_state_change(
-                self.hass, self._entities, template_sensor_state_listener)
+            if self._entities:
+                async_track_state_change(
+                    self.hass, self._entities, template_sensor_state_listener)
+                self.async_schedule_update_ha_state(True)
+                return
 
-            self.async_schedule_update_ha_state(True)
+            # Follow the states the templates read when they are rendered
+            for property_name, template in self._templates():
+                async_track_template_result(
+                    self.hass, template,
+                    template_sensor_result_listener(property_name))
+
+            self.async_schedule_update_ha_state()
 
         self.hass.bus.async_listen_once(
             EVENT_HOMEASSISTANT_START, template_sensor_startup)
@@ -155,43 +176,62 @@ class SensorTemplate(Entity):
         """No polling needed."""
         return False
 
-    @asyncio.coroutine
-    def async_update(self):
-        """Update the state from the template."""
-        try:
-            self._state = self._template.async_render()
-        except TemplateError as ex:
-            if ex.args and ex.args[0].startswith(
+    def _templates(self):
+        """Return the attributes the templates are rendered to."""
+        for property_name, template in (
+                ('_state', self._template),
+                ('_icon', self._icon_template),
+                ('_entity_picture', self._entity_picture_template),
+                ('_name', self._friendly_name_template)):
+            if template is not None:
+                yield property_name, template
+
+    @callback
+    def _async_set_result(self, property_name, result):
+        """Store the result of a template.
+
+        Return False if the template could not be rendered during startup.
+        """
+        if not isinstance(result, TemplateError):
+            setattr(self, property_name, result)
+            return True
+
+        if property_name == '_state':
+            if result.args and result.args[0].startswith(
                     "UndefinedError: 'None' has no attribute"):
                 # Common during HA startup - so just a warning
                 _LOGGER.warning('Could not render template %s,'
                                 ' the state is unknown.', self._name)
-                return
+                return False
             self._state = None
-            _LOGGER.error('Could not render template %s: %s', self._name, ex)
+            _LOGGER.error('Could not render template %s: %s',
+                          self._name, result)
+            return True
+
+        friendly_property_name = property_name[1:].replace('_', ' ')
+        if result.args and result.args[0].startswith(
+                "UndefinedError: 'None' has no attribute"):
+            # Common during HA startup - so just a warning
+            _LOGGER.warning('Could not render %s template %s,'
+                            ' the state is unknown.',
+                            friendly_property_name, self._name)
+            return False
 
-        for property_name, template in (
-                ('_icon', self._icon_template),
-                ('_entity_picture', self._entity_picture_template),
-                ('_name', self._friendly_name_template)):
-            if template is None:
-                continue
+        try:
+            setattr(self, property_name, getattr(super(), property_name))
+        except AttributeError:
+            _LOGGER.error('Could not render %s template %s: %s',
+                          friendly_property_name, self._name, result)
+        return True
 
+    @asyncio.coroutine
+    def async_update(self):
+        """Update the state from the template."""
+        for property_name, template in self._templates():
             try:
-                setattr(self, property_name, template.async_render())
+                result = template.async_render()
             except TemplateError as ex:
-                friendly_property_name = property_name[1:].replace('_', ' ')
-                if ex.args and ex.args[0].startswith(
-                        "UndefinedError: 'None' has no attribute"):
-                    # Common during HA startup - so just a warning
-                    _LOGGER.warning('Could not render %s template %s,'
-                                    ' the state is unknown.',
-                                    friendly_property_name, self._name)
-                    return
-
-                try:
-                    setattr(self, property_name,
-                            getattr(super(), property_name))
-                except AttributeError:
-                    _LOGGER.error('Could not render %s template %s: %s',
-                                  friendly_property_name, self._name, ex)
+                result = ex
+
+            if not self._async_set_result(property_name, result):
+                return
@@ -12,9 +12,12 @@ import requests
 import voluptuous as vol
 
 from homeassistant.const import (
-    CONF_SSL, CONF_HOST, CONF_NAME, CONF_PORT, CONF_TOKEN, EVENT_STATE_CHANGED)
+    CONF_SSL, CONF_HOST, CONF_NAME, CONF_PORT, CONF_TOKEN)
 from homeassistant.helpers import state as state_helper
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.exporter import (
+    CONF_FLUSH_INTERVAL, CONF_MAX_BATCH_SIZE, CONF_MAX_QUEUE_SIZE,
+    CONF_STATS_SENSOR, EXPORTER_SCHEMA, Exporter)
 from homeassistant.remote import JSONEncoder
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,7 +30,7 @@ DEFAULT_SSL = False
 DEFAULT_NAME = 'HASS'
 
 CONFIG_SCHEMA = vol.Schema({
-    DOMAIN: vol.Schema({
+    DOMAIN: EXPORTER_SCHEMA.extend({
         vol.Required(CONF_TOKEN): cv.string,
         vol.Optional(CONF_HOST, default=DEFAULT_HOST): cv.string,
         vol.Optional(CONF_PORT, default=DEFAULT_PORT): cv.port,
@@ -53,14 +56,31 @@ def setup(hass, config):
 
     event_collector = '{}{}:{}/services/collector/event'.format(
         uri_scheme, host, port)
-    headers = {AUTHORIZATION: 'Splunk {}'.format(token)}
 
-    def splunk_event_listener(event):
-        """Listen for new messages on the bus and sends them to Splunk."""
-        state = event.data.get('new_state')
+    SplunkExporter(
+        hass, event_collector, token, name,
+        flush_interval=conf[CONF_FLUSH_INTERVAL],
+        max_batch_size=conf[CONF_MAX_BATCH_SIZE],
+        max_queue_size=conf[CONF_MAX_QUEUE_SIZE],
+        stats_sensor=conf[CONF_STATS_SENSOR])
 
-        if state is None:
-            return
+    return True
+
+
+class SplunkExporter(Exporter):
+    """Send state changes to the Splunk HTTP event collector."""
+
+    def __init__(self, hass, event_collector, token, name, **kwargs):
+        """Initialize the exporter."""
+        super().__init__(hass, DOMAIN, **kwargs)
+        self._event_collector = event_collector
+        self._host_name = name
+        self._session = requests.Session()
+        self._session.headers[AUTHORIZATION] = 'Splunk {}'.format(token)
+
+    def format_event(self, event):
+        """Return the collector payload for a state change."""
+        state = event.data['new_state']
 
         try:
             _state = state_helper.state_as_number(state)
@@ -74,21 +94,30 @@ def setup(hass, config):
                 'attributes': dict(state.attributes),
                 'time': str(event.time_fired),
                 'value': _state,
-                'host': name,
+                'host': self._host_name,
             }
         ]
 
+        payload = {
+            "host": self._event_collector,
+            "event": json_body,
+        }
+        return json.dumps(payload, cls=JSONEncoder)
+
+    def send(self, records):
+        """Post a batch of payloads in a single request.
+
+        The collector accepts concatenated payloads, and the session keeps
+        the connection open between batches.
+        """
         try:
-            payload = {
-                "host": event_collector,
-                "event": json_body,
-            }
-            requests.post(event_collector,
-                          data=json.dumps(payload, cls=JSONEncoder),
-                          headers=headers, timeout=10)
+            response = self._session.post(
+                self._event_collector, data=''.join(records), timeout=10)
+            response.raise_for_status()
         except requests.exceptions.RequestException as error:
-            _LOGGER.exception("Error saving event to Splunk: %s", error)
+            _LOGGER.error("Error saving events to Splunk: %s", error)
+            raise
 
-    hass.bus.listen(EVENT_STATE_CHANGED, splunk_event_listener)
-
-    return True
+    def close(self):
+        """Close the connections of the session."""
+        self._session.close()
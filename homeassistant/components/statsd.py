@@ -8,10 +8,12 @@ import logging
 
 import voluptuous as vol
 
-from homeassistant.const import (
-    CONF_HOST, CONF_PORT, CONF_PREFIX, EVENT_STATE_CHANGED)
+from homeassistant.const import CONF_HOST, CONF_PORT, CONF_PREFIX
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers import state as state_helper
+from homeassistant.helpers.exporter import (
+    CONF_FLUSH_INTERVAL, CONF_MAX_BATCH_SIZE, CONF_MAX_QUEUE_SIZE,
+    CONF_STATS_SENSOR, EXPORTER_SCHEMA, Exporter)
 
 REQUIREMENTS = ['statsd==3.2.1']
 
@@ -28,7 +30,7 @@ DEFAULT_RATE = 1
 DOMAIN = 'statsd'
 
 CONFIG_SCHEMA = vol.Schema({
-    DOMAIN: vol.Schema({
+    DOMAIN: EXPORTER_SCHEMA.extend({
         vol.Required(CONF_HOST, default=DEFAULT_HOST): cv.string,
         vol.Optional(CONF_ATTR, default=False): cv.boolean,
         vol.Optional(CONF_PORT, default=DEFAULT_PORT): cv.port,
@@ -47,54 +49,74 @@ def setup(hass, config):
     conf = config[DOMAIN]
     host = conf.get(CONF_HOST)
     port = conf.get(CONF_PORT)
-    sample_rate = conf.get(CONF_RATE)
     prefix = conf.get(CONF_PREFIX)
-    value_mapping = conf.get(CONF_VALUE_MAP)
-    show_attribute_flag = conf.get(CONF_ATTR)
 
     statsd_client = statsd.StatsClient(host=host, port=port, prefix=prefix)
 
-    def statsd_event_listener(event):
-        """Listen for new messages on the bus and sends them to StatsD."""
-        state = event.data.get('new_state')
+    StatsdExporter(
+        hass, statsd_client, conf.get(CONF_RATE), conf.get(CONF_VALUE_MAP),
+        conf.get(CONF_ATTR),
+        flush_interval=conf[CONF_FLUSH_INTERVAL],
+        max_batch_size=conf[CONF_MAX_BATCH_SIZE],
+        max_queue_size=conf[CONF_MAX_QUEUE_SIZE],
+        stats_sensor=conf[CONF_STATS_SENSOR])
 
-        if state is None:
-            return
+    return True
+
+
+class StatsdExporter(Exporter):
+    """Send state changes to StatsD, packing many stats per packet."""
+
+    def __init__(self, hass, statsd_client, sample_rate, value_mapping,
+                 show_attribute_flag, **kwargs):
+        """Initialize the exporter."""
+        super().__init__(hass, DOMAIN, **kwargs)
+        self._client = statsd_client
+        self._sample_rate = sample_rate
+        self._value_mapping = value_mapping
+        self._show_attribute_flag = show_attribute_flag
+
+    def format_event(self, event):
+        """Return the gauges and the counter name for a state change."""
+        state = event.data['new_state']
 
         try:
-            if value_mapping and state.state in value_mapping:
-                _state = float(value_mapping[state.state])
+            if self._value_mapping and state.state in self._value_mapping:
+                _state = float(self._value_mapping[state.state])
             else:
                 _state = state_helper.state_as_number(state)
         except ValueError:
             # Set the state to none and continue for any numeric attributes.
             _state = None
 
-        states = dict(state.attributes)
+        gauges = []
 
-        _LOGGER.debug('Sending %s', state.entity_id)
-
-        if show_attribute_flag is True:
+        if self._show_attribute_flag is True:
             if isinstance(_state, (float, int)):
-                statsd_client.gauge(
-                    "%s.state" % state.entity_id,
-                    _state,
-                    sample_rate
-                )
+                gauges.append(("%s.state" % state.entity_id, _state))
 
             # Send attribute values
-            for key, value in states.items():
+            for key, value in state.attributes.items():
                 if isinstance(value, (float, int)):
                     stat = "%s.%s" % (state.entity_id, key.replace(' ', '_'))
-                    statsd_client.gauge(stat, value, sample_rate)
+                    gauges.append((stat, value))
 
-        else:
-            if isinstance(_state, (float, int)):
-                statsd_client.gauge(state.entity_id, _state, sample_rate)
+        elif isinstance(_state, (float, int)):
+            gauges.append((state.entity_id, _state))
 
-        # Increment the count
-        statsd_client.incr(state.entity_id, rate=sample_rate)
+        return gauges, state.entity_id
 
-    hass.bus.listen(EVENT_STATE_CHANGED, statsd_event_listener)
+    def send(self, records):
+        """Send a batch of stats.
 
-    return True
+        The pipeline packs the stats into as few packets as fit.
+        """
+        _LOGGER.debug("Sending %d state changes", len(records))
+
+        with self._client.pipeline() as pipe:
+            for gauges, entity_id in records:
+                for stat, value in gauges:
+                    pipe.gauge(stat, value, self._sample_rate)
+
+                # Increment the count
+                pipe.incr(entity_id, rate=self._sample_rate)
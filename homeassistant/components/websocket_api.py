@@ -5,9 +5,11 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/developers/websocket_api/
 """
 import asyncio
+from collections import OrderedDict
 from concurrent import futures
 from contextlib import suppress
 from functools import partial
+from itertools import count
 import json
 import logging
 
@@ -16,8 +18,8 @@ import voluptuous as vol
 from voluptuous.humanize import humanize_error
 
 from homeassistant.const import (
-    MATCH_ALL, EVENT_TIME_CHANGED, EVENT_HOMEASSISTANT_STOP,
-    __version__)
+    MATCH_ALL, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED,
+    EVENT_HOMEASSISTANT_STOP, __version__)
 from homeassistant.components import frontend
 from homeassistant.core import callback
 from homeassistant.remote import JSONEncoder
@@ -34,6 +36,11 @@ URL = '/api/websocket'
 DEPENDENCIES = ('http',)
 
 MAX_PENDING_MSG = 512
+MAX_COALESCE_TIME = 60
+
+CONF_COALESCE_WINDOW = 'coalesce_window'
+
+DATA_EVENT_SUBSCRIPTIONS = 'websocket_api_event_subscriptions'
 
 ERR_ID_REUSE = 1
 ERR_INVALID_FORMAT = 2
@@ -59,6 +66,13 @@ _LOGGER = logging.getLogger(__name__)
 
 JSON_DUMP = partial(json.dumps, cls=JSONEncoder)
 
+CONFIG_SCHEMA = vol.Schema({
+    DOMAIN: vol.Any(None, vol.Schema({
+        vol.Optional(CONF_COALESCE_WINDOW):
+            vol.All(cv.time_period, cv.positive_timedelta),
+    })),
+}, extra=vol.ALLOW_EXTRA)
+
 AUTH_MESSAGE_SCHEMA = vol.Schema({
     vol.Required('type'): TYPE_AUTH,
     vol.Required('api_password'): str,
@@ -160,6 +174,16 @@ def event_message(iden, event):
     }
 
 
+def event_message_json(iden, event):
+    """Return a JSON encoded event message.
+
+    Reuses the JSON representation of the event that is shared by all
+    connections.
+    """
+    return '{{"id": {}, "type": "{}", "event": {}}}'.format(
+        int(iden), TYPE_EVENT, event.as_json())
+
+
 def error_message(iden, code, message):
     """Return an error result message."""
     return {
@@ -193,10 +217,80 @@ def result_message(iden, result=None):
 
 async def async_setup(hass, config):
     """Initialize the websocket API."""
+    conf = config.get(DOMAIN) or {}
+    coalesce_window = conf.get(CONF_COALESCE_WINDOW)
+    if coalesce_window is not None:
+        coalesce_window = coalesce_window.total_seconds()
+
+    hass.data[DATA_EVENT_SUBSCRIPTIONS] = EventSubscriptions(
+        hass, coalesce_window)
     hass.http.register_view(WebsocketAPIView)
     return True
 
 
+class EventSubscriptions:
+    """Forward events to the connections that subscribed to them.
+
+    There is one bus listener per subscribed event type, however many
+    connections subscribed to it, and it runs in the event loop. The JSON
+    of an event is built once and shared by all the messages sent for it.
+    """
+
+    def __init__(self, hass, coalesce_window=None):
+        """Initialize the subscriptions."""
+        self.hass = hass
+        self.coalesce_window = coalesce_window
+        # Event type -> tuple of (connection, subscription id)
+        self._subscribers = {}
+        self._unsub_listeners = {}
+
+    @callback
+    def async_subscribe(self, connection, iden, event_type):
+        """Forward events of event_type to a connection.
+
+        Returns a function that removes the subscription.
+        """
+        subscriber = (connection, iden)
+        subscribers = self._subscribers.get(event_type, ())
+
+        if not subscribers:
+            @callback
+            def forward_events(event):
+                """Forward an event to the subscribed connections."""
+                self._async_forward(event_type, event)
+
+            self._unsub_listeners[event_type] = self.hass.bus.async_listen(
+                event_type, forward_events)
+
+        # Replaced instead of changed, so a connection can unsubscribe while
+        # an event is being forwarded
+        self._subscribers[event_type] = subscribers + (subscriber,)
+
+        @callback
+        def async_unsubscribe():
+            """Remove the subscription."""
+            subscribers = tuple(
+                sub for sub in self._subscribers[event_type]
+                if sub is not subscriber)
+
+            if subscribers:
+                self._subscribers[event_type] = subscribers
+            else:
+                self._subscribers.pop(event_type)
+                self._unsub_listeners.pop(event_type)()
+
+        return async_unsubscribe
+
+    @callback
+    def _async_forward(self, event_type, event):
+        """Send an event to the connections subscribed to event_type."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return
+
+        for connection, iden in self._subscribers.get(event_type, ()):
+            connection.send_event(iden, event)
+
+
 class WebsocketAPIView(HomeAssistantView):
     """View to serve a websockets endpoint."""
 
@@ -220,6 +314,14 @@ class ActiveConnection:
         self.wsock = None
         self.event_listeners = {}
         self.to_write = asyncio.Queue(maxsize=MAX_PENDING_MSG, loop=hass.loop)
+        self._subscriptions = hass.data[DATA_EVENT_SUBSCRIPTIONS]
+        # Events held back in order while the client is not keeping up,
+        # keyed by (subscription id, entity id) for state changes so only
+        # the latest one per entity is kept
+        self._coalesced = None
+        self._coalesce_start = None
+        self._held_ids = count()
+        self._flush_handle = None
         self._handle_task = None
         self._writer_task = None
 
@@ -240,7 +342,11 @@ class ActiveConnection:
                 if message is None:
                     break
                 self.debug("Sending", message)
-                await self.wsock.send_json(message, dumps=JSON_DUMP)
+
+                if isinstance(message, str):
+                    await self.wsock.send_str(message)
+                else:
+                    await self.wsock.send_json(message, dumps=JSON_DUMP)
 
     @callback
     def send_message_outside(self, message):
@@ -257,6 +363,83 @@ class ActiveConnection:
                            MAX_PENDING_MSG)
             self.cancel()
 
+    @callback
+    def send_event(self, iden, event):
+        """Send an event of a subscription to the client.
+
+        If the client is not reading the messages and a coalesce window is
+        configured, events are held back and sent once the window has
+        passed. Only the latest state change per entity is kept. Otherwise,
+        or if the client is still behind after MAX_COALESCE_TIME seconds,
+        the connection is closed.
+
+        Async friendly.
+        """
+        if self._coalesced is not None:
+            self._async_hold_back(iden, event)
+            return
+
+        try:
+            self.to_write.put_nowait(event_message_json(iden, event))
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self._subscriptions.coalesce_window is None:
+            self.log_error("Client exceeded max pending messages [2]:",
+                           MAX_PENDING_MSG)
+            self.cancel()
+            return
+
+        self.debug("Client is falling behind, holding back events")
+        self._coalesced = OrderedDict()
+        self._coalesce_start = self.hass.loop.time()
+        self._async_hold_back(iden, event)
+        self._async_schedule_flush()
+
+    @callback
+    def _async_hold_back(self, iden, event):
+        """Hold back an event, replacing an older state of its entity."""
+        if event.event_type == EVENT_STATE_CHANGED:
+            key = (iden, event.data.get('entity_id'))
+            if key in self._coalesced:
+                # Keep the events in the order they were fired
+                self._coalesced.move_to_end(key)
+        else:
+            key = (iden, next(self._held_ids))
+
+        self._coalesced[key] = event
+
+    @callback
+    def _async_schedule_flush(self):
+        """Queue the held back events after the coalesce window."""
+        self._flush_handle = self.hass.loop.call_later(
+            self._subscriptions.coalesce_window, self._async_flush_coalesced)
+
+    @callback
+    def _async_flush_coalesced(self):
+        """Queue the held back events that fit in the queue."""
+        self._flush_handle = None
+        coalesced = self._coalesced
+
+        while coalesced:
+            key = next(iter(coalesced))
+            try:
+                self.to_write.put_nowait(
+                    event_message_json(key[0], coalesced[key]))
+            except asyncio.QueueFull:
+                if (self.hass.loop.time() - self._coalesce_start >=
+                        MAX_COALESCE_TIME):
+                    self.log_error("Client did not catch up in seconds:",
+                                   MAX_COALESCE_TIME)
+                    self.cancel()
+                    return
+                self._async_schedule_flush()
+                return
+            del coalesced[key]
+
+        self._coalesced = None
+
     @callback
     def cancel(self):
         """Cancel the connection."""
@@ -385,6 +568,9 @@ class ActiveConnection:
             for unsub in self.event_listeners.values():
                 unsub()
 
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+
             try:
                 if final_message is not None:
                     self.to_write.put_nowait(final_message)
@@ -406,15 +592,8 @@ class ActiveConnection:
         """
         msg = SUBSCRIBE_EVENTS_MESSAGE_SCHEMA(msg)
 
-        async def forward_events(event):
-            """Forward events to websocket."""
-            if event.event_type == EVENT_TIME_CHANGED:
-                return
-
-            self.send_message_outside(event_message(msg['id'], event))
-
-        self.event_listeners[msg['id']] = self.hass.bus.async_listen(
-            msg['event_type'], forward_events)
+        self.event_listeners[msg['id']] = self._subscriptions.async_subscribe(
+            self, msg['id'], msg['event_type'])
 
         self.to_write.put_nowait(result_message(msg['id']))
 
@@ -429,6 +608,11 @@ class ActiveConnection:
 
         if subscription in self.event_listeners:
             self.event_listeners.pop(subscription)()
+
+            if self._coalesced:
+                for key in [key for key in self._coalesced
+                            if key[0] == subscription]:
+                    del self._coalesced[key]
             self.to_write.put_nowait(result_message(msg['id']))
         else:
             self.to_write.put_nowait(error_message(
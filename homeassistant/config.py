@@ -19,8 +19,10 @@ from homeassistant.const import (
     CONF_TIME_ZONE, CONF_ELEVATION, CONF_UNIT_SYSTEM_METRIC,
     CONF_UNIT_SYSTEM_IMPERIAL, CONF_TEMPERATURE_UNIT, TEMP_CELSIUS,
     __version__, CONF_CUSTOMIZE, CONF_CUSTOMIZE_DOMAIN, CONF_CUSTOMIZE_GLOB,
-    CONF_WHITELIST_EXTERNAL_DIRS)
-from homeassistant.core import callback, DOMAIN as CONF_CORE
+    CONF_WHITELIST_EXTERNAL_DIRS, CONF_EXECUTOR_POOLS, CONF_INTEGRATIONS,
+    CONF_MAX_WORKERS)
+from homeassistant.core import (
+    callback, DOMAIN as CONF_CORE, DEFAULT_POOL_MAX_WORKERS)
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.loader import get_component, get_platform
 from homeassistant.util.yaml import load_yaml, SECRET_YAML
@@ -152,6 +154,14 @@ CORE_CONFIG_SCHEMA = CUSTOMIZE_CONFIG_SCHEMA.extend({
         # pylint: disable=no-value-for-parameter
         vol.All(cv.ensure_list, [vol.IsDir()]),
     vol.Optional(CONF_PACKAGES, default={}): PACKAGES_CONFIG_SCHEMA,
+    vol.Optional(CONF_EXECUTOR_POOLS, default={}): vol.Schema({
+        cv.slug: vol.Schema({
+            vol.Optional(CONF_MAX_WORKERS, default=DEFAULT_POOL_MAX_WORKERS):
+                vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional(CONF_INTEGRATIONS, default=[]):
+                vol.All(cv.ensure_list, [cv.string]),
+        })
+    }),
 })
 
 
@@ -420,6 +430,12 @@ async def async_process_ha_core_config(hass, config):
         hac.whitelist_external_dirs.update(
             set(config[CONF_WHITELIST_EXTERNAL_DIRS]))
 
+    # Named executor pools and the integrations that use them
+    for name, pool_config in config[CONF_EXECUTOR_POOLS].items():
+        hac.executor_pool_workers[name] = pool_config[CONF_MAX_WORKERS]
+        for integration in pool_config[CONF_INTEGRATIONS]:
+            hac.executor_pool_integrations[integration] = name
+
     # Customize
     cust_exact = dict(config[CONF_CUSTOMIZE])
     cust_domain = dict(config[CONF_CUSTOMIZE_DOMAIN])
@@ -70,6 +70,7 @@ CONF_ENTITY_NAMESPACE = 'entity_namespace'
 CONF_ENTITY_PICTURE_TEMPLATE = 'entity_picture_template'
 CONF_EVENT = 'event'
 CONF_EXCLUDE = 'exclude'
+CONF_EXECUTOR_POOLS = 'executor_pools'
 CONF_FILE_PATH = 'file_path'
 CONF_FILENAME = 'filename'
 CONF_FOR = 'for'
@@ -82,6 +83,7 @@ CONF_HOSTS = 'hosts'
 CONF_ICON = 'icon'
 CONF_ICON_TEMPLATE = 'icon_template'
 CONF_INCLUDE = 'include'
+CONF_INTEGRATIONS = 'integrations'
 CONF_ID = 'id'
 CONF_IP_ADDRESS = 'ip_address'
 CONF_LATITUDE = 'latitude'
@@ -90,6 +92,7 @@ CONF_LIGHTS = 'lights'
 CONF_MAC = 'mac'
 CONF_METHOD = 'method'
 CONF_MAXIMUM = 'maximum'
+CONF_MAX_WORKERS = 'max_workers'
 CONF_MINIMUM = 'minimum'
 CONF_MODE = 'mode'
 CONF_MONITORED_CONDITIONS = 'monitored_conditions'
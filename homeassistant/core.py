@@ -6,7 +6,6 @@ of entities and react to changes.
 """
 # pylint: disable=unused-import, too-many-lines
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 import enum
 import logging
 import os
@@ -38,6 +37,7 @@ from homeassistant.util.async import (
     fire_coroutine_threadsafe)
 import homeassistant.util as util
 import homeassistant.util.dt as dt_util
+from homeassistant.util.executor import ExecutorPool
 import homeassistant.util.location as location
 from homeassistant.util.unit_system import UnitSystem, METRIC_SYSTEM  # NOQA
 
@@ -52,6 +52,14 @@ ENTITY_ID_PATTERN = re.compile(r"^(\w+)\.(\w+)$")
 # How long to wait till things that run on startup have to finish.
 TIMEOUT_EVENT_START = 15
 
+# The default executor pool adds workers while jobs are waiting, up to at
+# least the number of processors on the machine multiplied by 5
+DEFAULT_EXECUTOR_POOL = 'default'
+DEFAULT_EXECUTOR_MAX_WORKERS = max(64, (os.cpu_count() or 1) * 5)
+
+# Maximum number of workers of a named executor pool if not configured
+DEFAULT_POOL_MAX_WORKERS = 5
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -70,7 +78,7 @@ def valid_state(state: str) -> bool:
     return len(state) < 256
 
 
-def callback(func: Callable[..., None]) -> Callable[..., None]:
+def callback(func: Callable[..., Any]) -> Callable[..., Any]:
     """Annotation to mark method as safe to call from within the event loop."""
     # pylint: disable=protected-access
     func._hass_callback = True
@@ -82,6 +90,42 @@ def is_callback(func: Callable[..., Any]) -> bool:
     return '_hass_callback' in func.__dict__
 
 
+class HassJobType(enum.Enum):
+    """Represent how a job is run."""
+
+    Coroutinefunction = 1
+    Callback = 2
+    Executor = 3
+
+
+class HassJob(object):
+    """Represent a callable to be run as a job.
+
+    How the target is run is determined once when the job is created, so
+    running the job does not have to inspect the target again.
+    """
+
+    __slots__ = ['target', 'job_type']
+
+    def __init__(self, target: Callable[..., Any]) -> None:
+        """Create a job object."""
+        if asyncio.iscoroutine(target):
+            raise ValueError("Coroutine not allowed to be passed to HassJob")
+
+        self.target = target
+
+        if is_callback(target):
+            self.job_type = HassJobType.Callback
+        elif asyncio.iscoroutinefunction(target):
+            self.job_type = HassJobType.Coroutinefunction
+        else:
+            self.job_type = HassJobType.Executor
+
+    def __repr__(self):
+        """Return the job."""
+        return "<Job {} {}>".format(self.job_type, self.target)
+
+
 @callback
 def async_loop_exception_handler(loop, context):
     """Handle all exception inside the core loop."""
@@ -117,15 +161,9 @@ class HomeAssistant(object):
         else:
             self.loop = loop or asyncio.get_event_loop()
 
-        executor_opts = {'max_workers': 10}
-        if sys.version_info[:2] >= (3, 5):
-            # It will default set to the number of processors on the machine,
-            # multiplied by 5. That is better for overlap I/O workers.
-            executor_opts['max_workers'] = None
-        if sys.version_info[:2] >= (3, 6):
-            executor_opts['thread_name_prefix'] = 'SyncWorker'
-
-        self.executor = ThreadPoolExecutor(**executor_opts)
+        self.executor = ExecutorPool(
+            'SyncWorker', DEFAULT_EXECUTOR_MAX_WORKERS)
+        self.executor_pools = {DEFAULT_EXECUTOR_POOL: self.executor}
         self.loop.set_default_executor(self.executor)
         self.loop.set_exception_handler(async_loop_exception_handler)
         self._pending_tasks = []
@@ -204,7 +242,8 @@ class HomeAssistant(object):
         self.loop.call_soon_threadsafe(self.async_add_job, target, *args)
 
     @callback
-    def async_add_job(self, target: Callable[..., None], *args: Any) -> None:
+    def async_add_job(self, target: Callable[..., None],
+                      *args: Any) -> Optional[asyncio.Future]:
         """Add a job from within the eventloop.
 
         This method must be run in the event loop.
@@ -212,23 +251,89 @@ class HomeAssistant(object):
         target: target to call.
         args: parameters for method to call.
         """
-        task = None
-
         if asyncio.iscoroutine(target):
             task = self.loop.create_task(target)
-        elif is_callback(target):
-            self.loop.call_soon(target, *args)
-        elif asyncio.iscoroutinefunction(target):
-            task = self.loop.create_task(target(*args))
+
+            if self._track_task:
+                self._pending_tasks.append(task)
+
+            return task
+
+        return self.async_add_hass_job(HassJob(target), *args)
+
+    @callback
+    def async_add_hass_job(self, hassjob: HassJob,
+                           *args: Any) -> Optional[asyncio.Future]:
+        """Add a HassJob from within the event loop.
+
+        This method must be run in the event loop.
+
+        hassjob: HassJob to call.
+        args: parameters for method to call.
+        """
+        job_type = hassjob.job_type
+
+        if job_type is HassJobType.Callback:
+            self.loop.call_soon(hassjob.target, *args)
+            return None
+
+        if job_type is HassJobType.Coroutinefunction:
+            task = self.loop.create_task(hassjob.target(*args))
         else:
-            task = self.loop.run_in_executor(None, target, *args)
+            task = self.loop.run_in_executor(None, hassjob.target, *args)
 
         # If a task is scheduled
-        if self._track_task and task is not None:
+        if self._track_task:
+            self._pending_tasks.append(task)
+
+        return task
+
+    @callback
+    def async_add_executor_job(self, target: Callable[..., Any], *args: Any,
+                               pool: Optional[str] = None) -> asyncio.Future:
+        """Add an executor job from within the event loop.
+
+        This method must be run in the event loop.
+
+        target: target to call.
+        args: parameters for method to call.
+        pool: name of the executor pool, None for the default pool.
+        """
+        task = self.loop.run_in_executor(
+            self.async_get_executor_pool(pool), target, *args)
+
+        if self._track_task:
             self._pending_tasks.append(task)
 
         return task
 
+    @callback
+    def async_get_executor_pool(self, name: Optional[str] = None):
+        """Return an executor pool by name, creating it if needed.
+
+        This method must be run in the event loop.
+        """
+        if name is None:
+            return self.executor
+
+        pool = self.executor_pools.get(name)
+
+        if pool is None:
+            pool = self.executor_pools[name] = ExecutorPool(
+                name, self.config.executor_pool_workers.get(
+                    name, DEFAULT_POOL_MAX_WORKERS))
+
+        return pool
+
+    @callback
+    def async_executor_stats(self):
+        """Return queue depth, workers and job wait times per pool.
+
+        This method must be run in the event loop.
+        """
+        return {name: pool.stats() for name, pool
+                in self.executor_pools.items()}
+
     @callback
     def async_track_tasks(self):
         """Track tasks so you can wait for all tasks to be done."""
@@ -253,6 +358,20 @@ class HomeAssistant(object):
         else:
             self.async_add_job(target, *args)
 
+    @callback
+    def async_run_hass_job(self, hassjob: HassJob, *args: Any) -> None:
+        """Run a HassJob from within the event loop.
+
+        This method must be run in the event loop.
+
+        hassjob: HassJob to call.
+        args: parameters for method to call.
+        """
+        if hassjob.job_type is HassJobType.Callback:
+            hassjob.target(*args)
+        else:
+            self.async_add_hass_job(hassjob, *args)
+
     def block_till_done(self) -> None:
         """Block till all pending work is done."""
         run_coroutine_threadsafe(
@@ -291,7 +410,9 @@ class HomeAssistant(object):
         self.state = CoreState.not_running
         self.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
         await self.async_block_till_done()
-        self.executor.shutdown()
+
+        for pool in self.executor_pools.values():
+            pool.shutdown()
 
         self.exit_code = exit_code
         self.loop.stop()
@@ -311,7 +432,8 @@ class EventOrigin(enum.Enum):
 class Event(object):
     """Representation of an event within the bus."""
 
-    __slots__ = ['event_type', 'data', 'origin', 'time_fired']
+    __slots__ = ['event_type', 'data', 'origin', 'time_fired', '_as_json',
+                 '_data_json']
 
     def __init__(self, event_type, data=None, origin=EventOrigin.local,
                  time_fired=None):
@@ -320,6 +442,8 @@ class Event(object):
         self.data = data or {}
         self.origin = origin
         self.time_fired = time_fired or dt_util.utcnow()
+        self._as_json = None
+        self._data_json = None
 
     def as_dict(self):
         """Create a dict representation of this Event.
@@ -333,6 +457,46 @@ class Event(object):
             'time_fired': self.time_fired,
         }
 
+    def as_json(self):
+        """Return the JSON representation of this Event.
+
+        It is computed once and shared by everyone serializing this event.
+
+        Async friendly.
+        """
+        if self._as_json is None:
+            from homeassistant.remote import json_dumps
+            self._as_json = (
+                '{{"event_type": {}, "data": {}, "origin": {}, '
+                '"time_fired": {}}}'.format(
+                    json_dumps(self.event_type), self.data_json(),
+                    json_dumps(str(self.origin)),
+                    json_dumps(self.time_fired)))
+
+        return self._as_json
+
+    def data_json(self):
+        """Return the JSON representation of the event data.
+
+        States in the data reuse their own memoized JSON representation.
+
+        Async friendly.
+        """
+        if self._data_json is None:
+            from homeassistant.remote import json_dumps
+
+            if all(isinstance(key, str) for key in self.data):
+                self._data_json = '{{{}}}'.format(', '.join(
+                    '{}: {}'.format(
+                        json_dumps(key),
+                        value.as_json() if isinstance(value, State)
+                        else json_dumps(value))
+                    for key, value in self.data.items()))
+            else:
+                self._data_json = json_dumps(self.data)
+
+        return self._data_json
+
     def __repr__(self):
         """Return the representation."""
         # pylint: disable=maybe-no-member
@@ -405,8 +569,8 @@ class EventBus(object):
         if not listeners:
             return
 
-        for func in listeners:
-            self._hass.async_add_job(func, event)
+        for job in listeners:
+            self._hass.async_add_hass_job(job, event)
 
     def listen(self, event_type, listener):
         """Listen for all events or events of a specific type.
@@ -433,14 +597,19 @@ class EventBus(object):
 
         This method must be run in the event loop.
         """
+        return self._async_listen_job(event_type, HassJob(listener))
+
+    @callback
+    def _async_listen_job(self, event_type, hassjob):
+        """Add a job as listener of event_type and return its remover."""
         if event_type in self._listeners:
-            self._listeners[event_type].append(listener)
+            self._listeners[event_type].append(hassjob)
         else:
-            self._listeners[event_type] = [listener]
+            self._listeners[event_type] = [hassjob]
 
         def remove_listener():
             """Remove the listener."""
-            self._async_remove_listener(event_type, listener)
+            self._async_remove_listener(event_type, hassjob)
 
         return remove_listener
 
@@ -474,6 +643,9 @@ class EventBus(object):
 
         This method must be run in the event loop.
         """
+        job = HassJob(listener)
+        onetime_job = None
+
         @callback
         def onetime_listener(event):
             """Remove listener from eventbus and then fire listener."""
@@ -485,19 +657,20 @@ class EventBus(object):
             # multiple times as well.
             # This will make sure the second time it does nothing.
             setattr(onetime_listener, 'run', True)
-            self._async_remove_listener(event_type, onetime_listener)
-            self._hass.async_run_job(listener, event)
+            self._async_remove_listener(event_type, onetime_job)
+            self._hass.async_run_hass_job(job, event)
 
-        return self.async_listen(event_type, onetime_listener)
+        onetime_job = HassJob(onetime_listener)
+        return self._async_listen_job(event_type, onetime_job)
 
     @callback
-    def _async_remove_listener(self, event_type, listener):
-        """Remove a listener of a specific event_type.
+    def _async_remove_listener(self, event_type, hassjob):
+        """Remove a listener job of a specific event_type.
 
         This method must be run in the event loop.
         """
         try:
-            self._listeners[event_type].remove(listener)
+            self._listeners[event_type].remove(hassjob)
 
             # delete event_type list if empty
             if not self._listeners[event_type]:
@@ -505,7 +678,8 @@ class EventBus(object):
         except (KeyError, ValueError):
             # KeyError is key event_type listener did not exist
             # ValueError if listener did not exist within event_type
-            _LOGGER.warning("Unable to remove unknown listener %s", listener)
+            _LOGGER.warning("Unable to remove unknown listener %s",
+                            hassjob.target)
 
 
 class State(object):
@@ -519,7 +693,7 @@ class State(object):
     """
 
     __slots__ = ['entity_id', 'state', 'attributes',
-                 'last_changed', 'last_updated']
+                 'last_changed', 'last_updated', '_as_json']
 
     def __init__(self, entity_id, state, attributes=None, last_changed=None,
                  last_updated=None):
@@ -538,9 +712,14 @@ class State(object):
 
         self.entity_id = entity_id.lower()
         self.state = state
-        self.attributes = MappingProxyType(attributes or {})
+        # Read-only mappings are shared instead of wrapped again
+        if isinstance(attributes, MappingProxyType):
+            self.attributes = attributes
+        else:
+            self.attributes = MappingProxyType(attributes or {})
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
+        self._as_json = None
 
     @property
     def domain(self):
@@ -573,6 +752,19 @@ class State(object):
                 'last_changed': self.last_changed,
                 'last_updated': self.last_updated}
 
+    def as_json(self):
+        """Return the JSON representation of the State.
+
+        It is computed once and shared by everyone serializing this state.
+
+        Async friendly.
+        """
+        if self._as_json is None:
+            from homeassistant.remote import json_dumps
+            self._as_json = json_dumps(self.as_dict())
+
+        return self._as_json
+
     @classmethod
     def from_dict(cls, json_dict):
         """Initialize a state from a dict.
@@ -600,10 +792,11 @@ class State(object):
 
     def __eq__(self, other):
         """Return the comparison of the state."""
-        return (self.__class__ == other.__class__ and
+        return (isinstance(other, State) and
                 self.entity_id == other.entity_id and
                 self.state == other.state and
-                self.attributes == other.attributes)
+                (self.attributes is other.attributes or
+                 self.attributes == other.attributes))
 
     def __repr__(self):
         """Return the representation of the states."""
@@ -621,6 +814,11 @@ class StateMachine(object):
     def __init__(self, bus, loop):
         """Initialize state machine."""
         self._states = {}
+        # Secondary index of the states per domain
+        self._domains = {}
+        # Sorted entity ids per domain, None for all, until one is added or
+        # removed
+        self._sorted_entity_ids = {}
         self._bus = bus
         self._loop = loop
 
@@ -640,22 +838,56 @@ class StateMachine(object):
         if domain_filter is None:
             return list(self._states.keys())
 
-        domain_filter = domain_filter.lower()
+        return list(self._domains.get(domain_filter.lower(), ()))
+
+    @callback
+    def async_sorted_entity_ids(self, domain_filter=None):
+        """Return a sorted tuple of the entity ids that are being tracked.
+
+        The result is cached until an entity of the domain is added or
+        removed.
+
+        This method must be run in the event loop.
+        """
+        if domain_filter is not None:
+            domain_filter = domain_filter.lower()
 
-        return [state.entity_id for state in self._states.values()
-                if state.domain == domain_filter]
+        entity_ids = self._sorted_entity_ids.get(domain_filter)
+
+        if entity_ids is None:
+            if domain_filter is None:
+                entity_ids = tuple(sorted(self._states))
+            else:
+                entity_ids = tuple(sorted(
+                    self._domains.get(domain_filter, ())))
+            self._sorted_entity_ids[domain_filter] = entity_ids
+
+        return entity_ids
 
     def all(self):
         """Create a list of all states."""
         return run_callback_threadsafe(self._loop, self.async_all).result()
 
     @callback
-    def async_all(self):
-        """Create a list of all states.
+    def async_all(self, domain_filter=None):
+        """Create a list of all states, optionally of a single domain.
+
+        This method must be run in the event loop.
+        """
+        if domain_filter is None:
+            return list(self._states.values())
+
+        return list(self._domains.get(domain_filter.lower(), {}).values())
+
+    @callback
+    def async_all_sorted(self, domain_filter=None):
+        """Create a list of all states sorted by entity id.
 
         This method must be run in the event loop.
         """
-        return list(self._states.values())
+        states = self._states
+        return [states[entity_id] for entity_id
+                in self.async_sorted_entity_ids(domain_filter)]
 
     def get(self, entity_id):
         """Retrieve state of entity_id or None if not found.
@@ -694,6 +926,12 @@ class StateMachine(object):
         if old_state is None:
             return False
 
+        domain_states = self._domains[old_state.domain]
+        del domain_states[entity_id]
+        if not domain_states:
+            del self._domains[old_state.domain]
+        self._async_invalidate_sorted(old_state.domain)
+
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
@@ -733,32 +971,47 @@ class StateMachine(object):
         is_existing = old_state is not None
         same_state = (is_existing and old_state.state == new_state and
                       not force_update)
-        same_attr = is_existing and old_state.attributes == attributes
+        same_attr = is_existing and (
+            old_state.attributes is attributes or
+            old_state.attributes == attributes)
 
         if same_state and same_attr:
             return
 
+        # Share the read-only attributes of the previous state if unchanged
+        if same_attr:
+            attributes = old_state.attributes
+
         last_changed = old_state.last_changed if same_state else None
         state = State(entity_id, new_state, attributes, last_changed)
         self._states[entity_id] = state
+        domain = split_entity_id(entity_id)[0]
+        self._domains.setdefault(domain, {})[entity_id] = state
+        if not is_existing:
+            self._async_invalidate_sorted(domain)
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
             'old_state': old_state,
             'new_state': state,
         })
 
+    @callback
+    def _async_invalidate_sorted(self, domain):
+        """Forget the sorted entity ids after an entity came or went."""
+        self._sorted_entity_ids.pop(domain, None)
+        self._sorted_entity_ids.pop(None, None)
+
 
 class Service(object):
     """Representation of a callable service."""
 
-    __slots__ = ['func', 'schema', 'is_callback', 'is_coroutinefunction']
+    __slots__ = ['func', 'schema', 'job']
 
     def __init__(self, func, schema):
         """Initialize a service."""
         self.func = func
         self.schema = schema
-        self.is_callback = is_callback(func)
-        self.is_coroutinefunction = asyncio.iscoroutinefunction(func)
+        self.job = HassJob(func)
 
 
 class ServiceCall(object):
@@ -981,8 +1234,7 @@ class ServiceRegistry(object):
 
             data = {ATTR_SERVICE_CALL_ID: call_id}
 
-            if (service_handler.is_coroutinefunction or
-                    service_handler.is_callback):
+            if service_handler.job.job_type is not HassJobType.Executor:
                 self._hass.bus.async_fire(EVENT_SERVICE_EXECUTED, data)
             else:
                 self._hass.bus.fire(EVENT_SERVICE_EXECUTED, data)
@@ -999,10 +1251,12 @@ class ServiceRegistry(object):
         service_call = ServiceCall(domain, service, service_data, call_id)
 
         try:
-            if service_handler.is_callback:
+            job_type = service_handler.job.job_type
+
+            if job_type is HassJobType.Callback:
                 service_handler.func(service_call)
                 fire_service_executed()
-            elif service_handler.is_coroutinefunction:
+            elif job_type is HassJobType.Coroutinefunction:
                 await service_handler.func(service_call)
                 fire_service_executed()
             else:
@@ -1011,7 +1265,9 @@ class ServiceRegistry(object):
                     service_handler.func(service_call)
                     fire_service_executed()
 
-                await self._hass.async_add_job(execute_service)
+                await self._hass.async_add_executor_job(
+                    execute_service,
+                    pool=self._hass.config.executor_pool(domain))
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception('Error executing service %s', service_call)
 
@@ -1043,6 +1299,13 @@ class Config(object):
         # List of allowed external dirs to access
         self.whitelist_external_dirs = set()
 
+        # Maximum number of workers of the named executor pools
+        self.executor_pool_workers = {}
+
+        # Executor pool names by integration, as domain, platform or
+        # domain.platform
+        self.executor_pool_integrations = {}
+
     def distance(self: object, lat: float, lon: float) -> float:
         """Calculate distance from Home Assistant.
 
@@ -1051,6 +1314,22 @@ class Config(object):
         return self.units.length(
             location.distance(self.latitude, self.longitude, lat, lon), 'm')
 
+    def executor_pool(self, domain: str,
+                      platform: Optional[str] = None) -> Optional[str]:
+        """Return the executor pool name of an integration.
+
+        None means the default pool. Async friendly.
+        """
+        pools = self.executor_pool_integrations
+
+        if platform is not None:
+            name = pools.get('{}.{}'.format(domain, platform),
+                             pools.get(platform))
+            if name is not None:
+                return name
+
+        return pools.get(domain)
+
     def path(self, *path):
         """Generate path to the file within the configuration directory.
 
@@ -1,13 +1,35 @@
 """Helpers for Home Assistant dispatcher & internal component/platform."""
 import logging
+import time
 
-from homeassistant.core import callback
+from homeassistant.core import HassJob, HassJobType, callback
 from homeassistant.loader import bind_hass
 from homeassistant.util.async import run_callback_threadsafe
 
 
 _LOGGER = logging.getLogger(__name__)
 DATA_DISPATCHER = 'dispatcher'
+DATA_DISPATCHER_STATS = 'dispatcher_stats'
+
+
+class SignalStats(object):
+    """Send count and time spent dispatching a signal."""
+
+    __slots__ = ['count', 'total_time', 'max_time']
+
+    def __init__(self):
+        """Initialize the stats."""
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def as_dict(self):
+        """Return a dictionary representation of the stats."""
+        return {
+            'count': self.count,
+            'total_time': self.total_time,
+            'max_time': self.max_time,
+        }
 
 
 @bind_hass
@@ -32,22 +54,36 @@ def async_dispatcher_connect(hass, signal, target):
     """
     if DATA_DISPATCHER not in hass.data:
         hass.data[DATA_DISPATCHER] = {}
+        hass.data[DATA_DISPATCHER_STATS] = {}
 
-    if signal not in hass.data[DATA_DISPATCHER]:
-        hass.data[DATA_DISPATCHER][signal] = []
+    dispatcher = hass.data[DATA_DISPATCHER]
+    stats = hass.data[DATA_DISPATCHER_STATS]
+    job = HassJob(target)
+    # The target tuples are replaced instead of changed, so a send that
+    # is running can keep iterating over the targets it started with
+    dispatcher[signal] = dispatcher.get(signal, ()) + (job,)
 
-    hass.data[DATA_DISPATCHER][signal].append(target)
+    # Stats are only kept while a signal has targets
+    if signal not in stats:
+        stats[signal] = SignalStats()
 
     @callback
     def async_remove_dispatcher():
         """Remove signal listener."""
-        try:
-            hass.data[DATA_DISPATCHER][signal].remove(target)
-        except (KeyError, ValueError):
-            # KeyError is key target listener did not exist
-            # ValueError if listener did not exist within signal
+        targets = dispatcher.get(signal, ())
+
+        if job not in targets:
             _LOGGER.warning(
                 "Unable to remove unknown dispatcher %s", target)
+            return
+
+        targets = tuple(tgt for tgt in targets if tgt is not job)
+
+        if targets:
+            dispatcher[signal] = targets
+        else:
+            dispatcher.pop(signal)
+            stats.pop(signal, None)
 
     return async_remove_dispatcher
 
@@ -63,9 +99,47 @@ def dispatcher_send(hass, signal, *args):
 def async_dispatcher_send(hass, signal, *args):
     """Send signal and data.
 
+    Callback targets are run before this returns, coroutine functions are
+    scheduled as tasks and other functions are run in the executor.
+
     This method must be run in the event loop.
     """
-    target_list = hass.data.get(DATA_DISPATCHER, {}).get(signal, [])
+    targets = hass.data.get(DATA_DISPATCHER, {}).get(signal)
+
+    if not targets:
+        return
+
+    start = time.perf_counter()
 
-    for target in target_list:
-        hass.async_add_job(target, *args)
+    for job in targets:
+        if job.job_type is HassJobType.Callback:
+            try:
+                job.target(*args)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error dispatching %s to %s",
+                                  signal, job.target)
+        else:
+            hass.async_add_hass_job(job, *args)
+
+    elapsed = time.perf_counter() - start
+
+    # A target may have removed the last target of the signal
+    stats = hass.data[DATA_DISPATCHER_STATS].get(signal)
+    if stats is None:
+        return
+
+    stats.count += 1
+    stats.total_time += elapsed
+    if elapsed > stats.max_time:
+        stats.max_time = elapsed
+
+
+@callback
+@bind_hass
+def async_dispatcher_stats(hass):
+    """Return the send count and dispatch times per signal.
+
+    This method must be run in the event loop.
+    """
+    return {signal: stats.as_dict() for signal, stats
+            in hass.data.get(DATA_DISPATCHER_STATS, {}).items()}
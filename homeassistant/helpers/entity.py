@@ -183,6 +183,13 @@ class Entity(object):
     # are used to perform a very specific function. Overwriting these may
     # produce undesirable effects in the entity's operation.
 
+    @property
+    def executor_pool(self):
+        """Return the name of the executor pool running the sync methods."""
+        if self.platform is None:
+            return None
+        return self.platform.executor_pool
+
     @asyncio.coroutine
     def async_update_ha_state(self, force_refresh=False):
         """Update Home Assistant with current state of entity.
@@ -324,7 +331,8 @@ class Entity(object):
                 # pylint: disable=no-member
                 yield from self.async_update()
             else:
-                yield from self.hass.async_add_job(self.update)
+                yield from self.hass.async_add_executor_job(
+                    self.update, pool=self.executor_pool)
         finally:
             self._update_staged = False
             if warning:
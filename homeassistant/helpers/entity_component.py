@@ -3,7 +3,7 @@ import asyncio
 from datetime import timedelta
 from itertools import chain
 
-from homeassistant import config as conf_util
+from homeassistant import config as conf_util, startup_profiler
 from homeassistant.setup import async_prepare_setup_platform
 from homeassistant.const import (
     ATTR_ENTITY_ID, CONF_SCAN_INTERVAL, CONF_ENTITY_NAMESPACE)
@@ -13,8 +13,10 @@ from homeassistant.helpers import config_per_platform, discovery
 from homeassistant.helpers.service import extract_entity_ids
 from homeassistant.util import slugify
 from .entity_platform import EntityPlatform
+from .event import async_call_later
 
 DEFAULT_SCAN_INTERVAL = timedelta(seconds=15)
+GROUP_UPDATE_DELAY = 1
 
 
 class EntityComponent(object):
@@ -38,6 +40,8 @@ class EntityComponent(object):
         self.group_name = group_name
 
         self.config = None
+        self._group_update = None
+        self._group_written = None
 
         self._platforms = {
             domain: EntityPlatform(
@@ -102,6 +106,11 @@ class EntityComponent(object):
         discovery.async_listen_platform(
             self.hass, self.domain, component_platform_discovered)
 
+        # Components that depend on this one can read the group in setup
+        if self._group_update is not None:
+            self._group_update()
+            self._async_write_group()
+
     @callback
     def async_extract_from_service(self, service, expand_group=True):
         """Extract all known and available entities from a service call.
@@ -153,18 +162,39 @@ class EntityComponent(object):
         else:
             entity_platform = self._platforms[key]
 
-        await entity_platform.async_setup(
-            platform, platform_config, discovery_info)
+        await startup_profiler.async_timed_setup(
+            self.hass, '{}.{}'.format(self.domain, platform_type),
+            entity_platform.async_setup(
+                platform, platform_config, discovery_info))
 
     @callback
     def _async_update_group(self):
         """Set up and/or update component group.
 
+        Rewriting the group costs as much as the group has entities. After
+        a write, batches that are added within GROUP_UPDATE_DELAY seconds,
+        like discovered devices, are put in the group with a single update.
+
         This method must be run in the event loop.
         """
-        if self.group_name is None:
+        if self.group_name is None or self._group_update is not None:
+            return
+
+        if (self._group_written is not None and
+                self.hass.loop.time() - self._group_written <
+                GROUP_UPDATE_DELAY):
+            self._group_update = async_call_later(
+                self.hass, GROUP_UPDATE_DELAY, self._async_write_group)
             return
 
+        self._async_write_group()
+
+    @callback
+    def _async_write_group(self, now=None):
+        """Write the entities of all platforms to the component group."""
+        self._group_update = None
+        self._group_written = self.hass.loop.time()
+
         ids = [entity.entity_id for entity in
                sorted(self.entities,
                       key=lambda entity: entity.name or entity.entity_id)]
@@ -190,6 +220,11 @@ class EntityComponent(object):
         }
         self.config = None
 
+        if self._group_update is not None:
+            self._group_update()
+            self._group_update = None
+        self._group_written = None
+
         if self.group_name is not None:
             self.hass.components.group.async_remove(slugify(self.group_name))
 
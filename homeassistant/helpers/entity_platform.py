@@ -1,21 +1,42 @@
 """Class to manage the entities for a single platform."""
 import asyncio
 from datetime import timedelta
+import heapq
+import itertools
+from timeit import default_timer as timer
 
-from homeassistant.const import DEVICE_DEFAULT_NAME
+from homeassistant.const import (
+    ATTR_NOW, DEVICE_DEFAULT_NAME, EVENT_HOMEASSISTANT_STOP,
+    EVENT_TIME_CHANGED)
 from homeassistant.core import callback, valid_entity_id, split_entity_id
 from homeassistant.exceptions import HomeAssistantError, PlatformNotReady
+from homeassistant.loader import bind_hass
 from homeassistant.util.async import (
     run_callback_threadsafe, run_coroutine_threadsafe)
 import homeassistant.util.dt as dt_util
 
-from .event import async_track_time_interval, async_track_point_in_time
+from .event import async_track_point_in_time
 from .entity_registry import async_get_registry
 
 SLOW_SETUP_WARNING = 10
 SLOW_SETUP_MAX_WAIT = 60
 PLATFORM_NOT_READY_RETRIES = 10
 
+DATA_POLL_SCHEDULER = 'entity_poll_scheduler'
+DATA_POLL_STATS = 'entity_poll_stats'
+
+# The first poll of the n-th polled entity is offset by the fractional
+# part of n times the golden ratio, which keeps the polls evenly spread
+# over the scan interval however many entities there are.
+GOLDEN_RATIO_FRACTION = (5 ** .5 - 1) / 2
+
+# An entity is polled at most every SLOW_POLL_FACTOR times its average
+# update duration, even if its scan interval is shorter
+SLOW_POLL_FACTOR = 2
+
+# Weight of the last update in the average update duration of an entity
+POLL_DURATION_WEIGHT = .2
+
 
 class EntityPlatform(object):
     """Manage the entities for a single platform."""
@@ -44,8 +65,14 @@ class EntityPlatform(object):
         self.async_entities_added_callback = async_entities_added_callback
         self.entities = {}
         self._tasks = []
-        self._async_unsub_polling = None
-        self._process_updates = asyncio.Lock(loop=hass.loop)
+        self._polls = {}
+        self.executor_pool = hass.config.executor_pool(domain, platform_name)
+
+        full_name = '{}.{}'.format(domain, platform_name)
+        stats = hass.data.setdefault(DATA_POLL_STATS, {})
+        self.poll_stats = stats.get(full_name)
+        if self.poll_stats is None:
+            self.poll_stats = stats[full_name] = PollStats()
 
         if parallel_updates:
             self.parallel_updates = asyncio.Semaphore(
@@ -97,9 +124,14 @@ class EntityPlatform(object):
             logger.warning(
                 'Platform %s not ready yet. Retrying in %d seconds.',
                 self.platform_name, wait_time)
+
+            async def setup_again(now):
+                """Run setup again."""
+                await self.async_setup(
+                    platform, platform_config, discovery_info, tries)
+
             async_track_point_in_time(
-                hass, self.async_setup(
-                    platform, platform_config, discovery_info, tries),
+                hass, setup_again,
                 dt_util.utcnow() + timedelta(seconds=wait_time))
         except asyncio.TimeoutError:
             logger.error(
@@ -151,29 +183,21 @@ class EntityPlatform(object):
             return
 
         hass = self.hass
-        component_entities = set(hass.states.async_entity_ids(self.domain))
+        # Entity ids of this batch that may not have a state yet
+        added_entity_ids = set()
 
         registry = await async_get_registry(hass)
 
         tasks = [
             self._async_add_entity(entity, update_before_add,
-                                   component_entities, registry)
+                                   added_entity_ids, registry)
             for entity in new_entities]
 
         await asyncio.wait(tasks, loop=self.hass.loop)
         self.async_entities_added_callback()
 
-        if self._async_unsub_polling is not None or \
-           not any(entity.should_poll for entity
-                   in self.entities.values()):
-            return
-
-        self._async_unsub_polling = async_track_time_interval(
-            self.hass, self._update_entity_states, self.scan_interval
-        )
-
     async def _async_add_entity(self, entity, update_before_add,
-                                component_entities, registry):
+                                added_entity_ids, registry):
         """Helper method to add an entity to the platform."""
         if entity is None:
             raise ValueError('Entity cannot be None')
@@ -243,7 +267,9 @@ class EntityPlatform(object):
         if not valid_entity_id(entity.entity_id):
             raise HomeAssistantError(
                 'Invalid entity id: {}'.format(entity.entity_id))
-        elif entity.entity_id in component_entities:
+        elif (entity.entity_id in added_entity_ids or
+              (split_entity_id(entity.entity_id)[0] == self.domain and
+               self.hass.states.get(entity.entity_id) is not None)):
             msg = 'Entity id already exists: {}'.format(entity.entity_id)
             if entity.unique_id is not None:
                 msg += '. Platform {} does not generate unique IDs'.format(
@@ -252,13 +278,22 @@ class EntityPlatform(object):
                 msg)
 
         self.entities[entity.entity_id] = entity
-        component_entities.add(entity.entity_id)
+        added_entity_ids.add(entity.entity_id)
 
         if hasattr(entity, 'async_added_to_hass'):
             await entity.async_added_to_hass()
 
         await entity.async_update_ha_state()
 
+        if entity.entity_id in self.entities:
+            scheduler = self.hass.data.get(DATA_POLL_SCHEDULER)
+
+            if scheduler is None:
+                scheduler = self.hass.data[DATA_POLL_SCHEDULER] = \
+                    _PollScheduler(self.hass)
+
+            self._polls[entity.entity_id] = scheduler.async_add(self, entity)
+
     async def async_reset(self):
         """Remove all entities and reset data.
 
@@ -272,51 +307,230 @@ class EntityPlatform(object):
 
         await asyncio.wait(tasks, loop=self.hass.loop)
 
-        if self._async_unsub_polling is not None:
-            self._async_unsub_polling()
-            self._async_unsub_polling = None
-
     async def async_remove_entity(self, entity_id):
         """Remove entity id from platform."""
         await self._async_remove_entity(entity_id)
 
-        # Clean up polling job if no longer needed
-        if (self._async_unsub_polling is not None and
-                not any(entity.should_poll for entity
-                        in self.entities.values())):
-            self._async_unsub_polling()
-            self._async_unsub_polling = None
-
     async def _async_remove_entity(self, entity_id):
         """Remove entity id from platform."""
         entity = self.entities.pop(entity_id)
 
+        poll = self._polls.pop(entity_id, None)
+        if poll is not None:
+            poll.removed = True
+
         if hasattr(entity, 'async_will_remove_from_hass'):
             await entity.async_will_remove_from_hass()
 
         self.hass.states.async_remove(entity_id)
 
-    async def _update_entity_states(self, now):
-        """Update the states of all the polling entities.
 
-        To protect from flooding the executor, we will update async entities
-        in parallel and other entities sequential.
+class PollStats(object):
+    """Poll count, skipped polls, lag and update time of a platform."""
+
+    __slots__ = ['count', 'skipped', 'total_lag', 'max_lag', 'total_time',
+                 'max_time']
+
+    def __init__(self):
+        """Initialize the stats."""
+        self.count = 0
+        self.skipped = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def as_dict(self):
+        """Return a dictionary representation of the stats."""
+        return {
+            'count': self.count,
+            'skipped': self.skipped,
+            'total_lag': self.total_lag,
+            'max_lag': self.max_lag,
+            'total_time': self.total_time,
+            'max_time': self.max_time,
+        }
+
+
+@callback
+@bind_hass
+def async_poll_stats(hass):
+    """Return the poll counts and poll lag in seconds per platform.
+
+    This method must be run in the event loop.
+    """
+    return {name: stats.as_dict() for name, stats
+            in hass.data.get(DATA_POLL_STATS, {}).items()}
+
+
+class _PolledEntity(object):
+    """Poll interval and average update duration of an entity."""
+
+    __slots__ = ['platform', 'entity', 'interval', 'duration', 'removed']
+
+    def __init__(self, platform, entity):
+        """Initialize the poll of an entity."""
+        self.platform = platform
+        self.entity = entity
+        self.interval = platform.scan_interval
+        self.duration = None
+        self.removed = False
+
+
+class _PollScheduler(object):
+    """Poll the entities of all platforms from a single heap.
+
+    The polls are spread over the scan interval instead of updating all
+    entities of a platform, and all platforms with the same interval, in
+    the same second. The next poll of an entity is scheduled once its
+    update is done; entities whose updates take long are polled less
+    often. Whether an entity should be polled is checked each time a poll
+    is due.
+
+    A loop timer starts the polls at the time they are due. The time
+    changed event starts them as well, which keeps the polls in step with
+    the time of Home Assistant.
+    """
+
+    def __init__(self, hass):
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._heap = []
+        self._counter = itertools.count()
+        self._added = itertools.count()
+        self._now = dt_util.utcnow()
+        self._timer = None
+        self._stopped = False
+        hass.bus.async_listen(EVENT_TIME_CHANGED, self._async_time_changed)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop)
 
-        This method must be run in the event loop.
+    @callback
+    def async_add(self, platform, entity):
+        """Start polling an entity and return its poll.
+
+        Set removed on the poll to stop polling.
         """
-        if self._process_updates.locked():
-            self.logger.warning(
-                "Updating %s %s took longer than the scheduled update "
-                "interval %s", self.platform_name, self.domain,
-                self.scan_interval)
+        poll = _PolledEntity(platform, entity)
+        offset = next(self._added) * GOLDEN_RATIO_FRACTION % 1
+        due = dt_util.utcnow() + poll.interval * (1 - offset)
+        self._async_push(due, poll)
+        return poll
+
+    @callback
+    def _async_stop(self, event):
+        """Stop the loop timer."""
+        self._stopped = True
+        if self._timer is not None:
+            self._timer[1].cancel()
+            self._timer = None
+
+    @callback
+    def _async_push(self, due, poll):
+        """Add a poll to the heap."""
+        heapq.heappush(self._heap, (due, next(self._counter), poll))
+        self._async_set_timer()
+
+    @callback
+    def _async_set_timer(self):
+        """Set the loop timer for the first poll that is due."""
+        if self._stopped or not self._heap:
             return
 
-        with (await self._process_updates):
-            tasks = []
-            for entity in self.entities.values():
-                if not entity.should_poll:
-                    continue
-                tasks.append(entity.async_update_ha_state(True))
+        due = self._heap[0][0]
+
+        if self._timer is not None:
+            if self._timer[0] <= due:
+                return
+            self._timer[1].cancel()
+
+        delay = max(0, (due - dt_util.utcnow()).total_seconds())
+        self._timer = (due, self._hass.loop.call_later(
+            delay, self._async_timer_fired))
+
+    @callback
+    def _async_timer_fired(self):
+        """Start the polls that are due and set the next timer."""
+        self._timer = None
+        self._async_start_due(dt_util.utcnow())
+        self._async_set_timer()
+
+    @callback
+    def _async_time_changed(self, event):
+        """Start the polls that are due."""
+        self._async_start_due(event.data[ATTR_NOW])
+
+    @callback
+    def _async_start_due(self, now):
+        """Start the polls that are due at now."""
+        self._now = now
+        heap = self._heap
+
+        while heap and heap[0][0] <= now:
+            due, _, poll = heapq.heappop(heap)
+
+            if poll.removed:
+                continue
+
+            if poll.entity.should_poll:
+                self._hass.async_add_job(
+                    self._async_poll(poll, due, now, timer()))
+            else:
+                self._async_schedule(poll, due, now)
+
+    async def _async_poll(self, poll, due, now, queued):
+        """Update the entity and schedule its next poll."""
+        lag = (now - due).total_seconds() + timer() - queued
+        start = timer()
+
+        try:
+            await poll.entity.async_update_ha_state(True)
+        finally:
+            self._async_polled(poll, due, lag, timer() - start)
+
+    @callback
+    def _async_polled(self, poll, due, lag, duration):
+        """Record a finished poll and schedule the next one."""
+        stats = poll.platform.poll_stats
+        stats.count += 1
+        stats.total_lag += lag
+        stats.total_time += duration
+        if lag > stats.max_lag:
+            stats.max_lag = lag
+        if duration > stats.max_time:
+            stats.max_time = duration
+
+        if poll.duration is None:
+            poll.duration = duration
+        else:
+            poll.duration += POLL_DURATION_WEIGHT * (duration - poll.duration)
+
+        poll.interval = max(
+            poll.platform.scan_interval,
+            timedelta(seconds=SLOW_POLL_FACTOR * poll.duration))
+
+        skipped = self._async_schedule(poll, due, self._now)
+
+        if skipped:
+            stats.skipped += skipped
+            poll.platform.logger.warning(
+                "Updating %s took longer than the scheduled update "
+                "interval %s", poll.entity.entity_id, poll.interval)
+
+    @callback
+    def _async_schedule(self, poll, due, now):
+        """Schedule the next poll one interval after due.
+
+        Returns the number of polls skipped because they are already past.
+        """
+        if poll.removed:
+            return 0
+
+        due += poll.interval
+        skipped = 0
+
+        if due <= now:
+            skipped = (now - due) // poll.interval + 1
+            due += poll.interval * skipped
 
-            if tasks:
-                await asyncio.wait(tasks, loop=self.hass.loop)
+        self._async_push(due, poll)
+        return skipped
@@ -7,12 +7,14 @@ The Entity Registry will persist itself 10 seconds after a new entity is
 registered. Registering a new entity while a timer is in progress resets the
 timer.
 
+The registry is stored as JSON. A registry stored in the YAML format of
+earlier versions is loaded once and saved as JSON.
+
 After initializing, call EntityRegistry.async_ensure_loaded to load the data
 from disk.
 """
 
 from collections import OrderedDict
-from itertools import chain
 import logging
 import os
 import weakref
@@ -21,10 +23,12 @@ import attr
 
 from ..core import callback, split_entity_id
 from ..loader import bind_hass
-from ..util import ensure_unique_string, slugify
-from ..util.yaml import load_yaml, save_yaml
+from ..util import slugify
+from ..util.json import load_json, save_json
+from ..util.yaml import load_yaml
 
-PATH_REGISTRY = 'entity_registry.yaml'
+PATH_REGISTRY = 'entity_registry.json'
+PATH_REGISTRY_YAML = 'entity_registry.yaml'
 DATA_REGISTRY = 'entity_registry'
 SAVE_DELAY = 10
 _LOGGER = logging.getLogger(__name__)
@@ -74,10 +78,29 @@ class EntityRegistry:
     def __init__(self, hass):
         """Initialize the registry."""
         self.hass = hass
-        self.entities = None
+        self._entities = None
+        # (domain, platform, unique_id) -> entity_id
+        self._index = None
         self._load_task = None
         self._sched_save = None
 
+    @property
+    def entities(self):
+        """Return the registered entries by entity_id."""
+        return self._entities
+
+    @entities.setter
+    def entities(self, entities):
+        """Replace the registered entries and index them."""
+        self._entities = entities
+
+        if entities is None:
+            self._index = None
+        else:
+            self._index = {
+                (entry.domain, entry.platform, entry.unique_id): entity_id
+                for entity_id, entry in entities.items()}
+
     @callback
     def async_is_registered(self, entity_id):
         """Check if an entity_id is currently registered."""
@@ -89,20 +112,25 @@ class EntityRegistry:
 
         Conflicts checked against registered and currently existing entities.
         """
-        return ensure_unique_string(
-            '{}.{}'.format(domain, slugify(suggested_object_id)),
-            chain(self.entities.keys(),
-                  self.hass.states.async_entity_ids(domain))
-        )
+        preferred_string = '{}.{}'.format(domain, slugify(suggested_object_id))
+        test_string = preferred_string
+        tries = 1
+
+        while (test_string in self.entities or
+               self.hass.states.get(test_string) is not None):
+            tries += 1
+            test_string = '{}_{}'.format(preferred_string, tries)
+
+        return test_string
 
     @callback
     def async_get_or_create(self, domain, platform, unique_id, *,
                             suggested_object_id=None):
         """Get entity. Create if it doesn't exist."""
-        for entity in self.entities.values():
-            if entity.domain == domain and entity.platform == platform and \
-               entity.unique_id == unique_id:
-                return entity
+        entity_id = self._index.get((domain, platform, unique_id))
+
+        if entity_id is not None:
+            return self.entities[entity_id]
 
         entity_id = self.async_generate_entity_id(
             domain, suggested_object_id or '{}_{}'.format(platform, unique_id))
@@ -112,6 +140,7 @@ class EntityRegistry:
             platform=platform,
         )
         self.entities[entity_id] = entity
+        self._index[domain, platform, unique_id] = entity_id
         _LOGGER.info('Registered new %s.%s entity: %s',
                      domain, platform, entity_id)
         self.async_schedule_save()
@@ -161,25 +190,46 @@ class EntityRegistry:
         await self._load_task
 
     async def _async_load(self):
-        """Load the entity registry."""
+        """Load the entity registry.
+
+        Converts a registry in the YAML format to JSON.
+        """
         path = self.hass.config.path(PATH_REGISTRY)
+        yaml_path = self.hass.config.path(PATH_REGISTRY_YAML)
         entities = OrderedDict()
+        migrate = False
 
         if os.path.isfile(path):
-            data = await self.hass.async_add_job(load_yaml, path)
-
-            for entity_id, info in data.items():
-                entities[entity_id] = RegistryEntry(
-                    entity_id=entity_id,
-                    unique_id=info['unique_id'],
-                    platform=info['platform'],
-                    name=info.get('name'),
-                    disabled_by=info.get('disabled_by')
-                )
+            data = await self.hass.async_add_job(load_json, path)
+            infos = data.get('entities', [])
+
+        elif os.path.isfile(yaml_path):
+            data = await self.hass.async_add_job(load_yaml, yaml_path)
+            infos = [dict(info, entity_id=entity_id)
+                     for entity_id, info in (data or {}).items()]
+            migrate = True
+
+        else:
+            infos = []
+
+        for info in infos:
+            entities[info['entity_id']] = RegistryEntry(
+                entity_id=info['entity_id'],
+                unique_id=info['unique_id'],
+                platform=info['platform'],
+                name=info.get('name'),
+                disabled_by=info.get('disabled_by')
+            )
 
         self.entities = entities
         self._load_task = None
 
+        if migrate:
+            await self._async_save()
+            _LOGGER.warning("Entity registry converted to %s, %s is no "
+                            "longer used and can be removed",
+                            PATH_REGISTRY, PATH_REGISTRY_YAML)
+
     @callback
     def async_schedule_save(self):
         """Schedule saving the entity registry."""
@@ -193,17 +243,20 @@ class EntityRegistry:
     async def _async_save(self):
         """Save the entity registry to a file."""
         self._sched_save = None
-        data = OrderedDict()
-
-        for entry in self.entities.values():
-            data[entry.entity_id] = {
-                'unique_id': entry.unique_id,
-                'platform': entry.platform,
-                'name': entry.name,
-            }
+        data = {
+            'entities': [
+                {
+                    'entity_id': entry.entity_id,
+                    'unique_id': entry.unique_id,
+                    'platform': entry.platform,
+                    'name': entry.name,
+                    'disabled_by': entry.disabled_by,
+                } for entry in self.entities.values()
+            ]
+        }
 
         await self.hass.async_add_job(
-            save_yaml, self.hass.config.path(PATH_REGISTRY), data)
+            save_json, self.hass.config.path(PATH_REGISTRY), data)
 
 
 @bind_hass
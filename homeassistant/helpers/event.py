@@ -1,15 +1,27 @@
 """Helpers for listening to events."""
 from datetime import timedelta
 import functools as ft
+import heapq
+import itertools
+import logging
 
 from homeassistant.loader import bind_hass
 from homeassistant.helpers.sun import get_astral_event_next
-from ..core import HomeAssistant, callback
+from ..core import HassJob, HomeAssistant, callback
 from ..const import (
     ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL)
 from ..util import dt as dt_util
 from ..util.async import run_callback_threadsafe
 
+DATA_STATE_CHANGE_TRACKERS = 'event_state_change_trackers'
+DATA_POINT_IN_TIME_SCHEDULER = 'event_point_in_time_scheduler'
+
+# Rebuild the scheduler heap once it holds this many cancelled listeners
+# and they make up more than half of it.
+SCHEDULER_COMPACT_THRESHOLD = 100
+
+_LOGGER = logging.getLogger(__name__)
+
 # PyLint does not like the use of threaded_listener_factory
 # pylint: disable=invalid-name
 
@@ -51,22 +63,11 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
     """
     match_from_state = _process_state_match(from_state)
     match_to_state = _process_state_match(to_state)
-
-    # Ensure it is a lowercase list with entity ids we want to match on
-    if entity_ids == MATCH_ALL:
-        pass
-    elif isinstance(entity_ids, str):
-        entity_ids = (entity_ids.lower(),)
-    else:
-        entity_ids = tuple(entity_id.lower() for entity_id in entity_ids)
+    job = HassJob(action)
 
     @callback
     def state_change_listener(event):
         """Handle specific state changes."""
-        if entity_ids != MATCH_ALL and \
-           event.data.get('entity_id') not in entity_ids:
-            return
-
         old_state = event.data.get('old_state')
         if old_state is not None:
             old_state = old_state.state
@@ -76,16 +77,79 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
             new_state = new_state.state
 
         if match_from_state(old_state) and match_to_state(new_state):
-            hass.async_run_job(action, event.data.get('entity_id'),
-                               event.data.get('old_state'),
-                               event.data.get('new_state'))
+            hass.async_run_hass_job(job, event.data.get('entity_id'),
+                                    event.data.get('old_state'),
+                                    event.data.get('new_state'))
+
+    if entity_ids == MATCH_ALL:
+        return hass.bus.async_listen(
+            EVENT_STATE_CHANGED, state_change_listener)
 
-    return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+    # Ensure it is a lowercase list with entity ids we want to match on
+    if isinstance(entity_ids, str):
+        entity_ids = (entity_ids.lower(),)
+    else:
+        entity_ids = tuple(set(entity_id.lower() for entity_id in entity_ids))
+
+    return _async_track_entity_state_change(
+        hass, entity_ids, state_change_listener)
 
 
 track_state_change = threaded_listener_factory(async_track_state_change)
 
 
+@callback
+def _async_track_entity_state_change(hass, entity_ids, listener):
+    """Add a state_changed listener for a tuple of entity ids.
+
+    All these listeners share a single bus listener that looks up the
+    listeners by the entity id of the event, so a state change only reaches
+    the listeners that track that entity.
+    """
+    trackers = hass.data.get(DATA_STATE_CHANGE_TRACKERS)
+
+    if trackers is None:
+        trackers = hass.data[DATA_STATE_CHANGE_TRACKERS] = {}
+
+        @callback
+        def state_change_dispatcher(event):
+            """Dispatch a state change to the listeners of its entity."""
+            listeners = trackers.get(event.data.get('entity_id'))
+
+            if not listeners:
+                return
+
+            # Listeners are allowed to remove themselves while dispatching
+            for entity_listener in listeners[:]:
+                try:
+                    entity_listener(event)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error while dispatching %s", event)
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_dispatcher)
+
+    for entity_id in entity_ids:
+        trackers.setdefault(entity_id, []).append(listener)
+
+    @callback
+    def remove_listener():
+        """Remove the listener from the tracked entities."""
+        for entity_id in entity_ids:
+            listeners = trackers.get(entity_id)
+
+            if listeners is None or listener not in listeners:
+                _LOGGER.warning(
+                    "Unable to remove unknown listener %s", listener)
+                continue
+
+            listeners.remove(listener)
+
+            if not listeners:
+                trackers.pop(entity_id)
+
+    return remove_listener
+
+
 @callback
 @bind_hass
 def async_track_template(hass, template, action, variables=None):
@@ -94,6 +158,7 @@ def async_track_template(hass, template, action, variables=None):
 
     # Local variable to keep track of if the action has already been triggered
     already_triggered = False
+    job = HassJob(action)
 
     @callback
     def template_condition_listener(entity_id, from_s, to_s):
@@ -104,7 +169,7 @@ def async_track_template(hass, template, action, variables=None):
         # Check to see if template returns true
         if template_result and not already_triggered:
             already_triggered = True
-            hass.async_run_job(action, entity_id, from_s, to_s)
+            hass.async_run_hass_job(job, entity_id, from_s, to_s)
         elif not template_result:
             already_triggered = False
 
@@ -116,6 +181,142 @@ def async_track_template(hass, template, action, variables=None):
 track_template = threaded_listener_factory(async_track_template)
 
 
+@callback
+@bind_hass
+def async_track_template_result(hass, template, action, variables=None,
+                                rate_limit=None):
+    """Add a listener that is called when the result of a template changes.
+
+    The template is rendered right away and the entities and domains every
+    render reads are tracked, so it is only rendered again when one of them
+    changes. Like async_track_template, a template that read no states at
+    all, like {{ now() }}, is rendered again on every state change.
+    Templates that read all states, a whole domain or no states are rendered
+    at most once per rate_limit (a timedelta) if one is given.
+
+    The action is called with the previous and the new result, starting
+    with None and the result of the first render. The result is a
+    TemplateError if the template could not be rendered.
+    """
+    tracker = _TemplateResultTracker(
+        hass, template, action, variables, rate_limit)
+    tracker.async_render()
+    return tracker.async_remove
+
+
+track_template_result = threaded_listener_factory(async_track_template_result)
+
+
+class _TemplateResultTracker(object):
+    """Render a template again when the states it read change."""
+
+    def __init__(self, hass, template, action, variables, rate_limit):
+        """Initialize the tracker."""
+        self._hass = hass
+        self._template = template
+        self._job = HassJob(action)
+        self._variables = variables
+        self._rate_limit = rate_limit
+        self._info = None
+        self._last_result = None
+        self._last_render = None
+        self._tracked_entities = None
+        self._unsub_entities = None
+        self._unsub_bus = None
+        self._unsub_refresh = None
+
+    @callback
+    def async_render(self, *_):
+        """Render the template and call the action if the result changed."""
+        self._unsub_refresh = None
+        self._last_render = dt_util.utcnow()
+        info = self._info = self._template.async_render_to_info(
+            self._variables)
+        self._async_update_listeners()
+
+        result = info.result if info.exception is None else info.exception
+        if result == self._last_result:
+            return
+
+        last_result, self._last_result = self._last_result, result
+        self._hass.async_run_hass_job(self._job, last_result, result)
+
+    @callback
+    def async_remove(self):
+        """Stop tracking the template."""
+        if self._unsub_entities is not None:
+            self._unsub_entities()
+            self._unsub_entities = None
+        if self._unsub_bus is not None:
+            self._unsub_bus()
+            self._unsub_bus = None
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+
+    @callback
+    def _async_update_listeners(self):
+        """Listen to the state changes the last render depends on."""
+        info = self._info
+
+        if self._listens_to_all():
+            # Entities are checked by the same bus listener
+            entities = None
+            if self._unsub_bus is None:
+                self._unsub_bus = self._hass.bus.async_listen(
+                    EVENT_STATE_CHANGED, self._async_state_changed)
+        else:
+            entities = frozenset(info.entities)
+            if self._unsub_bus is not None:
+                self._unsub_bus()
+                self._unsub_bus = None
+
+        if entities == self._tracked_entities:
+            return
+
+        if self._unsub_entities is not None:
+            self._unsub_entities()
+            self._unsub_entities = None
+
+        self._tracked_entities = entities
+        if entities:
+            self._unsub_entities = _async_track_entity_state_change(
+                self._hass, tuple(entities), self._async_entity_changed)
+
+    def _listens_to_all(self):
+        """Return if the last render needs to see every state change."""
+        info = self._info
+        return info.all_states or info.domains or not info.entities
+
+    @callback
+    def _async_state_changed(self, event):
+        """Handle any state change."""
+        info = self._info
+        if (not info.entities and not info.domains or
+                info.filter_state_change(event.data.get('entity_id'))):
+            self._async_schedule_render()
+
+    @callback
+    def _async_entity_changed(self, event):
+        """Handle a state change of a tracked entity."""
+        self._async_schedule_render()
+
+    @callback
+    def _async_schedule_render(self):
+        """Render now or, if rate limited, once the limit has passed."""
+        if self._unsub_refresh is not None:
+            return
+
+        if self._rate_limit is not None and self._listens_to_all():
+            next_render = self._last_render + self._rate_limit
+            if next_render > dt_util.utcnow():
+                self._unsub_refresh = async_track_point_in_utc_time(
+                    self._hass, self.async_render, next_render)
+                return
+
+        self.async_render()
+
+
 @callback
 @bind_hass
 def async_track_same_state(hass, period, action, async_check_same_func,
@@ -127,6 +328,7 @@ def async_track_same_state(hass, period, action, async_check_same_func,
     """
     async_remove_state_for_cancel = None
     async_remove_state_for_listener = None
+    job = HassJob(action)
 
     @callback
     def clear_listener():
@@ -147,7 +349,7 @@ def async_track_same_state(hass, period, action, async_check_same_func,
         nonlocal async_remove_state_for_listener
         async_remove_state_for_listener = None
         clear_listener()
-        hass.async_run_job(action)
+        hass.async_run_hass_job(job)
 
     @callback
     def state_for_cancel_listener(entity, from_state, to_state):
@@ -172,11 +374,12 @@ track_same_state = threaded_listener_factory(async_track_same_state)
 def async_track_point_in_time(hass, action, point_in_time):
     """Add a listener that fires once after a specific point in time."""
     utc_point_in_time = dt_util.as_utc(point_in_time)
+    job = HassJob(action)
 
     @callback
     def utc_converter(utc_now):
         """Convert passed in UTC now to local now."""
-        hass.async_run_job(action, dt_util.as_local(utc_now))
+        hass.async_run_hass_job(job, dt_util.as_local(utc_now))
 
     return async_track_point_in_utc_time(hass, utc_converter,
                                          utc_point_in_time)
@@ -192,32 +395,93 @@ def async_track_point_in_utc_time(hass, action, point_in_time):
     # Ensure point_in_time is UTC
     point_in_time = dt_util.as_utc(point_in_time)
 
+    scheduler = hass.data.get(DATA_POINT_IN_TIME_SCHEDULER)
+
+    if scheduler is None:
+        scheduler = hass.data[DATA_POINT_IN_TIME_SCHEDULER] = \
+            _PointInTimeScheduler(hass)
+
+    return scheduler.async_schedule(point_in_time, action)
+
+
+track_point_in_utc_time = threaded_listener_factory(
+    async_track_point_in_utc_time)
+
+
+class _PointInTimeScheduler(object):
+    """Keep point in time listeners in a heap ordered by their due time.
+
+    A single time_changed listener pops the listeners that are due, so a
+    tick costs O(expired) instead of waking up every pending listener.
+    """
+
+    def __init__(self, hass):
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._heap = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+        hass.bus.async_listen(EVENT_TIME_CHANGED, self._async_time_changed)
+
     @callback
-    def point_in_time_listener(event):
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
+    def async_schedule(self, point_in_time, action):
+        """Schedule action to run at point_in_time (UTC).
 
-        if now < point_in_time or hasattr(point_in_time_listener, 'run'):
-            return
+        Returns a function that cancels the listener.
+        """
+        # The counter keeps listeners with the same due time in the order
+        # they were added and makes sure actions are never compared.
+        entry = [point_in_time, next(self._counter), HassJob(action)]
+        heapq.heappush(self._heap, entry)
 
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        point_in_time_listener.run = True
-        async_unsub()
+        @callback
+        def cancel():
+            """Cancel the listener if it did not run yet."""
+            if entry[2] is None:
+                return
+
+            entry[2] = None
+            self._cancelled += 1
 
-        hass.async_run_job(action, now)
+            if (self._cancelled > SCHEDULER_COMPACT_THRESHOLD and
+                    self._cancelled > len(self._heap) // 2):
+                self._heap = [item for item in self._heap
+                              if item[2] is not None]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
 
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                        point_in_time_listener)
+        return cancel
 
-    return async_unsub
+    @callback
+    def _async_time_changed(self, event):
+        """Run the listeners that are due."""
+        now = event.data[ATTR_NOW]
+        heap = self._heap
+        due = []
 
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
 
-track_point_in_utc_time = threaded_listener_factory(
-    async_track_point_in_utc_time)
+            if entry[2] is None:
+                self._cancelled -= 1
+            else:
+                due.append(entry)
+
+        # Listeners scheduled by the actions will run on the next tick
+        for entry in due:
+            job = entry[2]
+
+            # Cancelled by an action that ran before it
+            if job is None:
+                continue
+
+            entry[2] = None
+
+            try:
+                self._hass.async_run_hass_job(job, now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error running point in time listener %s",
+                                  job.target)
 
 
 @callback
@@ -233,6 +497,7 @@ def async_call_later(hass, delay, action):
 def async_track_time_interval(hass, action, interval):
     """Add a listener that fires repetitively at every timedelta interval."""
     remove = None
+    job = HassJob(action)
 
     def next_interval():
         """Return the next interval."""
@@ -244,7 +509,7 @@ def async_track_time_interval(hass, action, interval):
         nonlocal remove
         remove = async_track_point_in_utc_time(
             hass, interval_listener, next_interval())
-        hass.async_run_job(action, now)
+        hass.async_run_hass_job(job, now)
 
     remove = async_track_point_in_utc_time(
         hass, interval_listener, next_interval())
@@ -264,6 +529,7 @@ track_time_interval = threaded_listener_factory(async_track_time_interval)
 def async_track_sunrise(hass, action, offset=None):
     """Add a listener that will fire a specified offset from sunrise daily."""
     remove = None
+    job = HassJob(action)
 
     @callback
     def sunrise_automation_listener(now):
@@ -272,7 +538,7 @@ def async_track_sunrise(hass, action, offset=None):
         remove = async_track_point_in_utc_time(
             hass, sunrise_automation_listener, get_astral_event_next(
                 hass, 'sunrise', offset=offset))
-        hass.async_run_job(action)
+        hass.async_run_hass_job(job)
 
     remove = async_track_point_in_utc_time(
         hass, sunrise_automation_listener, get_astral_event_next(
@@ -293,6 +559,7 @@ track_sunrise = threaded_listener_factory(async_track_sunrise)
 def async_track_sunset(hass, action, offset=None):
     """Add a listener that will fire a specified offset from sunset daily."""
     remove = None
+    job = HassJob(action)
 
     @callback
     def sunset_automation_listener(now):
@@ -301,7 +568,7 @@ def async_track_sunset(hass, action, offset=None):
         remove = async_track_point_in_utc_time(
             hass, sunset_automation_listener, get_astral_event_next(
                 hass, 'sunset', offset=offset))
-        hass.async_run_job(action)
+        hass.async_run_hass_job(job)
 
     remove = async_track_point_in_utc_time(
         hass, sunset_automation_listener, get_astral_event_next(
@@ -323,13 +590,15 @@ def async_track_utc_time_change(hass, action, year=None, month=None, day=None,
                                 hour=None, minute=None, second=None,
                                 local=False):
     """Add a listener that will fire if time matches a pattern."""
+    job = HassJob(action)
+
     # We do not have to wrap the function with time pattern matching logic
     # if no pattern given
     if all(val is None for val in (year, month, day, hour, minute, second)):
         @callback
         def time_change_listener(event):
             """Fire every time event that comes in."""
-            hass.async_run_job(action, event.data[ATTR_NOW])
+            hass.async_run_hass_job(job, event.data[ATTR_NOW])
 
         return hass.bus.async_listen(EVENT_TIME_CHANGED, time_change_listener)
 
@@ -349,7 +618,7 @@ def async_track_utc_time_change(hass, action, year=None, month=None, day=None,
         if second(now.second) and minute(now.minute) and hour(now.hour) and \
            day(now.day) and month(now.month) and year(now.year):
 
-            hass.async_run_job(action, now)
+            hass.async_run_hass_job(job, now)
 
     return hass.bus.async_listen(EVENT_TIME_CHANGED,
                                  pattern_time_change_listener)
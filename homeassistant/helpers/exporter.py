@@ -0,0 +1,250 @@
+"""Helpers for components that export state changes to external systems.
+
+An exporter queues state changes from the event loop and ships them from
+a worker thread in batches, over a connection that is kept open between
+batches. The queue is bounded; state changes that do not fit are dropped
+and counted. On stop, the queued state changes are sent before Home
+Assistant shuts down. Queue length and delivery counters can be
+published as the state of ``sensor.<name>_exporter``.
+"""
+import logging
+import queue
+import socket
+import threading
+import time
+
+import voluptuous as vol
+
+from homeassistant.const import (
+    ATTR_FRIENDLY_NAME, ATTR_UNIT_OF_MEASUREMENT, EVENT_HOMEASSISTANT_START,
+    EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED)
+from homeassistant.core import callback
+import homeassistant.helpers.config_validation as cv
+
+_LOGGER = logging.getLogger(__name__)
+
+CONF_FLUSH_INTERVAL = 'flush_interval'
+CONF_MAX_BATCH_SIZE = 'max_batch_size'
+CONF_MAX_QUEUE_SIZE = 'max_queue_size'
+CONF_STATS_SENSOR = 'stats_sensor'
+
+DEFAULT_FLUSH_INTERVAL = 1
+DEFAULT_MAX_BATCH_SIZE = 500
+DEFAULT_MAX_QUEUE_SIZE = 10000
+
+ATTR_DROPPED = 'dropped'
+ATTR_FAILED = 'failed'
+ATTR_SENT = 'sent'
+
+# Minimum number of seconds between two updates of the stats sensor
+STATS_INTERVAL = 60
+
+# Seconds to wait on stop for the queued state changes to be sent
+STOP_TIMEOUT = 10
+
+EXPORTER_SCHEMA = vol.Schema({
+    vol.Optional(CONF_FLUSH_INTERVAL, default=DEFAULT_FLUSH_INTERVAL):
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional(CONF_MAX_BATCH_SIZE, default=DEFAULT_MAX_BATCH_SIZE):
+        vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional(CONF_MAX_QUEUE_SIZE, default=DEFAULT_MAX_QUEUE_SIZE):
+        vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional(CONF_STATS_SENSOR, default=False): cv.boolean,
+})
+
+
+class Exporter(threading.Thread):
+    """Export state changes in batches from a worker thread.
+
+    Subclasses implement format_event, send and optionally close.
+    """
+
+    def __init__(self, hass, name, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_queue_size=DEFAULT_MAX_QUEUE_SIZE, stats_sensor=False):
+        """Initialize the exporter and subscribe to state changes."""
+        super().__init__(name='{}_exporter'.format(name), daemon=True)
+        self.hass = hass
+        self.entity_id = 'sensor.{}_exporter'.format(name)
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.stats_sensor = stats_sensor
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.failed = 0
+        self.sent = 0
+        self._quit = threading.Event()
+        self._stats_updated = None
+        self._stats_pending = False
+
+        hass.bus.listen_once(EVENT_HOMEASSISTANT_START, self.start_listen)
+        hass.bus.listen_once(EVENT_HOMEASSISTANT_STOP, self.shutdown)
+        hass.bus.listen(EVENT_STATE_CHANGED, self.event_listener)
+
+    @callback
+    def start_listen(self, event):
+        """Start the worker thread."""
+        self.start()
+
+    def shutdown(self, event):
+        """Send the queued state changes and stop the worker thread."""
+        self._quit.set()
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            # The worker stops once it has drained the queue
+            pass
+
+        if not self.is_alive():
+            return
+
+        self.join(STOP_TIMEOUT)
+        if self.is_alive():
+            _LOGGER.warning("%s did not send %d state changes within %d "
+                            "seconds", self.name, self.queue.qsize(),
+                            STOP_TIMEOUT)
+
+    @callback
+    def event_listener(self, event):
+        """Queue a state change, or count it as dropped if the queue is full.
+
+        Changes of the stats sensor itself are not exported.
+        """
+        if (event.data.get('new_state') is None or
+                event.data.get('entity_id') == self.entity_id):
+            return
+
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def format_event(self, event):
+        """Return the record to send for a state change, or None to skip it.
+
+        Called from the worker thread.
+        """
+        raise NotImplementedError()
+
+    def send(self, records):
+        """Send a batch of records. Raise to mark the batch as failed."""
+        raise NotImplementedError()
+
+    def close(self):
+        """Close the connection; the next send has to reconnect."""
+        pass
+
+    def run(self):
+        """Collect state changes into batches and send them."""
+        batch = []
+        batch_started = None
+
+        while True:
+            if batch:
+                wait = max(
+                    0, batch_started + self.flush_interval - time.monotonic())
+            elif self._stats_pending:
+                # Publish the stats once they are due, even if no more
+                # state changes come in
+                wait = max(0, self._stats_updated + STATS_INTERVAL -
+                           time.monotonic())
+            else:
+                wait = None
+
+            try:
+                event = self.queue.get(timeout=wait)
+            except queue.Empty:
+                self._flush(batch)
+                continue
+
+            if event is not None:
+                try:
+                    record = self.format_event(event)
+                # pylint: disable=broad-except
+                except Exception:
+                    _LOGGER.exception("Failed to format state change for %s",
+                                      event.data.get('entity_id'))
+                    record = None
+
+                if record is not None:
+                    if not batch:
+                        batch_started = time.monotonic()
+                    batch.append(record)
+
+                if len(batch) >= self.max_batch_size:
+                    self._flush(batch)
+
+            if event is None or (self._quit.is_set() and self.queue.empty()):
+                self._flush(batch, update_stats=False)
+                self.close()
+                _LOGGER.debug("%s stopped", self.name)
+                return
+
+    def _flush(self, batch, update_stats=True):
+        """Send a batch of records and empty it."""
+        if batch:
+            try:
+                self.send(batch)
+                self.sent += len(batch)
+            # pylint: disable=broad-except
+            except Exception:
+                _LOGGER.exception("%s failed to send %d records",
+                                  self.name, len(batch))
+                self.failed += len(batch)
+                self.close()
+            batch.clear()
+
+        if update_stats:
+            self._update_stats()
+
+    def _update_stats(self):
+        """Publish the exporter stats, at most every STATS_INTERVAL seconds."""
+        if not self.stats_sensor:
+            return
+
+        now = time.monotonic()
+        if (self._stats_updated is not None and
+                now - self._stats_updated < STATS_INTERVAL):
+            self._stats_pending = True
+            return
+        self._stats_updated = now
+        self._stats_pending = False
+
+        self.hass.states.set(self.entity_id, self.queue.qsize(), {
+            ATTR_FRIENDLY_NAME: self.name,
+            ATTR_UNIT_OF_MEASUREMENT: 'events',
+            ATTR_DROPPED: self.dropped,
+            ATTR_FAILED: self.failed,
+            ATTR_SENT: self.sent,
+        })
+
+
+class TCPConnection(object):
+    """TCP connection that is opened on first use and kept open."""
+
+    def __init__(self, host, port, timeout=10):
+        """Initialize the connection."""
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock = None
+
+    def send(self, data):
+        """Send bytes, connecting first if needed.
+
+        The connection is closed if sending fails.
+        """
+        if self._sock is None:
+            self._sock = socket.create_connection(
+                (self.host, self.port), self.timeout)
+        try:
+            self._sock.sendall(data)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        """Close the connection."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
@@ -6,11 +6,12 @@ from datetime import timedelta
 import async_timeout
 
 from homeassistant.core import HomeAssistant, CoreState, callback
-from homeassistant.const import EVENT_HOMEASSISTANT_START
+from homeassistant.const import ATTR_HIDDEN, EVENT_HOMEASSISTANT_START
 from homeassistant.loader import bind_hass
-from homeassistant.components.history import get_states, last_recorder_run
+from homeassistant.components.history import (
+    IGNORE_DOMAINS, get_states, last_recorder_run)
 from homeassistant.components.recorder import (
-    wait_connection_ready, DOMAIN as _RECORDER)
+    load_state_snapshot, wait_connection_ready, DOMAIN as _RECORDER)
 import homeassistant.util.dt as dt_util
 
 RECORDER_TIMEOUT = 10
@@ -41,7 +42,17 @@ def _load_restore_cache(hass: HomeAssistant):
     last_end_time = last_end_time.replace(tzinfo=dt_util.UTC)
     _LOGGER.debug("Last run: %s - %s", last_run.start, last_end_time)
 
-    states = get_states(hass, last_end_time, run=last_run)
+    # The snapshot saves a query over the whole last run, but is only
+    # written when the last run was shut down cleanly
+    states = load_state_snapshot(
+        hass, last_run.end.replace(tzinfo=dt_util.UTC))
+
+    if states is None:
+        states = get_states(hass, last_end_time, run=last_run)
+    else:
+        states = [state for state in states
+                  if state.domain not in IGNORE_DOMAINS and
+                  not state.attributes.get(ATTR_HIDDEN, False)]
 
     # Cache the states
     hass.data[DATA_RESTORE_CACHE] = {
@@ -5,6 +5,7 @@ import logging
 import math
 import random
 import re
+import threading
 
 import jinja2
 from jinja2 import contextfilter
@@ -13,7 +14,7 @@ from jinja2.sandbox import ImmutableSandboxedEnvironment
 from homeassistant.const import (
     ATTR_LATITUDE, ATTR_LONGITUDE, ATTR_UNIT_OF_MEASUREMENT, MATCH_ALL,
     STATE_UNKNOWN)
-from homeassistant.core import State
+from homeassistant.core import State, split_entity_id
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers import location as loc_helper
 from homeassistant.loader import bind_hass, get_component
@@ -32,6 +33,9 @@ _RE_GET_ENTITIES = re.compile(
     r"\((?:[\ \'\"]?))([\w]+\.[\w]+)|([\w]+))", re.I | re.M
 )
 
+# The RenderInfo of the render in progress, if it is being tracked
+_RENDER_INFO = threading.local()
+
 
 @bind_hass
 def attach(hass, obj):
@@ -81,6 +85,45 @@ def extract_entities(template, variables=None):
     return MATCH_ALL
 
 
+class RenderInfo(object):
+    """Result of a template render and the states it read."""
+
+    def __init__(self, template):
+        """Initialize the render info."""
+        self.template = template
+        self.result = None
+        self.exception = None
+        self.all_states = False
+        self.domains = set()
+        self.entities = set()
+
+    def filter_state_change(self, entity_id):
+        """Return if a change of entity_id can change the result."""
+        return (self.all_states or entity_id in self.entities or
+                split_entity_id(entity_id)[0] in self.domains)
+
+
+def _collect_entity(entity_id):
+    """Record that the render in progress read a state."""
+    info = getattr(_RENDER_INFO, 'current', None)
+    if info is not None and isinstance(entity_id, str):
+        info.entities.add(entity_id.lower())
+
+
+def _collect_domain(domain):
+    """Record that the render in progress read all states of a domain."""
+    info = getattr(_RENDER_INFO, 'current', None)
+    if info is not None:
+        info.domains.add(domain.lower())
+
+
+def _collect_all():
+    """Record that the render in progress read all states."""
+    info = getattr(_RENDER_INFO, 'current', None)
+    if info is not None:
+        info.all_states = True
+
+
 class Template(object):
     """Class to hold a template and manage caching and rendering."""
 
@@ -132,6 +175,26 @@ class Template(object):
         except jinja2.TemplateError as err:
             raise TemplateError(err)
 
+    def async_render_to_info(self, variables=None, **kwargs):
+        """Render given template and record which states it read.
+
+        Returns a RenderInfo. Rendering errors are stored as its exception.
+
+        This method must be run in the event loop.
+        """
+        info = RenderInfo(self)
+        previous = getattr(_RENDER_INFO, 'current', None)
+        _RENDER_INFO.current = info
+
+        try:
+            info.result = self.async_render(variables, **kwargs)
+        except TemplateError as ex:
+            info.exception = ex
+        finally:
+            _RENDER_INFO.current = previous
+
+        return info
+
     def render_with_possible_json_value(self, value, error_value=_SENTINEL):
         """Render template with value exposed.
 
@@ -179,7 +242,7 @@ class Template(object):
         global_vars = ENV.make_globals({
             'closest': template_methods.closest,
             'distance': template_methods.distance,
-            'is_state': self.hass.states.is_state,
+            'is_state': template_methods.is_state,
             'is_state_attr': template_methods.is_state_attr,
             'states': AllStates(self.hass),
         })
@@ -209,17 +272,19 @@ class AllStates(object):
 
     def __iter__(self):
         """Return all states."""
+        _collect_all()
         return iter(
             _wrap_state(state) for state in
-            sorted(self._hass.states.async_all(),
-                   key=lambda state: state.entity_id))
+            self._hass.states.async_all_sorted())
 
     def __len__(self):
         """Return number of states."""
+        _collect_all()
         return len(self._hass.states.async_entity_ids())
 
     def __call__(self, entity_id):
         """Return the states."""
+        _collect_entity(entity_id)
         state = self._hass.states.get(entity_id)
         return STATE_UNKNOWN if state is None else state.state
 
@@ -234,18 +299,20 @@ class DomainStates(object):
 
     def __getattr__(self, name):
         """Return the states."""
-        return _wrap_state(
-            self._hass.states.get('{}.{}'.format(self._domain, name)))
+        entity_id = '{}.{}'.format(self._domain, name)
+        _collect_entity(entity_id)
+        return _wrap_state(self._hass.states.get(entity_id))
 
     def __iter__(self):
         """Return the iteration over all the states."""
-        return iter(sorted(
-            (_wrap_state(state) for state in self._hass.states.async_all()
-             if state.domain == self._domain),
-            key=lambda state: state.entity_id))
+        _collect_domain(self._domain)
+        return iter(
+            _wrap_state(state) for state in
+            self._hass.states.async_all_sorted(self._domain))
 
     def __len__(self):
         """Return number of states."""
+        _collect_domain(self._domain)
         return len(self._hass.states.async_entity_ids(self._domain))
 
 
@@ -349,8 +416,13 @@ class TemplateMethods(object):
 
             group = get_component('group')
 
-            states = [self._hass.states.get(entity_id) for entity_id
-                      in group.expand_entity_ids(self._hass, [gr_entity_id])]
+            _collect_entity(gr_entity_id)
+            entity_ids = group.expand_entity_ids(self._hass, [gr_entity_id])
+            for entity_id in entity_ids:
+                _collect_entity(entity_id)
+
+            states = [self._hass.states.get(entity_id)
+                      for entity_id in entity_ids]
 
         return _wrap_state(loc_helper.closest(latitude, longitude, states))
 
@@ -402,8 +474,14 @@ class TemplateMethods(object):
         return self._hass.config.units.length(
             loc_util.distance(*locations[0] + locations[1]), 'm')
 
+    def is_state(self, entity_id, state):
+        """Test if a state is a specific value."""
+        _collect_entity(entity_id)
+        return self._hass.states.is_state(entity_id, state)
+
     def is_state_attr(self, entity_id, name, value):
         """Test if a state is a specific attribute."""
+        _collect_entity(entity_id)
         state_obj = self._hass.states.get(entity_id)
         return state_obj is not None and \
             state_obj.attributes.get(name) == value
@@ -413,6 +491,7 @@ class TemplateMethods(object):
         if isinstance(entity_id_or_state, State):
             return entity_id_or_state
         elif isinstance(entity_id_or_state, str):
+            _collect_entity(entity_id_or_state)
             return self._hass.states.get(entity_id_or_state)
         return None
 
@@ -11,6 +11,7 @@ from datetime import datetime
 import enum
 import json
 import logging
+from types import MappingProxyType
 import urllib.parse
 
 from typing import Optional
@@ -18,6 +19,12 @@ from typing import Optional
 from aiohttp.hdrs import METH_GET, METH_POST, METH_DELETE, CONTENT_TYPE
 import requests
 
+try:
+    # Optional faster encoder, not part of the requirements
+    import orjson  # pylint: disable=import-error
+except ImportError:
+    orjson = None
+
 from homeassistant import core as ha
 from homeassistant.const import (
     URL_API, SERVER_PORT, URL_API_CONFIG, URL_API_EVENTS, URL_API_STATES,
@@ -136,6 +143,33 @@ class JSONEncoder(json.JSONEncoder):
                 return json.JSONEncoder.default(self, o)
 
 
+def _orjson_default(obj):
+    """Convert objects orjson can't serialize natively."""
+    if isinstance(obj, set):
+        return list(obj)
+    elif hasattr(obj, 'as_dict'):
+        return obj.as_dict()
+    elif isinstance(obj, MappingProxyType):
+        return dict(obj)
+
+    raise TypeError
+
+
+def json_dumps(data) -> str:
+    """Serialize data to a JSON string.
+
+    Uses orjson if it is installed and falls back to the JSONEncoder for
+    anything orjson can't handle.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=_orjson_default).decode()
+        except TypeError:
+            pass
+
+    return json.dumps(data, cls=JSONEncoder)
+
+
 def validate_api(api):
     """Make a call to validate API."""
     try:
@@ -2,13 +2,18 @@
 import argparse
 import asyncio
 from contextlib import suppress
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
+import os
+import random
+import tempfile
+import tracemalloc
 from timeit import default_timer as timer
 
 from homeassistant import core
 from homeassistant.const import (
-    ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED)
+    ATTR_NOW, EVENT_STATE_CHANGED,
+    EVENT_TIME_CHANGED)
 from homeassistant.util import dt as dt_util
 
 BENCHMARKS = {}
@@ -108,6 +113,42 @@ async def async_million_time_changed_helper(hass):
     return timer() - start
 
 
+@benchmark
+# pylint: disable=invalid-name
+async def async_50k_pending_point_in_time(hass):
+    """Run 10k time changed events with 50k pending point in time timers."""
+    count = 0
+    event = asyncio.Event(loop=hass.loop)
+    point_in_time = datetime(2100, 1, 1, tzinfo=dt_util.UTC)
+
+    @core.callback
+    def listener(_):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+        if count == 10**4:
+            event.set()
+
+    for _ in range(5 * 10**4):
+        hass.helpers.event.async_track_point_in_utc_time(
+            listener, point_in_time)
+
+    hass.helpers.event.async_track_utc_time_change(listener)
+    event_data = {
+        ATTR_NOW: datetime(2017, 10, 10, 15, 0, 0, tzinfo=dt_util.UTC)
+    }
+
+    for _ in range(10**4):
+        hass.bus.async_fire(EVENT_TIME_CHANGED, event_data)
+
+    start = timer()
+
+    await event.wait()
+
+    return timer() - start
+
+
 @benchmark
 # pylint: disable=invalid-name
 async def async_million_state_changed_helper(hass):
@@ -143,6 +184,204 @@ async def async_million_state_changed_helper(hass):
     return timer() - start
 
 
+@benchmark
+# pylint: disable=invalid-name
+async def async_state_changed_helper_10k_listeners(hass):
+    """Run 100k state changes across 10k tracked entities."""
+    count = 0
+    event = asyncio.Event(loop=hass.loop)
+
+    @core.callback
+    def listener(*args):
+        """Handle state change."""
+        nonlocal count
+        count += 1
+
+        if count == 10**5:
+            event.set()
+
+    entity_ids = ['light.kitchen_{}'.format(idx) for idx in range(10**4)]
+
+    for entity_id in entity_ids:
+        hass.helpers.event.async_track_state_change(entity_id, listener)
+
+    old_state = core.State(entity_ids[0], 'off')
+    new_state = core.State(entity_ids[0], 'on')
+
+    for idx in range(10**5):
+        hass.bus.async_fire(EVENT_STATE_CHANGED, {
+            'entity_id': entity_ids[idx % 10**4],
+            'old_state': old_state,
+            'new_state': new_state,
+        })
+
+    start = timer()
+
+    await event.wait()
+
+    return timer() - start
+
+
+@benchmark
+async def dispatcher_million_callbacks(hass):
+    """Send a million signals to a callback target."""
+    count = 0
+
+    @core.callback
+    def target(*args):
+        """Handle the signal."""
+        nonlocal count
+        count += 1
+
+    hass.helpers.dispatcher.async_dispatcher_connect('benchmark', target)
+
+    start = timer()
+
+    for _ in range(10**6):
+        hass.helpers.dispatcher.async_dispatcher_send('benchmark', 1)
+
+    assert count == 10**6
+
+    return timer() - start
+
+
+@benchmark
+async def template_sensors_300(hass):
+    """Run 30k state changes past 300 tracked templates."""
+    from homeassistant.helpers.template import Template
+
+    results = 0
+
+    @core.callback
+    def listener(last_result, result):
+        """Handle a new template result."""
+        nonlocal results
+        results += 1
+
+    for idx in range(300):
+        hass.states.async_set('sensor.source_{}'.format(idx), 0)
+        hass.helpers.event.async_track_template_result(
+            Template('{{{{ states.sensor.source_{}.state | int * 2 }}}}'
+                     .format(idx), hass), listener)
+
+    await hass.async_block_till_done()
+
+    start = timer()
+
+    # Only 300 of the 1000 changing entities are read by a template
+    for idx in range(3 * 10**4):
+        hass.states.async_set(
+            'sensor.source_{}'.format(idx % 1000), idx)
+
+    await hass.async_block_till_done()
+
+    runtime = timer() - start
+
+    print('{} template results'.format(results))
+
+    return runtime
+
+
+@benchmark
+# pylint: disable=invalid-name
+async def async_million_state_machine_set(hass):
+    """Set a million states with unchanged attributes."""
+    attributes = {'unit_of_measurement': 'W', 'friendly_name': 'Power'}
+    entity_ids = ['sensor.power_{}'.format(idx) for idx in range(1000)]
+
+    start = timer()
+
+    for idx in range(10**6):
+        hass.states.async_set(
+            entity_ids[idx % 1000], idx // 1000, attributes)
+
+    return timer() - start
+
+
+@benchmark
+async def state_machine_domain_lookups(hass):
+    """Look up the states of one domain out of 20k entities in 30 domains."""
+    domains = ['domain_{}'.format(idx) for idx in range(30)]
+
+    for idx in range(2 * 10**4):
+        hass.states.async_set(
+            '{}.entity_{}'.format(domains[idx % 30], idx), 'on')
+
+    start = timer()
+
+    for idx in range(10**4):
+        domain = domains[idx % 30]
+        hass.states.async_entity_ids(domain)
+        hass.states.async_all_sorted(domain)
+
+    return timer() - start
+
+
+@benchmark
+async def state_memory(hass):
+    """Measure memory of 100k states sharing their attributes."""
+    attributes = {'unit_of_measurement': 'W', 'friendly_name': 'Power'}
+
+    tracemalloc.start()
+    start = timer()
+
+    for idx in range(10**5):
+        hass.states.async_set(
+            'sensor.power_{}'.format(idx), 'on', attributes)
+
+    runtime = timer() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('{:.0f} bytes per state'.format(current / 10**5))
+
+    return runtime
+
+
+@benchmark
+async def discovery_5000_entities(hass):
+    """Add 5000 discovered entities one by one and group them."""
+    from homeassistant import config_entries, loader
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_component import EntityComponent
+    from homeassistant.setup import async_setup_component
+
+    count = 5000
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        hass.config.config_dir = tmpdir
+        loader.prepare(hass)
+        hass.config_entries = config_entries.ConfigEntries(hass, {})
+        await hass.config_entries.async_load()
+        hass.state = core.CoreState.not_running
+        hass.async_track_tasks()
+        assert await async_setup_component(hass, 'group', {})
+
+        component = EntityComponent(
+            logging.getLogger(__name__), 'sensor', hass,
+            group_name='all sensors')
+        platform = component._platforms[component.domain]
+
+        start = timer()
+
+        for idx in range(count):
+            entity = Entity()
+            entity.entity_id = 'sensor.discovered_{}'.format(idx)
+            await platform.async_add_entities([entity])
+
+        hass.bus.async_fire(EVENT_TIME_CHANGED, {
+            ATTR_NOW: dt_util.utcnow() + timedelta(seconds=1)})
+        await hass.async_block_till_done()
+
+        runtime = timer() - start
+
+        group = hass.states.get('group.all_sensors')
+        print('{} entities in group'.format(
+            len(group.attributes['entity_id'])))
+
+    return runtime
+
+
 @benchmark
 @asyncio.coroutine
 def logbook_filtering_state(hass):
@@ -191,3 +430,190 @@ def _logbook_filtering(hass, last_changed, last_updated):
     list(logbook.humanify(events))
 
     return timer() - start
+
+
+@benchmark
+async def prometheus_scrape_10k_metrics(hass):
+    """Scrape 10k metrics in 100 families while 1% of them change."""
+    import prometheus_client
+    from homeassistant.components.prometheus import Metrics
+
+    metrics = Metrics(prometheus_client, {}, {})
+    entity_ids = ['sensor.kind{}_{}'.format(idx % 100, idx)
+                  for idx in range(10**4)]
+
+    def set_state(entity_id, value):
+        """Pass a state change to the exporter."""
+        metrics.handle_event(core.Event(EVENT_STATE_CHANGED, {
+            'entity_id': entity_id,
+            'new_state': core.State(entity_id, value),
+        }))
+
+    for entity_id in entity_ids:
+        set_state(entity_id, 0)
+    metrics.render()
+
+    start = timer()
+
+    rand = random.Random(0)
+
+    for scrape in range(100):
+        for entity_id in rand.sample(entity_ids, 100):
+            set_state(entity_id, scrape)
+        metrics.render()
+
+    return timer() - start
+
+
+@benchmark
+async def recorder_unbatched(hass):
+    """Write state changes with a commit per event."""
+    return await _recorder_throughput(hass, 0, 1)
+
+
+@benchmark
+async def recorder_batched(hass):
+    """Write state changes batched in transactions."""
+    return await _recorder_throughput(hass, 1, 1000)
+
+
+async def _recorder_throughput(hass, commit_interval, max_batch_size):
+    """Write 10k state changes to a SQLite database on disk."""
+    from homeassistant.components import recorder
+
+    count = 10**4
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        instance = recorder.Recorder(
+            hass, keep_days=0, purge_interval=0,
+            uri='sqlite:///{}'.format(os.path.join(tmpdir, 'bench.db')),
+            include={}, exclude={}, commit_interval=commit_interval,
+            max_batch_size=max_batch_size)
+        hass.state = core.CoreState.running
+        instance.async_initialize()
+        instance.start()
+        await instance.async_db_ready
+
+        start = timer()
+
+        for idx in range(count):
+            hass.states.async_set(
+                'sensor.benchmark_{}'.format(idx % 100), idx,
+                {'unit_of_measurement': 'W'})
+
+        await hass.async_add_job(instance.block_till_done)
+        runtime = timer() - start
+
+        print('{:.0f} events/s'.format(count / runtime))
+
+        instance.queue.put(None)
+        await hass.async_add_job(instance.join)
+
+    return runtime
+
+
+@benchmark
+async def history_million_rows(hass):
+    """Query a week of history of 300 entities out of a million rows."""
+    from homeassistant.components import history, recorder
+
+    end_time = dt_util.utcnow()
+    start_time = end_time - timedelta(days=7)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        instance = hass.data[recorder.DATA_INSTANCE] = recorder.Recorder(
+            hass, keep_days=0, purge_interval=0,
+            uri='sqlite:///{}'.format(os.path.join(tmpdir, 'bench.db')),
+            include={}, exclude={})
+        await hass.async_add_job(
+            _fill_states_table, instance, start_time, end_time, 10**6, 300)
+
+        start = timer()
+
+        result = await hass.async_add_job(
+            history.get_significant_states, hass, start_time, end_time,
+            None, history.Filters(), False)
+        await hass.async_add_job(
+            history._history_response,  # pylint: disable=protected-access
+            result.values(), True)
+
+        runtime = timer() - start
+
+        # pylint: disable=protected-access
+        await hass.async_add_job(instance._close_connection)
+
+    return runtime
+
+
+@benchmark
+async def purge_million_rows(hass):
+    """Purge half of a million rows in batches."""
+    from homeassistant.components import recorder
+    from homeassistant.components.recorder import purge
+
+    end_time = dt_util.utcnow()
+    start_time = end_time - timedelta(days=20)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        instance = hass.data[recorder.DATA_INSTANCE] = recorder.Recorder(
+            hass, keep_days=0, purge_interval=0,
+            uri='sqlite:///{}'.format(os.path.join(tmpdir, 'bench.db')),
+            include={}, exclude={})
+        await hass.async_add_job(
+            _fill_states_table, instance, start_time, end_time, 10**6, 300)
+
+        batches = 0
+        longest_batch = 0
+        start = timer()
+
+        while True:
+            batch_start = timer()
+            done = await hass.async_add_job(
+                purge.purge_old_data, instance, 10, False)
+            longest_batch = max(longest_batch, timer() - batch_start)
+            batches += 1
+            if done:
+                break
+
+        runtime = timer() - start
+
+        print('{} batches, longest batch {:.3f}s'.format(
+            batches, longest_batch))
+
+        # pylint: disable=protected-access
+        await hass.async_add_job(instance._close_connection)
+
+    return runtime
+
+
+def _fill_states_table(instance, start_time, end_time, rows, entities):
+    """Write synthetic sensor states to the states table."""
+    from homeassistant.components.recorder.models import States
+
+    # pylint: disable=protected-access
+    instance._setup_connection()
+
+    step = (end_time - start_time) / rows
+    chunk = []
+
+    for idx in range(rows):
+        entity_idx = idx % entities
+        timestamp = start_time + step * idx
+        chunk.append({
+            'domain': 'sensor',
+            'entity_id': 'sensor.power_{}'.format(entity_idx),
+            'state': str(idx % 100),
+            'attributes': (
+                '{{"unit_of_measurement": "W", '
+                '"friendly_name": "Power {}"}}'.format(entity_idx)),
+            'last_changed': timestamp,
+            'last_updated': timestamp,
+            'created': timestamp,
+        })
+
+        if len(chunk) == 10**4:
+            instance.engine.execute(States.__table__.insert(), chunk)
+            chunk = []
+
+    if chunk:
+        instance.engine.execute(States.__table__.insert(), chunk)
@@ -0,0 +1,60 @@
+"""Script to summarize the report of `hass --profile-startup`."""
+import argparse
+import os
+
+from homeassistant.config import get_default_config_dir
+from homeassistant.startup_profiler import STARTUP_PROFILE_FILE
+from homeassistant.util.json import load_json
+
+PHASES = ('import', 'config', 'dependencies', 'requirements', 'setup')
+
+
+def run(args):
+    """Print the slowest components and the critical path of startup."""
+    parser = argparse.ArgumentParser(
+        description="Summarize the startup profile of Home Assistant.")
+    parser.add_argument(
+        '--script', choices=['startup_profile'])
+    parser.add_argument(
+        '-c', '--config',
+        default=get_default_config_dir(),
+        help="Directory that contains the Home Assistant configuration")
+    parser.add_argument(
+        '-n', '--limit', type=int, default=20,
+        help="Number of setups to show, slowest first")
+    parser.add_argument(
+        '--sort', choices=('wall', 'blocking'), default='wall',
+        help="Order setups by wall time or by time blocking the event loop")
+
+    args = parser.parse_args(args)
+
+    path = os.path.join(os.getcwd(), args.config, STARTUP_PROFILE_FILE)
+    report = load_json(path)
+
+    if not report:
+        print("No startup profile found at", path)
+        print("Start Home Assistant with --profile-startup to create one.")
+        return 1
+
+    setups = report['setups']
+
+    print("Startup took {:.2f}s".format(report['total']))
+    print("Critical path:", ' -> '.join(
+        '{} ({:.2f}s)'.format(name, setups[name]['wall'])
+        for name in report['critical_path']))
+    print()
+
+    row = '{:<40} {:>8} {:>8}' + ' {:>12}' * len(PHASES)
+    print(row.format('Setup', 'wall', 'blocking', *PHASES))
+
+    names = sorted(setups, key=lambda name: setups[name][args.sort],
+                   reverse=True)
+    for name in names[:args.limit]:
+        setup = setups[name]
+        print(row.format(
+            name, '{:.2f}'.format(setup['wall']),
+            '{:.2f}'.format(setup['blocking']),
+            *('{:.2f}'.format(setup['phases'][phase])
+              if phase in setup['phases'] else '-' for phase in PHASES)))
+
+    return 0
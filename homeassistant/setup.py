@@ -6,7 +6,8 @@ from timeit import default_timer as timer
 from types import ModuleType
 from typing import Optional, Dict
 
-from homeassistant import requirements, core, loader, config as conf_util
+from homeassistant import (
+    requirements, core, loader, config as conf_util, startup_profiler)
 from homeassistant.config import async_notify_setup_error
 from homeassistant.const import EVENT_COMPONENT_LOADED, PLATFORM_FORMAT
 from homeassistant.exceptions import HomeAssistantError
@@ -98,7 +99,9 @@ async def _async_setup_component(hass: core.HomeAssistant,
         _LOGGER.error("Setup failed for %s: %s", domain, msg)
         async_notify_setup_error(hass, domain, link)
 
-    component = loader.get_component(domain)
+    with startup_profiler.timed(
+            hass, domain, startup_profiler.PHASE_IMPORT, blocking=True):
+        component = loader.get_component(domain)
 
     if not component:
         log_error("Component not found.", False)
@@ -112,8 +115,10 @@ async def _async_setup_component(hass: core.HomeAssistant,
         log_error("Unable to resolve component or dependencies.")
         return False
 
-    processed_config = \
-        conf_util.async_process_component_config(hass, config, domain)
+    with startup_profiler.timed(
+            hass, domain, startup_profiler.PHASE_CONFIG, blocking=True):
+        processed_config = \
+            conf_util.async_process_component_config(hass, config, domain)
 
     if processed_config is None:
         log_error("Invalid config.")
@@ -139,10 +144,13 @@ async def _async_setup_component(hass: core.HomeAssistant,
 
     try:
         if hasattr(component, 'async_setup'):
-            result = await component.async_setup(hass, processed_config)
+            result = await startup_profiler.async_timed_setup(
+                hass, domain, component.async_setup(hass, processed_config))
         else:
-            result = await hass.async_add_job(
-                component.setup, hass, processed_config)
+            with startup_profiler.timed(
+                    hass, domain, startup_profiler.PHASE_SETUP):
+                result = await hass.async_add_job(
+                    component.setup, hass, processed_config)
     except Exception:  # pylint: disable=broad-except
         _LOGGER.exception("Error during setup of component %s", domain)
         async_notify_setup_error(hass, domain, True)
@@ -193,7 +201,9 @@ async def async_prepare_setup_platform(hass: core.HomeAssistant, config,
                       platform_path, msg)
         async_notify_setup_error(hass, platform_path)
 
-    platform = loader.get_platform(domain, platform_name)
+    with startup_profiler.timed(hass, platform_path,
+                                startup_profiler.PHASE_IMPORT, blocking=True):
+        platform = loader.get_platform(domain, platform_name)
 
     # Not found
     if platform is None:
@@ -227,15 +237,20 @@ async def async_process_deps_reqs(hass, config, name, module):
         return
 
     if hasattr(module, 'DEPENDENCIES'):
-        dep_success = await _async_process_dependencies(
-            hass, config, name, module.DEPENDENCIES)
+        with startup_profiler.timed(
+                hass, name, startup_profiler.PHASE_DEPENDENCIES,
+                dependencies=module.DEPENDENCIES):
+            dep_success = await _async_process_dependencies(
+                hass, config, name, module.DEPENDENCIES)
 
         if not dep_success:
             raise HomeAssistantError("Could not setup all dependencies.")
 
     if not hass.config.skip_pip and hasattr(module, 'REQUIREMENTS'):
-        req_success = await requirements.async_process_requirements(
-            hass, name, module.REQUIREMENTS)
+        with startup_profiler.timed(
+                hass, name, startup_profiler.PHASE_REQUIREMENTS):
+            req_success = await requirements.async_process_requirements(
+                hass, name, module.REQUIREMENTS)
 
         if not req_success:
             raise HomeAssistantError("Could not install all requirements.")
@@ -0,0 +1,209 @@
+"""Record where Home Assistant spends its startup time.
+
+The profiler is opt-in (``hass --profile-startup``). When enabled it records
+for every component and platform the wall time of each setup phase, the time
+the event loop was blocked by it and which dependency held it up. The result
+is saved as JSON in the config directory and can be summarized with
+``hass --script startup_profile``.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+import logging
+from timeit import default_timer as timer
+
+from homeassistant.core import callback
+from homeassistant.util.json import save_json
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STARTUP_PROFILER = 'startup_profiler'
+STARTUP_PROFILE_FILE = '.startup_profile.json'
+
+PHASE_CONFIG = 'config'
+PHASE_DEPENDENCIES = 'dependencies'
+PHASE_IMPORT = 'import'
+PHASE_REQUIREMENTS = 'requirements'
+PHASE_SETUP = 'setup'
+
+
+class SetupRecord(object):
+    """Timings of the setup of a single component or platform."""
+
+    __slots__ = ['start', 'end', 'blocking', 'phases', 'dependencies']
+
+    def __init__(self):
+        """Initialize an empty record."""
+        self.start = None
+        self.end = None
+        self.blocking = 0.0
+        self.phases = OrderedDict()
+        self.dependencies = []
+
+    def as_dict(self):
+        """Return a JSON serializable dict of the record."""
+        return {
+            'start': round(self.start, 4),
+            'end': round(self.end, 4),
+            'wall': round(self.end - self.start, 4),
+            'blocking': round(self.blocking, 4),
+            'phases': OrderedDict(
+                (phase, round(elapsed, 4))
+                for phase, elapsed in self.phases.items()),
+            'dependencies': self.dependencies,
+        }
+
+
+class StartupProfiler(object):
+    """Collect setup records during startup."""
+
+    def __init__(self):
+        """Initialize the profiler."""
+        self.started = timer()
+        self.records = OrderedDict()
+
+    def record(self, name):
+        """Return the record of a component or platform."""
+        record = self.records.get(name)
+        if record is None:
+            record = self.records[name] = SetupRecord()
+        return record
+
+    def add_time(self, name, phase, start, end, blocking=False):
+        """Add a timed phase, given as timer values, to a record."""
+        record = self.record(name)
+        start -= self.started
+        end -= self.started
+        if record.start is None or start < record.start:
+            record.start = start
+        if record.end is None or end > record.end:
+            record.end = end
+        record.phases[phase] = record.phases.get(phase, 0) + end - start
+        if blocking:
+            record.blocking += end - start
+
+    def critical_path(self):
+        """Return the chain of setups that finished last.
+
+        Starting from the setup that finished last, each step goes to the
+        dependency that kept it waiting the longest.
+        """
+        records = {name: record for name, record in self.records.items()
+                   if record.end is not None}
+        if not records:
+            return []
+
+        name = max(records, key=lambda name: records[name].end)
+        path = [name]
+        while True:
+            deps = [dep for dep in records[name].dependencies
+                    if dep in records and dep not in path]
+            if not deps:
+                break
+            name = max(deps, key=lambda dep: records[dep].end)
+            path.append(name)
+
+        path.reverse()
+        return path
+
+    def as_dict(self):
+        """Return the startup report."""
+        return {
+            'total': round(timer() - self.started, 4),
+            'critical_path': self.critical_path(),
+            'setups': OrderedDict(
+                (name, record.as_dict())
+                for name, record in self.records.items()
+                if record.end is not None),
+        }
+
+
+class _BlockingTimer(object):
+    """Await a coroutine, counting the time its steps block the loop."""
+
+    __slots__ = ['_coro', '_record']
+
+    def __init__(self, coro, record):
+        """Initialize the timer."""
+        self._coro = coro
+        self._record = record
+
+    def __await__(self):
+        """Drive the coroutine one step at a time."""
+        coro = self._coro
+        value = error = None
+
+        while True:
+            start = timer()
+            try:
+                if error is None:
+                    future = coro.send(value)
+                else:
+                    future = coro.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._record.blocking += timer() - start
+
+            try:
+                value = yield future
+                error = None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as err:  # pylint: disable=broad-except
+                value, error = None, err
+
+
+@callback
+def async_enable(hass):
+    """Start recording setup timings."""
+    hass.data[DATA_STARTUP_PROFILER] = StartupProfiler()
+
+
+@contextmanager
+def timed(hass, name, phase, blocking=False, dependencies=None):
+    """Time a setup phase of a component or platform.
+
+    Pass blocking=True for synchronous code that runs inside the event loop.
+    Does nothing when the profiler is not enabled.
+    """
+    profiler = hass.data.get(DATA_STARTUP_PROFILER)
+    if profiler is None:
+        yield
+        return
+
+    if dependencies:
+        profiler.record(name).dependencies = list(dependencies)
+
+    start = timer()
+    try:
+        yield
+    finally:
+        profiler.add_time(name, phase, start, timer(), blocking)
+
+
+async def async_timed_setup(hass, name, coro):
+    """Await the setup coroutine of a component or platform.
+
+    The time spent inside the steps of the coroutine is recorded as blocking
+    time, the time until it finishes as the setup phase.
+    """
+    profiler = hass.data.get(DATA_STARTUP_PROFILER)
+    if profiler is None or not hasattr(coro, 'send'):
+        return await coro
+
+    with timed(hass, name, PHASE_SETUP):
+        return await _BlockingTimer(coro, profiler.record(name))
+
+
+async def async_save_report(hass):
+    """Save the startup report to the config directory."""
+    profiler = hass.data.pop(DATA_STARTUP_PROFILER, None)
+    if profiler is None:
+        return
+
+    report = profiler.as_dict()
+    path = hass.config.path(STARTUP_PROFILE_FILE)
+    await hass.async_add_job(save_json, path, report)
+    _LOGGER.info("Startup profile saved to %s, critical path: %s", path,
+                 ' -> '.join(report['critical_path']))
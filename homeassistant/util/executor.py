@@ -0,0 +1,117 @@
+"""Thread pool executors that grow with their backlog."""
+from concurrent.futures import Executor, Future
+import queue
+import threading
+from time import monotonic
+
+
+class ExecutorPool(Executor):
+    """Thread pool that adds workers while jobs are waiting for one.
+
+    A worker is started when a job is submitted and no worker is free to
+    take it, up to max_workers. Workers are kept until the pool is shut
+    down.
+    """
+
+    def __init__(self, name, max_workers):
+        """Initialize the pool."""
+        self.name = name
+        self.max_workers = max_workers
+        self.jobs = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._queue = queue.Queue()
+        self._workers = []
+        self._idle = 0
+        self._waiting = 0
+        self._shutdown = False
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit a job, adding a worker if none is free to run it."""
+        future = Future()
+
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError(
+                    'cannot schedule new futures after shutdown')
+
+            self._queue.put((future, monotonic(), fn, args, kwargs))
+            self._waiting += 1
+
+            if (self._waiting > self._idle and
+                    len(self._workers) < self.max_workers):
+                worker = threading.Thread(
+                    target=self._run_worker, daemon=True,
+                    name='{}_{}'.format(self.name, len(self._workers)))
+                self._workers.append(worker)
+                worker.start()
+
+        return future
+
+    def shutdown(self, wait=True):
+        """Stop the workers once the submitted jobs are done."""
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+            for _ in workers:
+                self._queue.put(None)
+
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def stats(self):
+        """Return the queue depth, the workers and the time jobs waited."""
+        with self._lock:
+            return {
+                'queued': self._waiting,
+                'workers': len(self._workers),
+                'max_workers': self.max_workers,
+                'jobs': self.jobs,
+                'total_wait': self.total_wait,
+                'max_wait': self.max_wait,
+            }
+
+    def _run_worker(self):
+        """Run jobs from the queue until the pool is shut down."""
+        with self._lock:
+            self._idle += 1
+
+        while True:
+            item = self._queue.get()
+
+            with self._lock:
+                self._idle -= 1
+                if item is None:
+                    return
+
+                future, queued, fn, args, kwargs = item
+                wait = monotonic() - queued
+                self._waiting -= 1
+                self.jobs += 1
+                self.total_wait += wait
+                if wait > self.max_wait:
+                    self.max_wait = wait
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as exc:  # pylint: disable=broad-except
+                    exception = exc
+                else:
+                    exception = None
+            else:
+                future = None
+
+            # Free before the job's caller sees the result, so a job it
+            # submits next does not start another worker
+            with self._lock:
+                self._idle += 1
+
+            if future is None:
+                continue
+            if exception is None:
+                future.set_result(result)
+            else:
+                future.set_exception(exception)
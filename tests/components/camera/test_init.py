@@ -136,3 +136,119 @@ def test_snapshot_service(hass, mock_camera):
 
         assert len(mock_write.mock_calls) == 1
         assert mock_write.mock_calls[0][1][0] == b'Test'
+
+
+class QueueCamera(camera.Camera):
+    """Camera returning the images put in a queue."""
+
+    def __init__(self, hass):
+        """Initialize the camera."""
+        super().__init__()
+        self.hass = hass
+        self.entity_id = 'camera.queue'
+        self.images = asyncio.Queue(loop=hass.loop)
+        self.fetched = 0
+
+    @asyncio.coroutine
+    def async_camera_image(self):
+        """Return the next image."""
+        image = yield from self.images.get()
+        self.fetched += 1
+        return image
+
+
+@asyncio.coroutine
+def _async_fetch_all(cam):
+    """Wait until the stream hub fetched all queued images."""
+    while not cam.images.empty():
+        yield from asyncio.sleep(0, loop=cam.hass.loop)
+
+
+@asyncio.coroutine
+def test_stream_hub_shares_frames(hass):
+    """Test images are fetched once for all clients of a camera."""
+    cam = QueueCamera(hass)
+    hub = cam.stream_hub
+
+    with patch.object(camera, 'STREAM_INTERVAL', 0):
+        client1 = hub.async_add_client()
+        client2 = hub.async_add_client()
+
+        cam.images.put_nowait(b'one')
+        frame = yield from client1.async_get_frame()
+        assert frame == (b'--frameboundary\r\nContent-Type: image/jpeg\r\n'
+                         b'Content-Length: 3\r\n\r\none\r\n')
+        assert (yield from client2.async_get_frame()) is frame
+
+        # Unchanged images are not sent again, frames replaced before
+        # they were sent are dropped
+        for image in (b'one', b'two', b'three'):
+            cam.images.put_nowait(image)
+        yield from _async_fetch_all(cam)
+
+        for client in (client1, client2):
+            frame = yield from client.async_get_frame()
+            assert frame.endswith(b'three\r\n')
+            assert client.sent == 2
+            assert client.dropped == 1
+
+        assert cam.fetched == 4
+
+        # A new client starts with the latest frame
+        client3 = hub.async_add_client()
+        assert (yield from client3.async_get_frame()) is frame
+
+        # Fetching stops without clients
+        for client in (client1, client2, client3):
+            hub.async_remove_client(client)
+        yield from asyncio.sleep(0, loop=hass.loop)
+
+        assert hub.frame is None
+        cam.images.put_nowait(b'four')
+        yield from asyncio.sleep(0, loop=hass.loop)
+        assert cam.fetched == 4
+
+
+@asyncio.coroutine
+def test_stream_hub_ends_without_image(hass):
+    """Test the clients are closed if the camera returns no image."""
+    cam = QueueCamera(hass)
+    hub = cam.stream_hub
+
+    with patch.object(camera, 'STREAM_INTERVAL', 0):
+        client = hub.async_add_client()
+        cam.images.put_nowait(b'one')
+        cam.images.put_nowait(None)
+
+        assert (yield from client.async_get_frame()).endswith(b'one\r\n')
+        assert (yield from client.async_get_frame()) is None
+        assert not hub.clients
+
+        # A new client starts fetching again
+        client = hub.async_add_client()
+        cam.images.put_nowait(b'two')
+        assert (yield from client.async_get_frame()).endswith(b'two\r\n')
+        hub.async_remove_client(client)
+
+
+@asyncio.coroutine
+def test_mjpeg_stream(hass, test_client):
+    """Test the MJPEG stream sends the first frame twice."""
+    yield from async_setup_component(hass, 'camera', {
+        camera.DOMAIN: {
+            'platform': 'demo'
+        }
+    })
+    client = yield from test_client(hass.http.app)
+    frame = (b'--frameboundary\r\nContent-Type: image/jpeg\r\n'
+             b'Content-Length: 4\r\n\r\nTest\r\n')
+
+    with patch('homeassistant.components.camera.demo.DemoCamera.'
+               'camera_image', return_value=b'Test'):
+        resp = yield from client.get(
+            '/api/camera_proxy_stream/camera.demo_camera')
+        assert resp.status == 200
+        body = yield from resp.content.readexactly(2 * len(frame))
+        resp.close()
+
+    assert body == 2 * frame
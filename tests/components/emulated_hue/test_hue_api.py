@@ -163,6 +163,41 @@ def test_discover_lights(hue_client):
     assert 'fan.ceiling_fan' not in devices
 
 
+@asyncio.coroutine
+def test_discover_lights_cached(hass_hue, hue_client):
+    """Test only changed entities are converted again."""
+    from homeassistant.components.emulated_hue import hue_api
+
+    result = yield from hue_client.get('/api/username/lights')
+    first_json = yield from result.json()
+
+    with patch.object(hue_api, 'entity_to_json',
+                      wraps=hue_api.entity_to_json) as mock_to_json:
+        result = yield from hue_client.get('/api/username/lights')
+        assert (yield from result.json()) == first_json
+        assert mock_to_json.call_count == 0
+
+        yield from hass_hue.services.async_call(
+            light.DOMAIN, const.SERVICE_TURN_ON,
+            {
+                const.ATTR_ENTITY_ID: 'light.ceiling_lights',
+                light.ATTR_BRIGHTNESS: 56
+            },
+            blocking=True)
+
+        result = yield from hue_client.get('/api/username/lights')
+        result_json = yield from result.json()
+        assert mock_to_json.call_count == 1
+        assert result_json['light.ceiling_lights']['state'][
+            HUE_API_STATE_BRI] == 56
+
+    hass_hue.states.async_remove('media_player.walkman')
+    result = yield from hue_client.get('/api/username/lights')
+    result_json = yield from result.json()
+    assert 'media_player.walkman' not in result_json
+    assert len(result_json) == len(first_json) - 1
+
+
 @asyncio.coroutine
 def test_get_light_state(hass_hue, hue_client):
     """Test the getting of light state."""
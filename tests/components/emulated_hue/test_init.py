@@ -1,14 +1,22 @@
 """Test the Emulated Hue component."""
 import json
 
-from unittest.mock import patch, Mock, mock_open
+from unittest.mock import patch, mock_open
 
-from homeassistant.components.emulated_hue import Config, _LOGGER
+from homeassistant.components.emulated_hue import (
+    Config, _LOGGER)
 
 
-def test_config_google_home_entity_id_to_number():
+async def _run_scheduled_save(conf):
+    """Check a save is scheduled and run it."""
+    assert conf._sched_save is not None
+    await conf.async_save_numbers()
+    assert conf._sched_save is None
+
+
+async def test_config_google_home_entity_id_to_number(hass):
     """Test config adheres to the type."""
-    conf = Config(Mock(), {
+    conf = Config(hass, {
         'type': 'google_home'
     })
 
@@ -18,6 +26,8 @@ def test_config_google_home_entity_id_to_number():
     with patch('homeassistant.util.json.open', mop, create=True):
         number = conf.entity_id_to_number('light.test')
         assert number == '2'
+        assert handle.write.call_count == 0
+        await _run_scheduled_save(conf)
         assert handle.write.call_count == 1
         assert json.loads(handle.write.mock_calls[0][1][0]) == {
             '1': 'light.test2',
@@ -36,9 +46,9 @@ def test_config_google_home_entity_id_to_number():
         assert entity_id == 'light.test2'
 
 
-def test_config_google_home_entity_id_to_number_altered():
+async def test_config_google_home_entity_id_to_number_altered(hass):
     """Test config adheres to the type."""
-    conf = Config(Mock(), {
+    conf = Config(hass, {
         'type': 'google_home'
     })
 
@@ -48,6 +58,8 @@ def test_config_google_home_entity_id_to_number_altered():
     with patch('homeassistant.util.json.open', mop, create=True):
         number = conf.entity_id_to_number('light.test')
         assert number == '22'
+        assert handle.write.call_count == 0
+        await _run_scheduled_save(conf)
         assert handle.write.call_count == 1
         assert json.loads(handle.write.mock_calls[0][1][0]) == {
             '21': 'light.test2',
@@ -66,9 +78,9 @@ def test_config_google_home_entity_id_to_number_altered():
         assert entity_id == 'light.test2'
 
 
-def test_config_google_home_entity_id_to_number_empty():
+async def test_config_google_home_entity_id_to_number_empty(hass):
     """Test config adheres to the type."""
-    conf = Config(Mock(), {
+    conf = Config(hass, {
         'type': 'google_home'
     })
 
@@ -78,6 +90,8 @@ def test_config_google_home_entity_id_to_number_empty():
     with patch('homeassistant.util.json.open', mop, create=True):
         number = conf.entity_id_to_number('light.test')
         assert number == '1'
+        assert handle.write.call_count == 0
+        await _run_scheduled_save(conf)
         assert handle.write.call_count == 1
         assert json.loads(handle.write.mock_calls[0][1][0]) == {
             '1': 'light.test',
@@ -89,6 +103,7 @@ def test_config_google_home_entity_id_to_number_empty():
 
         number = conf.entity_id_to_number('light.test2')
         assert number == '2'
+        await _run_scheduled_save(conf)
         assert handle.write.call_count == 2
 
         entity_id = conf.number_to_entity_id('2')
@@ -126,3 +141,24 @@ def test_warning_config_google_home_listen_port():
         assert mock_warn.called
         assert mock_warn.mock_calls[0][1][0] == \
             "When targeting Google Home, listening port has to be port 80"
+
+
+async def test_config_google_home_saves_once(hass):
+    """Test numbers assigned in a row are saved once."""
+    conf = Config(hass, {
+        'type': 'google_home'
+    })
+
+    mop = mock_open(read_data='')
+    handle = mop()
+
+    with patch('homeassistant.util.json.open', mop, create=True):
+        for i in range(10):
+            assert conf.entity_id_to_number('light.test{}'.format(i)) == \
+                str(i + 1)
+
+        await _run_scheduled_save(conf)
+        await conf.async_save_numbers()
+
+    assert handle.write.call_count == 1
+    assert len(json.loads(handle.write.mock_calls[0][1][0])) == 10
@@ -1,4 +1,6 @@
 """Test Google Smart Home."""
+from unittest.mock import patch
+
 from homeassistant.core import State
 from homeassistant.const import (
     ATTR_SUPPORTED_FEATURES, ATTR_UNIT_OF_MEASUREMENT, TEMP_CELSIUS)
@@ -259,3 +261,56 @@ def test_serialize_input_boolean():
         'type': 'action.devices.types.SWITCH',
         'willReportState': False,
     }
+
+
+async def test_sync_query_cached(hass):
+    """Test SYNC and QUERY only serialize entities that changed."""
+    hass.states.async_set('switch.one', 'on')
+    hass.states.async_set('switch.two', 'off')
+
+    config = helpers.Config(
+        should_expose=lambda state: True,
+        agent_user_id='test-agent',
+    )
+    sync_msg = {
+        'requestId': REQ_ID,
+        'inputs': [{'intent': 'action.devices.SYNC'}],
+    }
+    query_msg = {
+        'requestId': REQ_ID,
+        'inputs': [{
+            'intent': 'action.devices.QUERY',
+            'payload': {'devices': [{'id': 'switch.one'}]},
+        }],
+    }
+
+    await sh.async_handle_message(hass, config, sync_msg)
+    await sh.async_handle_message(hass, config, query_msg)
+
+    with patch.object(sh._GoogleEntity, 'sync_serialize',
+                      autospec=True,
+                      side_effect=sh._GoogleEntity.sync_serialize) \
+            as mock_sync, \
+            patch.object(sh._GoogleEntity, 'query_serialize',
+                         autospec=True,
+                         side_effect=sh._GoogleEntity.query_serialize) \
+            as mock_query:
+        result = await sh.async_handle_message(hass, config, sync_msg)
+        assert len(result['payload']['devices']) == 2
+        result = await sh.async_handle_message(hass, config, query_msg)
+        assert result['payload']['devices']['switch.one']['on'] is True
+        assert mock_sync.call_count == 0
+        assert mock_query.call_count == 0
+
+        hass.states.async_set('switch.one', 'off')
+        hass.states.async_remove('switch.two')
+
+        result = await sh.async_handle_message(hass, config, sync_msg)
+        assert [device['id'] for device in result['payload']['devices']] == \
+            ['switch.one']
+        result = await sh.async_handle_message(hass, config, query_msg)
+        assert result['payload']['devices']['switch.one']['on'] is False
+        assert mock_sync.call_count == 1
+        assert mock_query.call_count == 1
+
+    assert list(config.sync_cache) == ['switch.one']
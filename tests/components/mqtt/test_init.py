@@ -616,3 +616,84 @@ def test_mqtt_subscribes_topics_on_connect(hass):
     }
     calls = {call[1][1]: call[1][2] for call in hass.add_job.mock_calls}
     assert calls == expected
+
+
+def test_subscription_trie():
+    """Test topics are matched against the subscription trie."""
+    trie = mqtt._SubscriptionTrie()
+    subs = {topic: mqtt.Subscription(topic, None) for topic in (
+        'a/b/c', 'a/+/c', 'a/#', '+/b', '#', 'x/y')}
+    for sub in subs.values():
+        trie.add(sub)
+
+    def matches(topic):
+        return sorted(sub.topic for sub in trie.matches(topic))
+
+    assert matches('a/b/c') == ['#', 'a/#', 'a/+/c', 'a/b/c']
+    assert matches('a/d/c') == ['#', 'a/#', 'a/+/c']
+    assert matches('a') == ['#', 'a/#']
+    assert matches('ab') == ['#']
+    assert matches('q/b') == ['#', '+/b']
+    assert matches('x/y/z') == ['#']
+
+    trie.remove(subs['x/y'])
+    trie.remove(subs['#'])
+    assert matches('x/y') == []
+    assert 'x' not in trie._root.children
+
+    trie.remove(subs['a/b/c'])
+    assert matches('a/b/c') == ['a/#', 'a/+/c']
+    assert 'b' not in trie._root.children['a'].children
+
+
+@asyncio.coroutine
+def test_messages_handled_in_batches(hass):
+    """Test messages from the paho thread are handed over in one batch."""
+    yield from async_mock_mqtt_client(hass)
+    calls = []
+
+    @callback
+    def record_calls(*args):
+        """Record calls."""
+        calls.append(args)
+
+    yield from mqtt.async_subscribe(hass, 'test/+', record_calls)
+
+    with mock.patch.object(hass.loop, 'call_soon_threadsafe',
+                           wraps=hass.loop.call_soon_threadsafe) as mock_call:
+        for i in range(3):
+            hass.data['mqtt']._mqtt_on_message(
+                None, None, mqtt.Message('test/{}'.format(i), b'on'))
+        yield from hass.async_block_till_done()
+
+    assert mock_call.call_count == 1
+    assert calls == [('test/0', 'on', 0), ('test/1', 'on', 0),
+                     ('test/2', 'on', 0)]
+
+
+@asyncio.coroutine
+def test_failing_subscriber_does_not_drop_batch(hass):
+    """Test one failing message does not drop the rest of its batch."""
+    yield from async_mock_mqtt_client(hass)
+    calls = []
+
+    @callback
+    def raise_error(*args):
+        """Fail on every message."""
+        raise ValueError('Broken')
+
+    @callback
+    def record_calls(*args):
+        """Record calls."""
+        calls.append(args)
+
+    yield from mqtt.async_subscribe(hass, 'broken', raise_error)
+    yield from mqtt.async_subscribe(hass, 'working', record_calls)
+
+    hass.data['mqtt']._mqtt_on_message(
+        None, None, mqtt.Message('broken', b'on'))
+    hass.data['mqtt']._mqtt_on_message(
+        None, None, mqtt.Message('working', b'on'))
+    yield from hass.async_block_till_done()
+
+    assert calls == [('working', 'on', 0)]
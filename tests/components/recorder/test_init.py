@@ -5,12 +5,16 @@ from unittest.mock import patch
 
 import pytest
 
-from homeassistant.core import callback
-from homeassistant.const import MATCH_ALL
+from homeassistant.core import Event, State, callback
+from homeassistant.const import EVENT_STATE_CHANGED, MATCH_ALL
+import homeassistant.util.dt as dt_util
+from homeassistant.util.json import save_json
+from homeassistant.components import recorder
 from homeassistant.components.recorder import Recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.util import session_scope
-from homeassistant.components.recorder.models import States, Events
+from homeassistant.components.recorder.models import (
+    Events, StateAttributes, States)
 
 from tests.common import get_test_home_assistant, init_recorder_component
 
@@ -189,6 +193,125 @@ def test_saving_state_include_domain_exclude_entity(hass_recorder):
     assert hass.states.get('test.ok').state == 'state2'
 
 
+def test_saving_state_batched(hass_recorder):
+    """Test saving states that are committed in a single transaction."""
+    hass = hass_recorder({'commit_interval': 0.5, 'max_batch_size': 100})
+    attributes = {'test_attr': 5}
+    entity_ids = ['test.recorder{}'.format(idx) for idx in range(10)]
+
+    for entity_id in entity_ids:
+        hass.states.set(entity_id, 'on', attributes)
+    hass.block_till_done()
+    hass.data[DATA_INSTANCE].block_till_done()
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States))
+        event_ids = [event.event_id for event in session.query(Events)]
+        assert len(db_states) == len(entity_ids)
+        assert all(state.event_id in event_ids for state in db_states)
+        states = [state.to_native() for state in db_states]
+
+    for state in states:
+        assert hass.states.get(state.entity_id) == state
+
+
+def test_saving_state_deduplicates_attributes(hass_recorder):
+    """Test states with the same attributes share one attributes row."""
+    hass = hass_recorder()
+    attributes = {'test_attr': 5, 'test_attr_10': 'nice'}
+
+    hass.states.set('test.one', 'on', attributes)
+    hass.states.set('test.two', 'on', attributes)
+    hass.states.set('test.one', 'off', {'test_attr': 6})
+    hass.block_till_done()
+    hass.data[DATA_INSTANCE].block_till_done()
+
+    # Written again after the attributes ids were cached
+    hass.states.set('test.two', 'off', attributes)
+    hass.block_till_done()
+    hass.data[DATA_INSTANCE].block_till_done()
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert session.query(StateAttributes).count() == 2
+        assert [state.attributes for state in db_states] == [None] * 4
+        assert db_states[0].attributes_id == db_states[1].attributes_id
+        assert db_states[0].attributes_id == db_states[3].attributes_id
+        assert db_states[0].attributes_id != db_states[2].attributes_id
+        states = [state.to_native() for state in db_states]
+
+    assert states[2] == hass.states.get('test.one')
+    assert states[3] == hass.states.get('test.two')
+
+
+def test_commit_batch():
+    """Test a batch of events is written in one go."""
+    hass = get_test_home_assistant()
+    rec = Recorder(hass, keep_days=7, purge_interval=2, uri='sqlite://',
+                   include={}, exclude={})
+    rec._setup_connection()
+    rec._setup_run()
+
+    state = State('test.recorder', 'on', {'test_attr': 5})
+    batch = [
+        Event('test_event', {'idx': 1}),
+        Event(EVENT_STATE_CHANGED, {
+            'entity_id': state.entity_id,
+            'old_state': None,
+            'new_state': state,
+        }),
+    ]
+    for event in batch:
+        rec.queue.put(event)
+        rec.queue.get()
+
+    rec._commit_batch(batch)
+
+    assert batch == []
+    assert rec.queue.unfinished_tasks == 0
+
+    with session_scope(session=rec.get_session()) as session:
+        assert session.query(Events).count() == 2
+        db_states = list(session.query(States))
+        assert len(db_states) == 1
+        assert db_states[0].event_id is not None
+        assert db_states[0].to_native() == state
+
+    rec._close_connection()
+    hass.stop()
+
+
+def test_state_snapshot(tmpdir):
+    """Test the recorded states are saved in a snapshot on shutdown."""
+    hass = get_test_home_assistant()
+    init_recorder_component(hass, {
+        'exclude': {'entities': ['test.excluded']}})
+    hass.data[DATA_INSTANCE].snapshot_path = str(tmpdir.join('snapshot'))
+    hass.start()
+
+    hass.states.set('test.recorder', 'on', {'test_attr': 5})
+    hass.states.set('test.excluded', 'off')
+    hass.block_till_done()
+    state = hass.states.get('test.recorder')
+
+    assert recorder.load_state_snapshot(hass, dt_util.utcnow()) is None
+
+    hass.stop()
+    run_end = dt_util.utcnow()
+
+    assert recorder.load_state_snapshot(hass, run_end) == [state]
+
+    # Not taken right before the end of the run, like after a crash
+    assert recorder.load_state_snapshot(
+        hass, run_end + recorder.SNAPSHOT_MAX_AGE) is None
+    assert recorder.load_state_snapshot(
+        hass, run_end - recorder.SNAPSHOT_MAX_AGE) is None
+
+    # Not written by the recorder
+    save_json(hass.data[DATA_INSTANCE].snapshot_path, [{'time': 1}])
+    assert recorder.load_state_snapshot(hass, run_end) is None
+
+
 def test_recorder_setup_failure():
     """Test some exceptions."""
     hass = get_test_home_assistant()
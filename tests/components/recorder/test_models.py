@@ -1,4 +1,5 @@
 """The tests for the Recorder component."""
+import json
 import unittest
 from datetime import datetime
 
@@ -9,7 +10,7 @@ import homeassistant.core as ha
 from homeassistant.const import EVENT_STATE_CHANGED
 from homeassistant.util import dt
 from homeassistant.components.recorder.models import (
-    Base, Events, States, RecorderRuns)
+    Base, Events, LazyState, States, RecorderRuns)
 
 ENGINE = None
 SESSION = None
@@ -79,6 +80,36 @@ class TestStates(unittest.TestCase):
         assert db_state.last_updated == event.time_fired
 
 
+class TestLazyState(unittest.TestCase):
+    """Test LazyState."""
+
+    # pylint: disable=no-self-use
+    def test_from_row(self):
+        """Test building a state from a row."""
+        state = ha.State('sensor.temperature', '18', {'unit': 'C'})
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'sensor.temperature',
+            'old_state': None,
+            'new_state': state,
+        })
+        lazy_state = LazyState(States.from_event(event))
+
+        assert json.loads(lazy_state.as_json()) == \
+            json.loads(state.as_json())
+        assert lazy_state._attributes is None
+        assert lazy_state == state
+        assert lazy_state.attributes == {'unit': 'C'}
+
+    def test_invalid_attributes(self):
+        """Test a row with attributes that are not valid JSON."""
+        lazy_state = LazyState(States(
+            entity_id='sensor.temperature', state='18', attributes='{',
+            last_changed=datetime(2016, 7, 9, 11, 0, 0, tzinfo=dt.UTC),
+            last_updated=datetime(2016, 7, 9, 11, 0, 0, tzinfo=dt.UTC)))
+
+        assert lazy_state.attributes == {}
+
+
 class TestRecorderRuns(unittest.TestCase):
     """Test recorder run model."""
 
@@ -2,12 +2,13 @@
 import json
 from datetime import datetime, timedelta
 import unittest
-from unittest.mock import patch
+from unittest.mock import call, patch
 
 from homeassistant.components import recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.purge import purge_old_data
-from homeassistant.components.recorder.models import States, Events
+from homeassistant.components.recorder.models import (
+    Events, StateAttributes, States)
 from homeassistant.components.recorder.util import session_scope
 from tests.common import get_test_home_assistant, init_recorder_component
 
@@ -132,6 +133,62 @@ class TestRecorderPurge(unittest.TestCase):
             # we should only have 3 states left after purging
             self.assertEqual(states.count(), 3)
 
+    @patch('homeassistant.components.recorder.purge.PURGE_BATCH_SIZE', 2)
+    def test_purge_old_states_in_batches(self):
+        """Test deleting old states takes several bounded batches."""
+        self._add_test_states()
+        instance = self.hass.data[DATA_INSTANCE]
+
+        with session_scope(hass=self.hass) as session:
+            states = session.query(States)
+            self.assertEqual(states.count(), 7)
+
+            self.assertFalse(purge_old_data(instance, 4, repack=False))
+            self.assertEqual(states.count(), 5)
+
+            self.assertFalse(purge_old_data(instance, 4, repack=False))
+            self.assertTrue(purge_old_data(instance, 4, repack=False))
+            self.assertEqual(states.count(), 3)
+
+    @patch('homeassistant.components.recorder.purge.PURGE_BATCH_SIZE', 1)
+    def test_purge_service_continues_batches(self):
+        """Test the recorder keeps purging until all batches are done."""
+        self._add_test_events()
+        self._add_test_states()
+
+        self.hass.services.call('recorder', 'purge',
+                                service_data={'keep_days': 4})
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            self.assertEqual(session.query(States).count(), 3)
+            self.assertEqual(session.query(Events).filter(
+                Events.event_type.like("EVENT_TEST%")).count(), 3)
+
+    def test_purge_unused_state_attributes(self):
+        """Test deleting attributes no state refers to anymore."""
+        with session_scope(hass=self.hass) as session:
+            session.add(StateAttributes(hash=1, shared_attrs='{"used": 1}'))
+            session.add(StateAttributes(hash=2, shared_attrs='{"unused": 1}'))
+            session.flush()
+            session.add(States(
+                entity_id='test.recorder', domain='test', state='on',
+                attributes_id=session.query(StateAttributes.attributes_id)
+                .filter_by(hash=1).scalar(),
+                last_changed=datetime.now(), last_updated=datetime.now()))
+
+        instance = self.hass.data[DATA_INSTANCE]
+        instance.state_attributes_ids['{"unused": 1}'] = 2
+
+        purge_old_data(instance, 4, repack=False)
+
+        with session_scope(hass=self.hass) as session:
+            self.assertEqual(
+                [row.shared_attrs for row in session.query(StateAttributes)],
+                ['{"used": 1}'])
+        self.assertEqual(len(instance.state_attributes_ids), 0)
+
     def test_purge_old_events(self):
         """Test deleting old events."""
         self._add_test_events()
@@ -207,5 +264,5 @@ class TestRecorderPurge(unittest.TestCase):
                                         service_data=service_data)
                 self.hass.block_till_done()
                 self.hass.data[DATA_INSTANCE].block_till_done()
-                self.assertEqual(mock_logger.debug.mock_calls[4][1][0],
-                                 "Vacuuming SQLite to free space")
+                self.assertIn(call("Vacuuming SQLite to free space"),
+                              mock_logger.debug.mock_calls)
@@ -1,5 +1,10 @@
 """The test for the Template sensor platform."""
+from datetime import datetime
+from unittest.mock import patch
+
+from homeassistant.helpers import template
 from homeassistant.setup import setup_component
+import homeassistant.util.dt as dt_util
 
 from tests.common import get_test_home_assistant, assert_setup_component
 
@@ -171,6 +176,74 @@ class TestTemplateSensor:
         state = self.hass.states.get('sensor.test_template_sensor')
         assert state.state == 'unknown'
 
+    def test_template_rendered_once_per_change(self):
+        """Test the template is only rendered when a state it read changes."""
+        with assert_setup_component(1):
+            assert setup_component(self.hass, 'sensor', {
+                'sensor': {
+                    'platform': 'template',
+                    'sensors': {
+                        'test_template_sensor': {
+                            'value_template':
+                                "It {{ states.sensor.test_state.state }}."
+                        }
+                    }
+                }
+            })
+
+        self.hass.start()
+        self.hass.block_till_done()
+
+        renders = []
+        orig_render = template.Template.async_render
+
+        def async_render(tmpl, *args, **kwargs):
+            """Count the renders."""
+            renders.append(tmpl.template)
+            return orig_render(tmpl, *args, **kwargs)
+
+        with patch.object(template.Template, 'async_render', async_render):
+            self.hass.states.set('sensor.other', 'on')
+            self.hass.block_till_done()
+            assert renders == []
+
+            self.hass.states.set('sensor.test_state', 'Works')
+            self.hass.block_till_done()
+
+        assert len(renders) == 1
+        state = self.hass.states.get('sensor.test_template_sensor')
+        assert state.state == 'It Works.'
+
+    def test_template_without_entities(self):
+        """Test a template that reads no states updates on any change."""
+        now = [datetime(2018, 3, 1, 10, tzinfo=dt_util.UTC)]
+
+        with patch.dict(template.ENV.globals, {'now': lambda: now[0]}):
+            with assert_setup_component(1):
+                assert setup_component(self.hass, 'sensor', {
+                    'sensor': {
+                        'platform': 'template',
+                        'sensors': {
+                            'test_template_sensor': {
+                                'value_template': "{{ now().hour }}"
+                            }
+                        }
+                    }
+                })
+
+            self.hass.start()
+            self.hass.block_till_done()
+
+            state = self.hass.states.get('sensor.test_template_sensor')
+            assert state.state == '10'
+
+            now[0] = datetime(2018, 3, 1, 11, tzinfo=dt_util.UTC)
+            self.hass.states.set('sensor.any', 'on')
+            self.hass.block_till_done()
+
+        state = self.hass.states.get('sensor.test_template_sensor')
+        assert state.state == '11'
+
     def test_invalid_name_does_not_create(self):
         """Test invalid name."""
         with assert_setup_component(0):
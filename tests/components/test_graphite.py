@@ -50,7 +50,10 @@ class TestGraphite(unittest.TestCase):
         self.assertTrue(setup_component(self.hass, graphite.DOMAIN, config))
         self.assertEqual(mock_gf.call_count, 1)
         self.assertEqual(
-            mock_gf.call_args, mock.call(self.hass, 'foo', 123, 'me')
+            mock_gf.call_args,
+            mock.call(self.hass, 'foo', 123, 'me', flush_interval=1,
+                      max_batch_size=500, max_queue_size=10000,
+                      stats_sensor=False)
         )
         self.assertEqual(mock_socket.call_count, 1)
         self.assertEqual(
@@ -100,19 +103,20 @@ class TestGraphite(unittest.TestCase):
 
     def test_shutdown(self):
         """Test the shutdown."""
-        with mock.patch.object(self.gf, '_queue') as mock_queue:
+        with mock.patch.object(self.gf, 'queue') as mock_queue:
             self.gf.shutdown('event')
-            self.assertEqual(mock_queue.put.call_count, 1)
-            self.assertEqual(
-                mock_queue.put.call_args, mock.call(self.gf._quit_object)
-            )
+            self.assertEqual(mock_queue.put_nowait.call_count, 1)
+            self.assertEqual(mock_queue.put_nowait.call_args, mock.call(None))
 
     def test_event_listener(self):
         """Test the event listener."""
-        with mock.patch.object(self.gf, '_queue') as mock_queue:
-            self.gf.event_listener('foo')
-            self.assertEqual(mock_queue.put.call_count, 1)
-            self.assertEqual(mock_queue.put.call_args, mock.call('foo'))
+        event = mock.MagicMock(data={'entity_id': 'entity',
+                                     'new_state': mock.MagicMock()})
+        with mock.patch.object(self.gf, 'queue') as mock_queue:
+            self.gf.event_listener(event)
+            self.assertEqual(mock_queue.put_nowait.call_count, 1)
+            self.assertEqual(mock_queue.put_nowait.call_args,
+                             mock.call(event))
 
     @patch('time.time')
     def test_report_attributes(self, mock_time):
@@ -132,10 +136,8 @@ class TestGraphite(unittest.TestCase):
             ]
 
         state = mock.MagicMock(state=0, attributes=attrs)
-        with mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
-            self.gf._report_attributes('entity', state)
-            actual = mock_send.call_args_list[0][0][0].split('\n')
-            self.assertEqual(sorted(expected), sorted(actual))
+        actual = self.gf._report_attributes('entity', state).split('\n')
+        self.assertEqual(sorted(expected), sorted(actual))
 
     @patch('time.time')
     def test_report_with_string_state(self, mock_time):
@@ -147,99 +149,83 @@ class TestGraphite(unittest.TestCase):
             ]
 
         state = mock.MagicMock(state='above_horizon', attributes={'foo': 1.0})
-        with mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
-            self.gf._report_attributes('entity', state)
-            actual = mock_send.call_args_list[0][0][0].split('\n')
-            self.assertEqual(sorted(expected), sorted(actual))
+        actual = self.gf._report_attributes('entity', state).split('\n')
+        self.assertEqual(sorted(expected), sorted(actual))
 
     @patch('time.time')
     def test_report_with_binary_state(self, mock_time):
         """Test the reporting with binary state."""
         mock_time.return_value = 12345
         state = ha.State('domain.entity', STATE_ON, {'foo': 1.0})
-        with mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
-            self.gf._report_attributes('entity', state)
-            expected = ['ha.entity.foo 1.000000 12345',
-                        'ha.entity.state 1.000000 12345']
-            actual = mock_send.call_args_list[0][0][0].split('\n')
-            self.assertEqual(sorted(expected), sorted(actual))
-
-        state.state = STATE_OFF
-        with mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
-            self.gf._report_attributes('entity', state)
-            expected = ['ha.entity.foo 1.000000 12345',
-                        'ha.entity.state 0.000000 12345']
-            actual = mock_send.call_args_list[0][0][0].split('\n')
-            self.assertEqual(sorted(expected), sorted(actual))
-
-    @patch('time.time')
-    def test_send_to_graphite_errors(self, mock_time):
+        expected = ['ha.entity.foo 1.000000 12345',
+                    'ha.entity.state 1.000000 12345']
+        actual = self.gf._report_attributes('entity', state).split('\n')
+        self.assertEqual(sorted(expected), sorted(actual))
+
+        state = ha.State('domain.entity', STATE_OFF, {'foo': 1.0})
+        expected = ['ha.entity.foo 1.000000 12345',
+                    'ha.entity.state 0.000000 12345']
+        actual = self.gf._report_attributes('entity', state).split('\n')
+        self.assertEqual(sorted(expected), sorted(actual))
+
+    def test_report_without_numbers(self):
+        """Test nothing is reported without numeric values."""
+        state = ha.State('domain.entity', 'foo', {'bar': 'baz'})
+        self.assertIsNone(self.gf._report_attributes('entity', state))
+
+    def test_send_to_graphite_errors(self):
         """Test the sending with errors."""
-        mock_time.return_value = 12345
-        state = ha.State('domain.entity', STATE_ON, {'foo': 1.0})
         with mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
             mock_send.side_effect = socket.error
-            self.gf._report_attributes('entity', state)
+            with self.assertRaises(socket.error):
+                self.gf.send(['foo'])
             mock_send.side_effect = socket.gaierror
-            self.gf._report_attributes('entity', state)
-
-    @patch('socket.socket')
-    def test_send_to_graphite(self, mock_socket):
-        """Test the sending of data."""
-        self.gf._send_to_graphite('foo')
-        self.assertEqual(mock_socket.call_count, 1)
+            with self.assertRaises(socket.gaierror):
+                self.gf.send(['foo'])
+
+    @patch('socket.create_connection')
+    def test_send_to_graphite(self, mock_connect):
+        """Test the sending of data over one connection."""
+        self.gf.send(['foo', 'bar'])
+        self.gf.send(['baz'])
+        self.assertEqual(mock_connect.call_count, 1)
         self.assertEqual(
-            mock_socket.call_args,
-            mock.call(socket.AF_INET, socket.SOCK_STREAM)
-        )
-        sock = mock_socket.return_value
-        self.assertEqual(sock.connect.call_count, 1)
-        self.assertEqual(sock.connect.call_args, mock.call(('foo', 123)))
-        self.assertEqual(sock.sendall.call_count, 1)
-        self.assertEqual(
-            sock.sendall.call_args, mock.call('foo'.encode('ascii'))
-        )
-        self.assertEqual(sock.send.call_count, 1)
-        self.assertEqual(sock.send.call_args, mock.call('\n'.encode('ascii')))
+            mock_connect.call_args, mock.call(('foo', 123), 10))
+        sock = mock_connect.return_value
+        self.assertEqual(sock.sendall.call_args_list, [
+            mock.call('foo\nbar\n'.encode('ascii')),
+            mock.call('baz\n'.encode('ascii')),
+        ])
+
+        self.gf.close()
         self.assertEqual(sock.close.call_count, 1)
-        self.assertEqual(sock.close.call_args, mock.call())
 
     def test_run_stops(self):
         """Test the stops."""
-        with mock.patch.object(self.gf, '_queue') as mock_queue:
-            mock_queue.get.return_value = self.gf._quit_object
+        with mock.patch.object(self.gf, 'queue') as mock_queue:
+            mock_queue.get.return_value = None
             self.assertEqual(None, self.gf.run())
             self.assertEqual(mock_queue.get.call_count, 1)
-            self.assertEqual(mock_queue.get.call_args, mock.call())
-            self.assertEqual(mock_queue.task_done.call_count, 1)
-            self.assertEqual(mock_queue.task_done.call_args, mock.call())
+            self.assertEqual(mock_queue.get.call_args, mock.call(timeout=None))
 
     def test_run(self):
         """Test the running."""
-        runs = []
         event = mock.MagicMock(event_type=EVENT_STATE_CHANGED,
                                data={'entity_id': 'entity',
                                      'new_state': mock.MagicMock()})
-
-        def fake_get():
-            if len(runs) >= 2:
-                return self.gf._quit_object
-            elif runs:
-                runs.append(1)
-                return mock.MagicMock(event_type='somethingelse',
-                                      data={'new_event': None})
-            else:
-                runs.append(1)
-                return event
-
-        with mock.patch.object(self.gf, '_queue') as mock_queue:
-            with mock.patch.object(self.gf, '_report_attributes') as mock_r:
-                mock_queue.get.side_effect = fake_get
-                self.gf.run()
-                # Twice for two events, once for the stop
-                self.assertEqual(3, mock_queue.task_done.call_count)
-                self.assertEqual(mock_r.call_count, 1)
-                self.assertEqual(
-                    mock_r.call_args,
-                    mock.call('entity', event.data['new_state'])
-                )
+        self.gf.queue.put(event)
+        self.gf.queue.put(None)
+
+        with mock.patch.object(self.gf, '_report_attributes') as mock_r, \
+                mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
+            mock_r.return_value = 'ha.entity.state 1.000000 12345'
+            self.gf.run()
+            self.assertEqual(mock_r.call_count, 1)
+            self.assertEqual(
+                mock_r.call_args,
+                mock.call('entity', event.data['new_state'])
+            )
+            self.assertEqual(
+                mock_send.call_args,
+                mock.call('ha.entity.state 1.000000 12345')
+            )
@@ -1,6 +1,7 @@
 """The tests the History component."""
 # pylint: disable=protected-access,invalid-name
 from datetime import timedelta
+import json
 import unittest
 from unittest.mock import patch, sentinel
 
@@ -412,6 +413,25 @@ class TestComponentHistory(unittest.TestCase):
             self.hass, zero, four, filters=filters)
         assert states == hist
 
+    def test_history_response_minimal(self):
+        """Test the minimal response only has the first state complete."""
+        zero, four, states = self.record_states()
+        hist = history.get_significant_states(
+            self.hass, zero, four, ['media_player.test'],
+            filters=history.Filters())
+
+        response = history._history_response(hist.values(), True)
+        result = json.loads(response.body.decode())
+
+        assert len(result) == 1
+        assert result[0][0]['entity_id'] == 'media_player.test'
+        assert result[0][0]['attributes'] == {
+            'media_title': str(sentinel.mt1)}
+        assert [item['state'] for item in result[0]] == \
+            [state.state for state in states['media_player.test']]
+        assert all(sorted(item) == ['last_changed', 'state']
+                   for item in result[0][1:])
+
     def record_states(self):
         """Record some test states.
 
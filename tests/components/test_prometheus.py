@@ -33,3 +33,25 @@ def test_view(prometheus_client):  # pylint: disable=redefined-outer-name
             assert line.startswith('# ') \
                 or line.startswith('process_') \
                 or line.startswith('python_info')
+
+
+@asyncio.coroutine
+def test_view_metrics(hass, prometheus_client):  # pylint: disable=W0621
+    """Test state changes are exported and re-rendered."""
+    hass.states.async_set('sensor.outside_temperature', '12.5', {
+        'friendly_name': 'Outside'})
+    yield from hass.async_block_till_done()
+
+    resp = yield from prometheus_client.get(prometheus.API_ENDPOINT)
+    body = yield from resp.text()
+    assert ('outside_temperature{entity="sensor.outside_temperature",'
+            'friendly_name="Outside"} 12.5') in body
+
+    hass.states.async_set('sensor.outside_temperature', '13', {
+        'friendly_name': 'Outside'})
+    yield from hass.async_block_till_done()
+
+    resp = yield from prometheus_client.get(prometheus.API_ENDPOINT)
+    body = yield from resp.text()
+    assert ('outside_temperature{entity="sensor.outside_temperature",'
+            'friendly_name="Outside"} 13.0') in body
@@ -1,8 +1,12 @@
 """The tests for the Splunk component."""
+import http.server
 import json
+import threading
 import unittest
 from unittest import mock
 
+from aiohttp.hdrs import AUTHORIZATION
+
 from homeassistant.setup import setup_component
 import homeassistant.components.splunk as splunk
 from homeassistant.const import STATE_ON, STATE_OFF, EVENT_STATE_CHANGED
@@ -58,7 +62,7 @@ class TestSplunk(unittest.TestCase):
 
     def _setup(self, mock_requests):
         """Test the setup."""
-        self.mock_post = mock_requests.post
+        self.mock_post = mock_requests.Session.return_value.post
         self.mock_request_exception = Exception
         mock_requests.exceptions.RequestException = self.mock_request_exception
         config = {
@@ -69,9 +73,19 @@ class TestSplunk(unittest.TestCase):
             }
         }
 
-        self.hass.bus.listen = mock.MagicMock()
-        setup_component(self.hass, splunk.DOMAIN, config)
-        self.handler_method = self.hass.bus.listen.call_args_list[0][0][1]
+        with mock.patch.object(splunk, 'SplunkExporter') as mock_exporter:
+            setup_component(self.hass, splunk.DOMAIN, config)
+        self.assertEqual(
+            mock_exporter.call_args,
+            mock.call(self.hass, 'http://host:8088/services/collector/event',
+                      'secret', 'HASS', flush_interval=1, max_batch_size=500,
+                      max_queue_size=10000, stats_sensor=False))
+
+        self.exporter = splunk.SplunkExporter(
+            *mock_exporter.call_args[0], **mock_exporter.call_args[1])
+        self.assertEqual(
+            mock_requests.Session.return_value.headers.__setitem__.call_args,
+            mock.call(AUTHORIZATION, 'Splunk secret'))
 
     @mock.patch.object(splunk, 'requests')
     def test_event_listener(self, mock_requests):
@@ -112,14 +126,61 @@ class TestSplunk(unittest.TestCase):
 
             payload = {'host': 'http://host:8088/services/collector/event',
                        'event': body}
-            self.handler_method(event)
+            record = self.exporter.format_event(event)
+            self.exporter.send([record, record])
             self.assertEqual(self.mock_post.call_count, 1)
             self.assertEqual(
                 self.mock_post.call_args,
                 mock.call(
-                    payload['host'], data=json.dumps(payload),
-                    headers={'Authorization': 'Splunk secret'},
+                    payload['host'], data=json.dumps(payload) * 2,
                     timeout=10
                 )
             )
             self.mock_post.reset_mock()
+
+
+class _CollectorHandler(http.server.BaseHTTPRequestHandler):
+    """Stand-in for the Splunk event collector."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Store the posted body."""
+        length = int(self.headers['Content-Length'])
+        self.server.requests.append((
+            self.headers['Authorization'],
+            self.rfile.read(length).decode()))
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        """Do not log requests."""
+        pass
+
+
+def test_send_to_collector():
+    """Test batches are posted to a local collector."""
+    server = http.server.HTTPServer(('127.0.0.1', 0), _CollectorHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    hass = get_test_home_assistant()
+    url = 'http://127.0.0.1:{}/services/collector/event'.format(
+        server.server_address[1])
+    exporter = splunk.SplunkExporter(hass, url, 'secret', 'HASS')
+
+    try:
+        exporter.send(['{"event": 1}', '{"event": 2}'])
+        exporter.send(['{"event": 3}'])
+    finally:
+        exporter.close()
+        server.shutdown()
+        server.server_close()
+        hass.stop()
+
+    assert server.requests == [
+        ('Splunk secret', '{"event": 1}{"event": 2}'),
+        ('Splunk secret', '{"event": 3}'),
+    ]
@@ -80,6 +80,22 @@ class TestStatsd(unittest.TestCase):
         )
         self.assertTrue(self.hass.bus.listen.called)
 
+    def _setup(self, mock_client, config):
+        """Set up the component and return its exporter."""
+        config['statsd'][statsd.CONF_RATE] = statsd.DEFAULT_RATE
+
+        with mock.patch.object(statsd, 'StatsdExporter') as mock_exporter:
+            setup_component(self.hass, statsd.DOMAIN, config)
+        self.assertEqual(mock_exporter.call_count, 1)
+        self.pipe = mock_client.return_value.pipeline.return_value.__enter__()
+        return statsd.StatsdExporter(
+            *mock_exporter.call_args[0], **mock_exporter.call_args[1])
+
+    def _send(self, exporter, state):
+        """Format and send a state change."""
+        exporter.send([exporter.format_event(
+            mock.MagicMock(data={'new_state': state}))])
+
     @mock.patch('statsd.StatsClient')
     def test_event_listener_defaults(self, mock_client):
         """Test event listener."""
@@ -89,13 +105,7 @@ class TestStatsd(unittest.TestCase):
                 'value_mapping': {'custom': 3}
             }
         }
-
-        config['statsd'][statsd.CONF_RATE] = statsd.DEFAULT_RATE
-
-        self.hass.bus.listen = mock.MagicMock()
-        setup_component(self.hass, statsd.DOMAIN, config)
-        self.assertTrue(self.hass.bus.listen.called)
-        handler_method = self.hass.bus.listen.call_args_list[0][0][1]
+        exporter = self._setup(mock_client, config)
 
         valid = {'1': 1,
                  '1.0': 1.0,
@@ -105,25 +115,24 @@ class TestStatsd(unittest.TestCase):
         for in_, out in valid.items():
             state = mock.MagicMock(state=in_,
                                    attributes={"attribute key": 3.2})
-            handler_method(mock.MagicMock(data={'new_state': state}))
-            mock_client.return_value.gauge.assert_has_calls([
+            self._send(exporter, state)
+            self.pipe.gauge.assert_has_calls([
                 mock.call(state.entity_id, out, statsd.DEFAULT_RATE),
             ])
 
-            mock_client.return_value.gauge.reset_mock()
+            self.pipe.gauge.reset_mock()
 
-            self.assertEqual(mock_client.return_value.incr.call_count, 1)
+            self.assertEqual(self.pipe.incr.call_count, 1)
             self.assertEqual(
-                mock_client.return_value.incr.call_args,
+                self.pipe.incr.call_args,
                 mock.call(state.entity_id, rate=statsd.DEFAULT_RATE)
             )
-            mock_client.return_value.incr.reset_mock()
+            self.pipe.incr.reset_mock()
 
         for invalid in ('foo', '', object):
-            handler_method(mock.MagicMock(data={
-                'new_state': ha.State('domain.test', invalid, {})}))
-            self.assertFalse(mock_client.return_value.gauge.called)
-            self.assertTrue(mock_client.return_value.incr.called)
+            self._send(exporter, ha.State('domain.test', invalid, {}))
+            self.assertFalse(self.pipe.gauge.called)
+            self.assertTrue(self.pipe.incr.called)
 
     @mock.patch('statsd.StatsClient')
     def test_event_listener_attr_details(self, mock_client):
@@ -134,13 +143,7 @@ class TestStatsd(unittest.TestCase):
                 'log_attributes': True
             }
         }
-
-        config['statsd'][statsd.CONF_RATE] = statsd.DEFAULT_RATE
-
-        self.hass.bus.listen = mock.MagicMock()
-        setup_component(self.hass, statsd.DOMAIN, config)
-        self.assertTrue(self.hass.bus.listen.called)
-        handler_method = self.hass.bus.listen.call_args_list[0][0][1]
+        exporter = self._setup(mock_client, config)
 
         valid = {'1': 1,
                  '1.0': 1.0,
@@ -149,25 +152,38 @@ class TestStatsd(unittest.TestCase):
         for in_, out in valid.items():
             state = mock.MagicMock(state=in_,
                                    attributes={"attribute key": 3.2})
-            handler_method(mock.MagicMock(data={'new_state': state}))
-            mock_client.return_value.gauge.assert_has_calls([
+            self._send(exporter, state)
+            self.pipe.gauge.assert_has_calls([
                 mock.call("%s.state" % state.entity_id,
                           out, statsd.DEFAULT_RATE),
                 mock.call("%s.attribute_key" % state.entity_id,
                           3.2, statsd.DEFAULT_RATE),
             ])
 
-            mock_client.return_value.gauge.reset_mock()
+            self.pipe.gauge.reset_mock()
 
-            self.assertEqual(mock_client.return_value.incr.call_count, 1)
+            self.assertEqual(self.pipe.incr.call_count, 1)
             self.assertEqual(
-                mock_client.return_value.incr.call_args,
+                self.pipe.incr.call_args,
                 mock.call(state.entity_id, rate=statsd.DEFAULT_RATE)
             )
-            mock_client.return_value.incr.reset_mock()
+            self.pipe.incr.reset_mock()
 
         for invalid in ('foo', '', object):
-            handler_method(mock.MagicMock(data={
-                'new_state': ha.State('domain.test', invalid, {})}))
-            self.assertFalse(mock_client.return_value.gauge.called)
-            self.assertTrue(mock_client.return_value.incr.called)
+            self._send(exporter, ha.State('domain.test', invalid, {}))
+            self.assertFalse(self.pipe.gauge.called)
+            self.assertTrue(self.pipe.incr.called)
+
+    @mock.patch('statsd.StatsClient')
+    def test_batch_in_one_pipeline(self, mock_client):
+        """Test a batch of state changes is sent through one pipeline."""
+        exporter = self._setup(mock_client, {'statsd': {'host': 'host'}})
+
+        exporter.send([
+            exporter.format_event(mock.MagicMock(data={
+                'new_state': ha.State('sensor.test_{}'.format(i), i)}))
+            for i in range(3)])
+
+        self.assertEqual(mock_client.return_value.pipeline.call_count, 1)
+        self.assertEqual(self.pipe.gauge.call_count, 3)
+        self.assertEqual(self.pipe.incr.call_count, 3)
@@ -1,11 +1,13 @@
 """Tests for the Home Assistant Websocket API."""
 import asyncio
-from unittest.mock import patch
+import json
+from unittest.mock import Mock, patch
 
 from aiohttp import WSMsgType
 from async_timeout import timeout
 import pytest
 
+from homeassistant.const import EVENT_STATE_CHANGED
 from homeassistant.core import callback
 from homeassistant.components import websocket_api as wapi, frontend
 from homeassistant.setup import async_setup_component
@@ -337,3 +339,174 @@ def test_pending_msg_overflow(hass, mock_low_queue, websocket_client):
         })
     msg = yield from websocket_client.receive()
     assert msg.type == WSMsgType.close
+
+
+@asyncio.coroutine
+def test_subscriptions_share_listener(hass, websocket_client):
+    """Test subscriptions to the same event type share a bus listener."""
+    init_count = sum(hass.bus.async_listeners().values())
+
+    for iden in (5, 6):
+        yield from websocket_client.send_json({
+            'id': iden,
+            'type': wapi.TYPE_SUBSCRIBE_EVENTS,
+            'event_type': 'test_event'
+        })
+        msg = yield from websocket_client.receive_json()
+        assert msg['success']
+
+    assert sum(hass.bus.async_listeners().values()) == init_count + 1
+
+    hass.bus.async_fire('test_event', {'hello': 'world'})
+
+    msgs = []
+    with timeout(3, loop=hass.loop):
+        for _ in range(2):
+            msgs.append((yield from websocket_client.receive_json()))
+
+    assert sorted(msg['id'] for msg in msgs) == [5, 6]
+    assert msgs[0]['event'] == msgs[1]['event']
+
+    for iden, subscription in ((7, 5), (8, 6)):
+        yield from websocket_client.send_json({
+            'id': iden,
+            'type': wapi.TYPE_UNSUBSCRIBE_EVENTS,
+            'subscription': subscription
+        })
+        msg = yield from websocket_client.receive_json()
+        assert msg['success']
+
+    assert sum(hass.bus.async_listeners().values()) == init_count
+
+
+@asyncio.coroutine
+def test_setup_without_options(hass):
+    """Test an empty websocket_api entry is valid."""
+    assert (yield from async_setup_component(hass, 'websocket_api', {
+        'websocket_api': None,
+    }))
+
+
+@asyncio.coroutine
+def test_coalesce_state_changes(hass, mock_low_queue):
+    """Test state changes are coalesced for a client that falls behind."""
+    assert (yield from async_setup_component(hass, 'websocket_api', {
+        'websocket_api': {
+            'coalesce_window': 1,
+        }
+    }))
+
+    conn = wapi.ActiveConnection(hass, None)
+    conn.cancel = Mock()
+    hass.data[wapi.DATA_EVENT_SUBSCRIPTIONS].async_subscribe(
+        conn, 5, EVENT_STATE_CHANGED)
+
+    with patch.object(hass.loop, 'call_later') as mock_call_later:
+        for idx in range(10):
+            hass.states.async_set('light.kitchen', idx)
+            hass.states.async_set('light.hall', idx)
+        yield from hass.async_block_till_done()
+
+    assert not conn.cancel.called
+    assert conn.to_write.full()
+    assert mock_call_later.call_count == 1
+    assert mock_call_later.call_args[0] == (1, conn._async_flush_coalesced)
+
+    sent = [conn.to_write.get_nowait() for _ in range(wapi.MAX_PENDING_MSG)]
+    assert [json.loads(msg)['event']['data']['entity_id']
+            for msg in sent] == ['light.kitchen', 'light.hall'] * 2 + [
+                'light.kitchen']
+
+    conn._async_flush_coalesced()
+
+    held = [json.loads(conn.to_write.get_nowait())['event']['data']
+            for _ in range(2)]
+    assert [(data['entity_id'], data['new_state']['state'])
+            for data in held] == [('light.kitchen', '9'), ('light.hall', '9')]
+    assert conn._coalesced is None
+
+
+@asyncio.coroutine
+def test_coalesce_keeps_event_order(hass, mock_low_queue):
+    """Test other events are held back behind earlier state changes."""
+    assert (yield from async_setup_component(hass, 'websocket_api', {
+        'websocket_api': {
+            'coalesce_window': 1,
+        }
+    }))
+
+    conn = wapi.ActiveConnection(hass, None)
+    conn.cancel = Mock()
+    subscriptions = hass.data[wapi.DATA_EVENT_SUBSCRIPTIONS]
+    subscriptions.async_subscribe(conn, 5, EVENT_STATE_CHANGED)
+    subscriptions.async_subscribe(conn, 6, 'test_event')
+
+    with patch.object(hass.loop, 'call_later'):
+        for idx in range(wapi.MAX_PENDING_MSG + 1):
+            hass.states.async_set('light.kitchen', idx)
+        hass.bus.async_fire('test_event')
+        hass.states.async_set('light.hall', 'on')
+        yield from hass.async_block_till_done()
+
+    for _ in range(wapi.MAX_PENDING_MSG):
+        conn.to_write.get_nowait()
+
+    conn._async_flush_coalesced()
+
+    held = [json.loads(conn.to_write.get_nowait())['event']
+            for _ in range(3)]
+    assert [event['event_type'] for event in held] == [
+        EVENT_STATE_CHANGED, 'test_event', EVENT_STATE_CHANGED]
+    assert held[0]['data']['entity_id'] == 'light.kitchen'
+    assert not conn.cancel.called
+
+
+@asyncio.coroutine
+def test_client_behind_too_long_disconnected(hass, mock_low_queue):
+    """Test a client that does not catch up is disconnected."""
+    assert (yield from async_setup_component(hass, 'websocket_api', {
+        'websocket_api': {
+            'coalesce_window': 1,
+        }
+    }))
+
+    conn = wapi.ActiveConnection(hass, None)
+    conn.cancel = Mock()
+    hass.data[wapi.DATA_EVENT_SUBSCRIPTIONS].async_subscribe(
+        conn, 5, EVENT_STATE_CHANGED)
+
+    with patch.object(hass.loop, 'call_later') as mock_call_later:
+        for idx in range(wapi.MAX_PENDING_MSG + 1):
+            hass.states.async_set('light.kitchen', idx)
+        yield from hass.async_block_till_done()
+
+        conn._async_flush_coalesced()
+
+    assert mock_call_later.call_count == 2
+    assert not conn.cancel.called
+
+    with patch.object(hass.loop, 'time',
+                      return_value=conn._coalesce_start +
+                      wapi.MAX_COALESCE_TIME):
+        conn._async_flush_coalesced()
+
+    assert conn.cancel.called
+
+
+@asyncio.coroutine
+def test_slow_client_disconnected_without_coalesce_window(
+        hass, mock_low_queue):
+    """Test a client that falls behind is disconnected by default."""
+    assert (yield from async_setup_component(hass, 'websocket_api'))
+
+    conn = wapi.ActiveConnection(hass, None)
+    conn.cancel = Mock()
+    hass.data[wapi.DATA_EVENT_SUBSCRIPTIONS].async_subscribe(
+        conn, 5, EVENT_STATE_CHANGED)
+
+    for idx in range(wapi.MAX_PENDING_MSG + 1):
+        hass.states.async_set('light.kitchen', idx)
+    yield from hass.async_block_till_done()
+
+    assert conn.cancel.called
+    assert conn._coalesced is None
@@ -3,7 +3,9 @@ import asyncio
 
 from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import (
-    dispatcher_send, dispatcher_connect)
+    DATA_DISPATCHER, async_dispatcher_connect, async_dispatcher_send,
+    async_dispatcher_stats, dispatcher_send, dispatcher_connect)
+from homeassistant.util.async import run_callback_threadsafe
 
 from tests.common import get_test_home_assistant
 
@@ -134,3 +136,98 @@ class TestHelpersDispatcher(object):
         self.hass.block_till_done()
 
         assert calls == [3, 2, 'bla']
+
+    def test_callback_runs_inline(self):
+        """Test callback targets run before the send returns."""
+        calls = []
+
+        @callback
+        def test_funct(data):
+            """Test function."""
+            calls.append(data)
+
+        dispatcher_connect(self.hass, 'test', test_funct)
+
+        run_callback_threadsafe(
+            self.hass.loop, async_dispatcher_send, self.hass, 'test', 3
+        ).result()
+        assert calls == [3]
+
+    def test_callback_exception(self):
+        """Test an exception in a callback does not stop the others."""
+        calls = []
+
+        @callback
+        def bad_funct(data):
+            """Test function."""
+            raise ValueError
+
+        @callback
+        def test_funct(data):
+            """Test function."""
+            calls.append(data)
+
+        dispatcher_connect(self.hass, 'test', bad_funct)
+        dispatcher_connect(self.hass, 'test', test_funct)
+        dispatcher_send(self.hass, 'test', 3)
+        self.hass.block_till_done()
+
+        assert calls == [3]
+
+    def test_disconnect_while_sending(self):
+        """Test a callback can disconnect itself during a send."""
+        calls = []
+
+        @callback
+        def test_funct(data):
+            """Test function."""
+            calls.append(data)
+            unsub()
+
+        unsub = run_callback_threadsafe(
+            self.hass.loop, async_dispatcher_connect, self.hass, 'test',
+            test_funct).result()
+        dispatcher_connect(self.hass, 'test', test_funct)
+        dispatcher_send(self.hass, 'test', 3)
+        self.hass.block_till_done()
+
+        assert calls == [3, 3]
+
+        dispatcher_send(self.hass, 'test', 4)
+        self.hass.block_till_done()
+
+        assert calls == [3, 3, 4]
+
+    def test_unsub_removes_empty_signal(self):
+        """Test the signal is removed once its last target disconnects."""
+        unsub1 = dispatcher_connect(self.hass, 'test', lambda data: None)
+        unsub2 = dispatcher_connect(self.hass, 'test', lambda data: None)
+
+        unsub1()
+        assert len(self.hass.data[DATA_DISPATCHER]['test']) == 1
+
+        unsub2()
+        assert 'test' not in self.hass.data[DATA_DISPATCHER]
+
+    def test_stats(self):
+        """Test send counts are recorded per signal."""
+        unsub = dispatcher_connect(
+            self.hass, 'test', callback(lambda data: None))
+
+        for _ in range(3):
+            dispatcher_send(self.hass, 'test', 3)
+        dispatcher_send(self.hass, 'no_targets')
+        self.hass.block_till_done()
+
+        stats = run_callback_threadsafe(
+            self.hass.loop, async_dispatcher_stats, self.hass).result()
+
+        assert stats['test']['count'] == 3
+        assert 'no_targets' not in stats
+        assert 0 <= stats['test']['max_time'] <= stats['test']['total_time']
+
+        unsub()
+        stats = run_callback_threadsafe(
+            self.hass.loop, async_dispatcher_stats, self.hass).result()
+
+        assert stats == {}
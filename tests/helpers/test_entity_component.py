@@ -19,7 +19,7 @@ import homeassistant.util.dt as dt_util
 
 from tests.common import (
     get_test_home_assistant, MockPlatform, MockModule, mock_coro,
-    async_fire_time_changed, MockEntity)
+    async_fire_time_changed, fire_time_changed, MockEntity)
 
 _LOGGER = logging.getLogger(__name__)
 DOMAIN = "test_domain"
@@ -46,6 +46,7 @@ class TestHelpersEntityComponent(unittest.TestCase):
         assert len(self.hass.states.entity_ids()) == 0
 
         component.add_entities([MockEntity()])
+        fire_time_changed(self.hass, dt_util.utcnow() + timedelta(seconds=1))
         self.hass.block_till_done()
 
         # group exists
@@ -59,6 +60,7 @@ class TestHelpersEntityComponent(unittest.TestCase):
 
         # group extended
         component.add_entities([MockEntity(name='goodbye')])
+        fire_time_changed(self.hass, dt_util.utcnow() + timedelta(seconds=1))
         self.hass.block_till_done()
 
         assert len(self.hass.states.entity_ids()) == 3
@@ -135,13 +137,13 @@ class TestHelpersEntityComponent(unittest.TestCase):
         assert ('platform_test', {}, {'msg': 'discovery_info'}) == \
             mock_setup.call_args[0]
 
-    @patch('homeassistant.helpers.entity_platform.'
-           'async_track_time_interval')
-    def test_set_scan_interval_via_config(self, mock_track):
+    def test_set_scan_interval_via_config(self):
         """Test the setting of the scan interval via configuration."""
+        entity = MockEntity(should_poll=True)
+
         def platform_setup(hass, config, add_devices, discovery_info=None):
             """Test the platform setup."""
-            add_devices([MockEntity(should_poll=True)])
+            add_devices([entity])
 
         loader.set_component('test_domain.platform',
                              MockPlatform(platform_setup))
@@ -156,8 +158,8 @@ class TestHelpersEntityComponent(unittest.TestCase):
         })
 
         self.hass.block_till_done()
-        assert mock_track.called
-        assert timedelta(seconds=30) == mock_track.call_args[0][2]
+        assert timedelta(seconds=30) == entity.platform.scan_interval
+        assert entity.entity_id in entity.platform._polls
 
     def test_set_entity_namespace_via_config(self):
         """Test setting an entity namespace."""
@@ -307,6 +309,56 @@ def test_extract_from_service_no_group_expand(hass):
     assert extracted == [test_group]
 
 
+@asyncio.coroutine
+def test_group_updates_coalesced(hass):
+    """Test batches of entities added shortly after each other."""
+    yield from async_setup_component(hass, 'group', {})
+    component = EntityComponent(_LOGGER, DOMAIN, hass, group_name='everyone')
+
+    with patch.object(group, 'async_set_group') as mock_set_group:
+        yield from component.async_add_entities([MockEntity(name='c')])
+        yield from component.async_add_entities([MockEntity(name='b')])
+        yield from component.async_add_entities([MockEntity(name='a')])
+        yield from hass.async_block_till_done()
+
+        assert mock_set_group.call_count == 1
+        assert mock_set_group.call_args[1]['entity_ids'] == ['test_domain.c']
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+        yield from hass.async_block_till_done()
+
+    assert mock_set_group.call_count == 2
+    assert mock_set_group.call_args[1]['entity_ids'] == \
+        ['test_domain.a', 'test_domain.b', 'test_domain.c']
+
+
+@asyncio.coroutine
+def test_group_exists_after_setup_before_start(hass):
+    """Test the group is written when the component is set up."""
+    yield from async_setup_component(hass, 'group', {})
+    hass.state = ha.CoreState.not_running
+
+    @asyncio.coroutine
+    def async_platform_setup(hass, config, async_add_devices,
+                             discovery_info=None):
+        """Add entities one by one."""
+        async_add_devices([MockEntity(name='b')])
+        async_add_devices([MockEntity(name='a')])
+
+    loader.set_component(
+        'test_domain.platform',
+        MockPlatform(async_setup_platform=async_platform_setup))
+
+    component = EntityComponent(_LOGGER, DOMAIN, hass, group_name='everyone')
+    yield from component.async_setup({DOMAIN: {'platform': 'platform'}})
+    yield from hass.async_block_till_done()
+
+    state = hass.states.get('group.everyone')
+    assert state is not None
+    assert state.attributes['entity_id'] == \
+        ('test_domain.a', 'test_domain.b')
+
+
 @asyncio.coroutine
 def test_setup_dependencies_platform(hass):
     """Test we setup the dependencies of a platform.
@@ -1,6 +1,7 @@
 """Tests for the EntityPlatform helper."""
 import asyncio
 import logging
+import threading
 import unittest
 from unittest.mock import patch, Mock, MagicMock
 from datetime import timedelta
@@ -15,7 +16,7 @@ import homeassistant.util.dt as dt_util
 
 from tests.common import (
     get_test_home_assistant, MockPlatform, fire_time_changed, mock_registry,
-    MockEntity, MockEntityPlatform)
+    MockEntity, MockEntityPlatform, async_fire_time_changed)
 
 _LOGGER = logging.getLogger(__name__)
 DOMAIN = "test_domain"
@@ -135,13 +136,13 @@ class TestHelpersEntityPlatform(unittest.TestCase):
         assert 1 == len(self.hass.states.entity_ids())
         assert not ent.update.called
 
-    @patch('homeassistant.helpers.entity_platform.'
-           'async_track_time_interval')
-    def test_set_scan_interval_via_platform(self, mock_track):
+    def test_set_scan_interval_via_platform(self):
         """Test the setting of the scan interval via platform."""
+        entity = MockEntity(should_poll=True)
+
         def platform_setup(hass, config, add_devices, discovery_info=None):
             """Test the platform setup."""
-            add_devices([MockEntity(should_poll=True)])
+            add_devices([entity])
 
         platform = MockPlatform(platform_setup)
         platform.SCAN_INTERVAL = timedelta(seconds=30)
@@ -157,8 +158,8 @@ class TestHelpersEntityPlatform(unittest.TestCase):
         })
 
         self.hass.block_till_done()
-        assert mock_track.called
-        assert timedelta(seconds=30) == mock_track.call_args[0][2]
+        assert timedelta(seconds=30) == entity.platform.scan_interval
+        assert entity.entity_id in entity.platform._polls
 
     def test_adding_entities_with_generator_and_thread_callback(self):
         """Test generator in add_entities that calls thread method.
@@ -178,6 +179,154 @@ class TestHelpersEntityPlatform(unittest.TestCase):
         component.add_entities(create_entity(i) for i in range(2))
 
 
+@asyncio.coroutine
+def test_polls_spread_over_scan_interval(hass):
+    """Test entities of a platform are not all polled at the same time."""
+    component = EntityComponent(
+        _LOGGER, DOMAIN, hass, timedelta(seconds=10))
+    polled = []
+
+    def poll_entity(idx):
+        """Return a polled entity."""
+        ent = MockEntity(should_poll=True)
+        ent.update = lambda: polled.append(idx)
+        return ent
+
+    yield from component.async_add_entities(
+        [poll_entity(idx) for idx in range(10)])
+    start = dt_util.utcnow()
+
+    polls_per_second = []
+    for second in range(1, 11):
+        async_fire_time_changed(hass, start + timedelta(seconds=second))
+        yield from hass.async_block_till_done()
+        polls_per_second.append(len(polled))
+        polled.clear()
+
+    assert sum(polls_per_second) == 10
+    assert max(polls_per_second) <= 2
+
+
+@asyncio.coroutine
+def test_slow_poll_stretches_interval(hass):
+    """Test an entity is polled less often if its update is slow."""
+    component = EntityComponent(
+        _LOGGER, DOMAIN, hass, timedelta(seconds=30))
+    ent = MockEntity(should_poll=True)
+    ent.update = Mock()
+
+    start = dt_util.utcnow()
+    yield from component.async_add_entities([ent])
+
+    # Queued, started and done after 40 seconds
+    with patch('homeassistant.helpers.entity_platform.timer',
+               side_effect=[0, 0, 0, 40]):
+        async_fire_time_changed(hass, start + timedelta(seconds=31))
+        yield from hass.async_block_till_done()
+
+    assert ent.update.call_count == 1
+    assert ent.platform._polls[ent.entity_id].interval == \
+        timedelta(seconds=80)
+
+    async_fire_time_changed(hass, start + timedelta(seconds=100))
+    yield from hass.async_block_till_done()
+    assert ent.update.call_count == 1
+
+    async_fire_time_changed(hass, start + timedelta(seconds=111))
+    yield from hass.async_block_till_done()
+    assert ent.update.call_count == 2
+
+    stats = entity_platform.async_poll_stats(hass)['test_domain.test_domain']
+    assert stats['count'] == 2
+    assert stats['skipped'] == 0
+    assert stats['max_time'] == 40
+    assert 0 < stats['max_lag'] < 2
+
+
+@asyncio.coroutine
+def test_poll_overrunning_interval_is_skipped(hass):
+    """Test polls that are due during an update are skipped."""
+    component = EntityComponent(
+        _LOGGER, DOMAIN, hass, timedelta(seconds=30))
+    ent = MockEntity(should_poll=True)
+    ent.update = Mock()
+
+    start = dt_util.utcnow()
+    yield from component.async_add_entities([ent])
+
+    # The update finishes after the polls due at 60 and 90 seconds
+    async_fire_time_changed(hass, start + timedelta(seconds=31))
+    async_fire_time_changed(hass, start + timedelta(seconds=95))
+    yield from hass.async_block_till_done()
+    assert ent.update.call_count == 1
+
+    stats = entity_platform.async_poll_stats(hass)['test_domain.test_domain']
+    assert stats['skipped'] == 2
+
+    async_fire_time_changed(hass, start + timedelta(seconds=121))
+    yield from hass.async_block_till_done()
+    assert ent.update.call_count == 2
+
+    # Removed entities are no longer polled
+    yield from ent.async_remove()
+    async_fire_time_changed(hass, start + timedelta(seconds=151))
+    yield from hass.async_block_till_done()
+    assert ent.update.call_count == 2
+
+
+@asyncio.coroutine
+def test_polling_starts_when_should_poll_changes(hass):
+    """Test an entity is polled once should_poll becomes true."""
+    component = EntityComponent(
+        _LOGGER, DOMAIN, hass, timedelta(seconds=30))
+    ent = MockEntity(should_poll=False)
+    ent.update = Mock()
+
+    start = dt_util.utcnow()
+    yield from component.async_add_entities([ent])
+
+    async_fire_time_changed(hass, start + timedelta(seconds=31))
+    yield from hass.async_block_till_done()
+    assert ent.update.call_count == 0
+
+    ent._values['should_poll'] = True
+    async_fire_time_changed(hass, start + timedelta(seconds=61))
+    yield from hass.async_block_till_done()
+    assert ent.update.call_count == 1
+
+
+@asyncio.coroutine
+def test_polls_start_between_time_changes(hass):
+    """Test polls are started on time for sub-second scan intervals."""
+    component = EntityComponent(
+        _LOGGER, DOMAIN, hass, timedelta(milliseconds=50))
+    ent = MockEntity(should_poll=True)
+    ent.update = Mock()
+
+    yield from component.async_add_entities([ent])
+    yield from asyncio.sleep(.3, loop=hass.loop)
+    yield from hass.async_block_till_done()
+
+    assert ent.update.call_count >= 2
+
+
+@asyncio.coroutine
+def test_update_in_executor_pool_of_platform(hass):
+    """Test sync updates run in the executor pool of the integration."""
+    hass.config.executor_pool_integrations[DOMAIN] = 'slow'
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+    threads = []
+
+    ent = MockEntity()
+    ent.update = lambda: threads.append(threading.current_thread().name)
+
+    yield from component.async_add_entities([ent], True)
+
+    assert ent.executor_pool == 'slow'
+    assert len(threads) == 1
+    assert threads[0].startswith('slow')
+
+
 @asyncio.coroutine
 def test_platform_warn_slow_setup(hass):
     """Warn we log when platform setup takes a long time."""
@@ -372,6 +521,26 @@ def test_not_adding_duplicate_entities_with_unique_id(hass):
     assert len(hass.states.async_entity_ids()) == 1
 
 
+@asyncio.coroutine
+def test_not_adding_duplicate_prescribed_entity_ids(hass):
+    """Test prescribed entity ids are not added twice."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+
+    # Within one batch
+    yield from component.async_add_entities([
+        MockEntity(name='test1', entity_id='test_domain.world'),
+        MockEntity(name='test2', entity_id='test_domain.world')])
+
+    assert hass.states.async_entity_ids() == ['test_domain.world']
+
+    # And in a later batch
+    yield from component.async_add_entities([
+        MockEntity(name='test3', entity_id='test_domain.world')])
+
+    assert hass.states.async_entity_ids() == ['test_domain.world']
+    assert hass.states.get('test_domain.world').name != 'test3'
+
+
 @asyncio.coroutine
 def test_using_prescribed_entity_id(hass):
     """Test for using predefined entity ID."""
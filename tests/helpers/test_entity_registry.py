@@ -1,15 +1,19 @@
 """Tests for the Entity Registry."""
 import asyncio
+import json
 from unittest.mock import patch, mock_open
 
 import pytest
 
+import attr
+
 from homeassistant.helpers import entity_registry
 
 from tests.common import mock_registry
 
 
 YAML__OPEN_PATH = 'homeassistant.util.yaml.open'
+JSON__OPEN_PATH = 'homeassistant.util.json.open'
 
 
 @pytest.fixture
@@ -87,20 +91,24 @@ def test_loading_saving_data(hass, registry):
     """Test that we load/save data correctly."""
     orig_entry1 = registry.async_get_or_create('light', 'hue', '1234')
     orig_entry2 = registry.async_get_or_create('light', 'hue', '5678')
+    registry.entities[orig_entry2.entity_id] = orig_entry2 = attr.evolve(
+        orig_entry2, disabled_by=entity_registry.DISABLED_USER)
 
     assert len(registry.entities) == 2
 
-    with patch(YAML__OPEN_PATH, mock_open(), create=True) as mock_write:
+    with patch(JSON__OPEN_PATH, mock_open(), create=True) as mock_write:
         yield from registry._async_save()
 
     # Mock open calls are: open file, context enter, write, context leave
     written = mock_write.mock_calls[2][1][0]
+    assert mock_write.mock_calls[0][1][0] == hass.config.path(
+        entity_registry.PATH_REGISTRY)
 
     # Now load written data in new registry
     registry2 = entity_registry.EntityRegistry(hass)
 
     with patch('os.path.isfile', return_value=True), \
-            patch(YAML__OPEN_PATH, mock_open(read_data=written), create=True):
+            patch(JSON__OPEN_PATH, mock_open(read_data=written), create=True):
         yield from registry2._async_load()
 
     # Ensure same order
@@ -110,6 +118,7 @@ def test_loading_saving_data(hass, registry):
 
     assert orig_entry1 == new_entry1
     assert orig_entry2 == new_entry2
+    assert registry2.entities[orig_entry2.entity_id].disabled
 
 
 @asyncio.coroutine
@@ -160,8 +169,10 @@ test.disabled_hass:
 
     registry = entity_registry.EntityRegistry(hass)
 
-    with patch('os.path.isfile', return_value=True), \
-            patch(YAML__OPEN_PATH, mock_open(read_data=written), create=True):
+    with patch('os.path.isfile', side_effect=_is_yaml_registry), \
+            patch(YAML__OPEN_PATH, mock_open(read_data=written),
+                  create=True), \
+            patch(JSON__OPEN_PATH, mock_open(), create=True):
         yield from registry._async_load()
 
     entry_with_name = registry.async_get_or_create(
@@ -180,3 +191,66 @@ test.disabled_hass:
     assert entry_disabled_hass.disabled_by == entity_registry.DISABLED_HASS
     assert entry_disabled_user.disabled
     assert entry_disabled_user.disabled_by == entity_registry.DISABLED_USER
+
+
+def _is_yaml_registry(path):
+    """Return if path is the registry in the YAML format."""
+    return path.endswith(entity_registry.PATH_REGISTRY_YAML)
+
+
+@asyncio.coroutine
+def test_migrate_yaml_registry(hass):
+    """Test a registry in the YAML format is saved as JSON."""
+    written = """
+test.first:
+  platform: super_platform
+  unique_id: first
+test.second:
+  platform: super_platform
+  unique_id: second
+  name: Second
+"""
+
+    registry = entity_registry.EntityRegistry(hass)
+
+    with patch('os.path.isfile', side_effect=_is_yaml_registry), \
+            patch(YAML__OPEN_PATH, mock_open(read_data=written),
+                  create=True), \
+            patch(JSON__OPEN_PATH, mock_open(), create=True) as mock_write:
+        yield from registry._async_load()
+
+    assert list(registry.entities) == ['test.first', 'test.second']
+
+    assert mock_write.mock_calls[0][1][0] == hass.config.path(
+        entity_registry.PATH_REGISTRY)
+    data = json.loads(mock_write.mock_calls[2][1][0])
+    assert data['entities'] == [{
+        'entity_id': 'test.first',
+        'unique_id': 'first',
+        'platform': 'super_platform',
+        'name': None,
+        'disabled_by': None,
+    }, {
+        'entity_id': 'test.second',
+        'unique_id': 'second',
+        'platform': 'super_platform',
+        'name': 'Second',
+        'disabled_by': None,
+    }]
+
+
+@asyncio.coroutine
+def test_get_or_create_uses_mocked_entries(hass):
+    """Test entries passed to the registry are found by unique id."""
+    registry = mock_registry(hass, {
+        'light.kitchen': entity_registry.RegistryEntry(
+            entity_id='light.kitchen',
+            unique_id='1234',
+            platform='hue',
+        ),
+    })
+
+    entry = registry.async_get_or_create('light', 'hue', '1234')
+    assert entry.entity_id == 'light.kitchen'
+    assert registry.async_get_or_create(
+        'switch', 'hue', '1234').entity_id == 'switch.hue_1234'
@@ -12,6 +12,7 @@ from homeassistant.setup import setup_component
 import homeassistant.core as ha
 from homeassistant.const import MATCH_ALL
 from homeassistant.helpers.event import (
+    DATA_STATE_CHANGE_TRACKERS,
     async_call_later,
     track_point_in_utc_time,
     track_point_in_time,
@@ -20,6 +21,7 @@ from homeassistant.helpers.event import (
     track_state_change,
     track_time_interval,
     track_template,
+    track_template_result,
     track_same_state,
     track_sunrise,
     track_sunset,
@@ -84,6 +86,29 @@ class TestEventHelpers(unittest.TestCase):
         self.hass.block_till_done()
         self.assertEqual(2, len(runs))
 
+    def test_track_point_in_time_order(self):
+        """Test point in time listeners run in order of their due time."""
+        first = datetime(1986, 7, 9, 12, 0, 0, tzinfo=dt_util.UTC)
+        second = datetime(1986, 7, 9, 12, 0, 1, tzinfo=dt_util.UTC)
+        third = datetime(1986, 7, 9, 12, 0, 2, tzinfo=dt_util.UTC)
+
+        runs = []
+
+        track_point_in_utc_time(
+            self.hass, callback(lambda x: runs.append(3)), third)
+        unsub = track_point_in_utc_time(
+            self.hass, callback(lambda x: runs.append(2)), second)
+        track_point_in_utc_time(
+            self.hass, callback(lambda x: runs.append(1)), first)
+
+        unsub()
+        # Removing a listener twice is harmless
+        unsub()
+
+        self._send_time_changed(third)
+        self.hass.block_till_done()
+        self.assertEqual([1, 3], runs)
+
     def test_track_time_change(self):
         """Test tracking time change."""
         wildcard_runs = []
@@ -195,6 +220,42 @@ class TestEventHelpers(unittest.TestCase):
         self.assertEqual(5, len(wildcard_runs))
         self.assertEqual(6, len(wildercard_runs))
 
+    def test_track_state_change_remove(self):
+        """Test removing entity state change listeners."""
+        runs = []
+
+        @ha.callback
+        def run_callback(entity_id, old_state, new_state):
+            runs.append(entity_id)
+
+        unsub_bowl = track_state_change(
+            self.hass, ['light.Bowl', 'light.bowl', 'light.kitchen'],
+            run_callback)
+        unsub_kitchen = track_state_change(
+            self.hass, 'light.kitchen', run_callback)
+
+        trackers = self.hass.data[DATA_STATE_CHANGE_TRACKERS]
+        assert len(trackers['light.bowl']) == 1
+        assert len(trackers['light.kitchen']) == 2
+
+        self.hass.states.set('light.Bowl', 'on')
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.block_till_done()
+        assert runs == ['light.bowl', 'light.kitchen', 'light.kitchen']
+
+        unsub_bowl()
+        assert 'light.bowl' not in trackers
+        assert len(trackers['light.kitchen']) == 1
+
+        self.hass.states.set('light.Bowl', 'off')
+        self.hass.states.set('light.kitchen', 'off')
+        self.hass.block_till_done()
+        assert runs == ['light.bowl', 'light.kitchen', 'light.kitchen',
+                        'light.kitchen']
+
+        unsub_kitchen()
+        assert trackers == {}
+
     def test_track_template(self):
         """Test tracking template."""
         specific_runs = []
@@ -266,6 +327,98 @@ class TestEventHelpers(unittest.TestCase):
         self.assertEqual(2, len(wildcard_runs))
         self.assertEqual(2, len(wildercard_runs))
 
+    def test_track_template_result(self):
+        """Test the template is rendered when a state it read changes."""
+        results = []
+        renders = []
+
+        tmpl = Template(
+            "{{ states.sensor.test.state }}", self.hass)
+        orig_render = tmpl.async_render_to_info
+
+        def render_to_info(*args):
+            renders.append(1)
+            return orig_render(*args)
+
+        tmpl.async_render_to_info = render_to_info
+
+        @ha.callback
+        def result_callback(last_result, result):
+            results.append((last_result, result))
+
+        self.hass.states.set('sensor.test', '1')
+        unsub = track_template_result(self.hass, tmpl, result_callback)
+        self.hass.block_till_done()
+        self.assertEqual(results, [(None, '1')])
+
+        self.hass.states.set('sensor.other', '2')
+        self.hass.block_till_done()
+        self.assertEqual(len(renders), 1)
+
+        self.hass.states.set('sensor.test', '1', {'attr': 1})
+        self.hass.block_till_done()
+        self.assertEqual(len(renders), 2)
+        self.assertEqual(len(results), 1)
+
+        self.hass.states.set('sensor.test', '3')
+        self.hass.block_till_done()
+        self.assertEqual(results[-1], ('1', '3'))
+
+        unsub()
+        self.hass.states.set('sensor.test', '4')
+        self.hass.block_till_done()
+        self.assertEqual(len(results), 2)
+        self.assertEqual(self.hass.data[DATA_STATE_CHANGE_TRACKERS], {})
+
+    def test_track_template_result_domain_rate_limited(self):
+        """Test templates iterating a domain are rendered rate limited."""
+        results = []
+
+        tmpl = Template(
+            "{{ states.sensor | count }}", self.hass)
+
+        @ha.callback
+        def result_callback(last_result, result):
+            results.append(result)
+
+        track_template_result(self.hass, tmpl, result_callback,
+                              rate_limit=timedelta(seconds=10))
+        self.hass.block_till_done()
+        self.assertEqual(results, ['0'])
+
+        self.hass.states.set('light.ignored', 'on')
+        self.hass.states.set('sensor.one', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(results, ['0'])
+
+        self.hass.states.set('sensor.two', 'on')
+        self.hass.block_till_done()
+        fire_time_changed(
+            self.hass, dt_util.utcnow() + timedelta(seconds=11))
+        self.hass.block_till_done()
+        self.assertEqual(results, ['0', '2'])
+
+    def test_track_template_result_without_states(self):
+        """Test a template that reads no states is rendered on any change."""
+        results = []
+        value = ['1']
+
+        tmpl = Template("{{ value() }}", self.hass)
+
+        @ha.callback
+        def result_callback(last_result, result):
+            results.append(result)
+
+        track_template_result(self.hass, tmpl, result_callback,
+                              {'value': lambda: value[0]})
+        self.hass.block_till_done()
+        self.assertEqual(results, ['1'])
+
+        value[0] = '2'
+        self.hass.states.set('light.any', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(results, ['1', '2'])
+
     def test_track_same_state_simple_trigger(self):
         """Test track_same_change with trigger simple."""
         thread_runs = []
@@ -0,0 +1,250 @@
+"""Test the exporter helper."""
+import asyncio
+from functools import partial
+import socket
+import socketserver
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.const import (
+    EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STOP)
+from homeassistant.core import State
+from homeassistant.helpers import exporter
+
+from tests.common import mock_state_change_event
+
+
+class LineExporter(exporter.Exporter):
+    """Exporter sending one line per state change over TCP."""
+
+    def __init__(self, hass, port, **kwargs):
+        """Initialize the exporter."""
+        super().__init__(hass, 'test', **kwargs)
+        self.connection = exporter.TCPConnection('127.0.0.1', port)
+        self.batches = []
+
+    def format_event(self, event):
+        """Return the entity id and state as a line."""
+        new_state = event.data['new_state']
+        if new_state.state == 'skip':
+            return None
+        return '{} {}'.format(new_state.entity_id, new_state.state)
+
+    def send(self, records):
+        """Send the lines."""
+        self.batches.append(list(records))
+        self.connection.send(
+            ''.join(line + '\n' for line in records).encode())
+
+    def close(self):
+        """Close the connection."""
+        self.connection.close()
+
+
+class _LineHandler(socketserver.StreamRequestHandler):
+    """Collect the received lines and count the connections."""
+
+    def handle(self):
+        """Read lines until the client disconnects."""
+        self.server.connections += 1
+        for line in self.rfile:
+            self.server.lines.append(line.decode().strip())
+
+
+@pytest.fixture
+def server():
+    """Run a local TCP server collecting lines."""
+    srv = socketserver.ThreadingTCPServer(('127.0.0.1', 0), _LineHandler)
+    srv.daemon_threads = True
+    srv.lines = []
+    srv.connections = 0
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _fire(hass, entity_id, state):
+    """Fire a state change."""
+    mock_state_change_event(hass, State(entity_id, state))
+
+
+def _async_exporter(hass, port, **kwargs):
+    """Create the exporter outside the event loop, like a component."""
+    return hass.async_add_job(partial(LineExporter, hass, port, **kwargs))
+
+
+@asyncio.coroutine
+def _async_stop(hass, exp):
+    """Fire the stop event, which waits for the exporter to finish."""
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    yield from hass.async_block_till_done()
+    assert not exp.is_alive()
+
+
+@asyncio.coroutine
+def test_batches_over_one_connection(hass, server):
+    """Test state changes are batched over a persistent connection."""
+    exp = yield from _async_exporter(
+        hass, server.server_address[1], flush_interval=10, max_batch_size=2)
+
+    for i in range(5):
+        _fire(hass, 'sensor.test_{}'.format(i), i)
+    _fire(hass, 'sensor.skipped', 'skip')
+    yield from hass.async_block_till_done()
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    yield from hass.async_block_till_done()
+    yield from _async_stop(hass, exp)
+
+    assert exp.batches == [
+        ['sensor.test_0 0', 'sensor.test_1 1'],
+        ['sensor.test_2 2', 'sensor.test_3 3'],
+        ['sensor.test_4 4'],
+    ]
+    assert exp.sent == 5
+    assert exp.failed == 0
+
+    # The server sees all lines once the connection is closed
+    for _ in range(50):
+        if len(server.lines) == 5:
+            break
+        yield from asyncio.sleep(.1, loop=hass.loop)
+    assert server.lines == ['sensor.test_{} {}'.format(i, i)
+                            for i in range(5)]
+    assert server.connections == 1
+
+
+@asyncio.coroutine
+def test_drops_when_queue_full(hass, server):
+    """Test state changes are dropped and counted if the queue is full."""
+    exp = yield from _async_exporter(
+        hass, server.server_address[1], max_queue_size=3)
+
+    for i in range(5):
+        _fire(hass, 'sensor.test_{}'.format(i), i)
+    yield from hass.async_block_till_done()
+
+    assert exp.queue.qsize() == 3
+    assert exp.dropped == 2
+
+    # Stopping still works with a full queue
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    yield from hass.async_block_till_done()
+    yield from _async_stop(hass, exp)
+
+    assert exp.sent == 3
+
+
+@asyncio.coroutine
+def test_failed_send_reconnects(hass):
+    """Test a failed batch is counted and the connection reopened."""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    exp = yield from _async_exporter(hass, port, flush_interval=0)
+    exp.start()
+
+    _fire(hass, 'sensor.test', 1)
+    yield from hass.async_block_till_done()
+    yield from _async_stop(hass, exp)
+
+    assert exp.failed == 1
+    assert exp.sent == 0
+    assert exp.connection._sock is None
+
+
+@asyncio.coroutine
+def test_stop_sends_queued_changes(hass, server):
+    """Test the state changes queued when stopping are sent first."""
+    exp = yield from _async_exporter(
+        hass, server.server_address[1], flush_interval=10)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
+    yield from hass.async_block_till_done()
+
+    with patch.object(exp, 'send',
+                      side_effect=lambda records: time.sleep(.2)) as send:
+        for i in range(3):
+            _fire(hass, 'sensor.test_{}'.format(i), i)
+        yield from hass.async_block_till_done()
+        assert send.call_count == 0
+
+        yield from _async_stop(hass, exp)
+
+    assert send.call_count == 1
+    assert exp.sent == 3
+
+
+@asyncio.coroutine
+def test_no_stats_sensor_by_default(hass, server):
+    """Test the stats sensor is only created if enabled."""
+    exp = yield from _async_exporter(
+        hass, server.server_address[1], flush_interval=0)
+
+    with patch.object(exp, 'send'):
+        yield from hass.async_add_job(exp._flush, ['sensor.test 1'])
+    yield from hass.async_block_till_done()
+
+    assert hass.states.get('sensor.test_exporter') is None
+    assert exp.sent == 1
+
+
+@asyncio.coroutine
+def test_stats_sensor(hass, server):
+    """Test the stats are published and not exported themselves."""
+    exp = yield from _async_exporter(
+        hass, server.server_address[1], flush_interval=0, stats_sensor=True)
+    exp.dropped = 4
+
+    with patch.object(exp, 'send'):
+        yield from hass.async_add_job(exp._flush, ['sensor.test 1'])
+    yield from hass.async_block_till_done()
+
+    state = hass.states.get('sensor.test_exporter')
+    assert state.state == '0'
+    assert state.attributes[exporter.ATTR_DROPPED] == 4
+    assert state.attributes[exporter.ATTR_SENT] == 1
+    assert state.attributes[exporter.ATTR_FAILED] == 0
+    assert exp.queue.empty()
+
+    # Updates are throttled
+    with patch.object(exp, 'send'):
+        yield from hass.async_add_job(exp._flush, ['sensor.test 1'])
+    yield from hass.async_block_till_done()
+    assert hass.states.get('sensor.test_exporter').attributes[
+        exporter.ATTR_SENT] == 1
+
+
+@asyncio.coroutine
+def test_stats_sensor_updated_when_idle(hass, server):
+    """Test throttled stats are published once no more changes come in."""
+    exp = yield from _async_exporter(
+        hass, server.server_address[1], flush_interval=0, stats_sensor=True)
+
+    @asyncio.coroutine
+    def async_wait_for_sent(sent):
+        """Wait until the stats sensor shows sent state changes."""
+        for _ in range(50):
+            state = hass.states.get('sensor.test_exporter')
+            if state is not None and \
+                    state.attributes[exporter.ATTR_SENT] == sent:
+                return True
+            yield from asyncio.sleep(.1, loop=hass.loop)
+        return False
+
+    with patch.object(exporter, 'STATS_INTERVAL', .5):
+        exp.start()
+        _fire(hass, 'sensor.test', 1)
+        assert (yield from async_wait_for_sent(1))
+
+        # Sent within the interval, so the stats are throttled
+        _fire(hass, 'sensor.test', 2)
+        assert (yield from async_wait_for_sent(2))
+
+        yield from _async_stop(hass, exp)
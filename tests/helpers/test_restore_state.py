@@ -51,6 +51,33 @@ def test_caching_data(hass):
     assert DATA_RESTORE_CACHE not in hass.data
 
 
+@asyncio.coroutine
+def test_caching_data_from_snapshot(hass):
+    """Test that the recorder snapshot is preferred over a history query."""
+    mock_component(hass, 'recorder')
+    hass.state = CoreState.starting
+
+    states = [
+        State('input_boolean.b1', 'on'),
+        State('input_boolean.b2', 'on', {'hidden': True}),
+        State('zone.home', 'zoning'),
+    ]
+
+    with patch('homeassistant.helpers.restore_state.last_recorder_run',
+               return_value=MagicMock(end=dt_util.utcnow())), \
+            patch('homeassistant.helpers.restore_state.load_state_snapshot',
+                  return_value=states), \
+            patch('homeassistant.helpers.restore_state.get_states') \
+            as mock_get_states, \
+            patch('homeassistant.helpers.restore_state.wait_connection_ready',
+                  return_value=mock_coro(True)):
+        state = yield from async_get_last_state(hass, 'input_boolean.b1')
+
+    assert state == states[0]
+    assert not mock_get_states.called
+    assert list(hass.data[DATA_RESTORE_CACHE]) == ['input_boolean.b1']
+
+
 @asyncio.coroutine
 def test_hass_running(hass):
     """Test that cache cannot be accessed while hass is running."""
@@ -69,6 +69,47 @@ class TestHelpersTemplate(unittest.TestCase):
 {% for state in states.sensor %}{{ state.state }}{% endfor %}
                 """, self.hass).render())
 
+    def test_render_to_info_entities(self):
+        """Test the entities a template reads are recorded."""
+        self.hass.states.set('test.object', 'happy')
+        info = template.Template(
+            "{{ states.test.object.state }}"
+            "{{ is_state('light.kitchen', 'on') }}"
+            "{{ states('sensor.temperature') }}",
+            self.hass).async_render_to_info()
+
+        self.assertEqual(info.result, 'happyFalseunknown')
+        self.assertEqual(info.entities, {
+            'test.object', 'light.kitchen', 'sensor.temperature'})
+        self.assertEqual(info.domains, set())
+        self.assertFalse(info.all_states)
+        self.assertTrue(info.filter_state_change('light.kitchen'))
+        self.assertFalse(info.filter_state_change('light.bedroom'))
+
+    def test_render_to_info_domains_and_all_states(self):
+        """Test iterating states is recorded as domain or all states."""
+        info = template.Template(
+            "{% for state in states.sensor %}{{ state.state }}{% endfor %}",
+            self.hass).async_render_to_info()
+        self.assertEqual(info.domains, {'sensor'})
+        self.assertFalse(info.all_states)
+        self.assertTrue(info.filter_state_change('sensor.new'))
+        self.assertFalse(info.filter_state_change('light.new'))
+
+        info = template.Template(
+            "{{ states | count }}", self.hass).async_render_to_info()
+        self.assertTrue(info.all_states)
+        self.assertTrue(info.filter_state_change('light.new'))
+
+    def test_render_to_info_error(self):
+        """Test entities read before an error are recorded."""
+        info = template.Template(
+            "{{ states.sensor.missing.state.lower() }}",
+            self.hass).async_render_to_info()
+
+        self.assertIsInstance(info.exception, TemplateError)
+        self.assertEqual(info.entities, {'sensor.missing'})
+
     def test_float(self):
         """Test float."""
         self.hass.states.set('sensor.temperature', '12')
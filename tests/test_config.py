@@ -409,6 +409,31 @@ class TestConfig(unittest.TestCase):
         assert len(self.hass.config.whitelist_external_dirs) == 2
         assert '/tmp' in self.hass.config.whitelist_external_dirs
 
+    def test_loading_executor_pools(self):
+        """Test loading the executor pools of integrations."""
+        run_coroutine_threadsafe(
+            config_util.async_process_ha_core_config(self.hass, {
+                'executor_pools': {
+                    'cloud': {
+                        'max_workers': 2,
+                        'integrations': ['sensor.darksky', 'weather'],
+                    },
+                    'camera': {
+                        'integrations': 'camera',
+                    },
+                },
+            }), self.hass.loop).result()
+
+        assert self.hass.config.executor_pool_workers == {
+            'cloud': 2,
+            'camera': 5,
+        }
+        assert self.hass.config.executor_pool('sensor', 'darksky') == 'cloud'
+        assert self.hass.config.executor_pool('sensor', 'yr') is None
+        assert self.hass.config.executor_pool('weather', 'darksky') == 'cloud'
+        assert self.hass.config.executor_pool('camera', 'mjpeg') == 'camera'
+        assert self.hass.config.executor_pool('camera') == 'camera'
+
     def test_loading_configuration_temperature_unit(self):
         """Test backward compatibility when loading core config."""
         self.hass.config = mock.Mock()
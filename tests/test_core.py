@@ -1,10 +1,13 @@
 """Test to verify that Home Assistant core works."""
 # pylint: disable=protected-access
 import asyncio
+import functools
+import json
 import logging
 import os
+import threading
 import unittest
-from unittest.mock import patch, MagicMock, sentinel
+from unittest.mock import patch, MagicMock, call, sentinel
 from datetime import datetime, timedelta
 from tempfile import TemporaryDirectory
 
@@ -32,9 +35,17 @@ def test_split_entity_id():
     assert ha.split_entity_id('domain.object_id') == ['domain', 'object_id']
 
 
+def _mock_hass():
+    """Return a mock hass that schedules jobs on a mock loop."""
+    hass = MagicMock()
+    hass.async_add_hass_job = functools.partial(
+        ha.HomeAssistant.async_add_hass_job, hass)
+    return hass
+
+
 def test_async_add_job_schedule_callback():
     """Test that we schedule coroutines and add jobs to the job pool."""
-    hass = MagicMock()
+    hass = _mock_hass()
     job = MagicMock()
 
     ha.HomeAssistant.async_add_job(hass, ha.callback(job))
@@ -46,7 +57,7 @@ def test_async_add_job_schedule_callback():
 @patch('asyncio.iscoroutinefunction', return_value=True)
 def test_async_add_job_schedule_coroutinefunction(mock_iscoro):
     """Test that we schedule coroutines and add jobs to the job pool."""
-    hass = MagicMock()
+    hass = _mock_hass()
     job = MagicMock()
 
     ha.HomeAssistant.async_add_job(hass, job)
@@ -58,7 +69,7 @@ def test_async_add_job_schedule_coroutinefunction(mock_iscoro):
 @patch('asyncio.iscoroutinefunction', return_value=False)
 def test_async_add_job_add_threaded_job_to_pool(mock_iscoro):
     """Test that we schedule coroutines and add jobs to the job pool."""
-    hass = MagicMock()
+    hass = _mock_hass()
     job = MagicMock()
 
     ha.HomeAssistant.async_add_job(hass, job)
@@ -93,6 +104,88 @@ def test_async_run_job_delegates_non_async():
     assert len(hass.async_add_job.mock_calls) == 1
 
 
+def test_hassjob_classifies_target():
+    """Test the job type is determined when the job is created."""
+    @ha.callback
+    def callback_job():
+        pass
+
+    @asyncio.coroutine
+    def coro_job():
+        pass
+
+    def executor_job():
+        pass
+
+    assert ha.HassJob(callback_job).job_type is ha.HassJobType.Callback
+    assert ha.HassJob(coro_job).job_type is \
+        ha.HassJobType.Coroutinefunction
+    assert ha.HassJob(executor_job).job_type is ha.HassJobType.Executor
+
+
+def test_hassjob_forbid_coroutine():
+    """Test a coroutine object can not be wrapped in a job."""
+    @asyncio.coroutine
+    def bla():
+        pass
+
+    coro = bla()
+
+    with pytest.raises(ValueError):
+        ha.HassJob(coro)
+
+    # To avoid warning about unawaited coro
+    coro.close()
+
+
+def test_async_add_hass_job_does_not_inspect_target():
+    """Test a job is scheduled by its job type only."""
+    hass = MagicMock()
+    job = ha.HassJob(MagicMock())
+
+    with patch('asyncio.iscoroutinefunction') as mock_iscoro, \
+            patch('homeassistant.core.is_callback') as mock_is_callback:
+        job.job_type = ha.HassJobType.Callback
+        ha.HomeAssistant.async_add_hass_job(hass, job, 1)
+        job.job_type = ha.HassJobType.Coroutinefunction
+        ha.HomeAssistant.async_add_hass_job(hass, job, 2)
+        job.job_type = ha.HassJobType.Executor
+        ha.HomeAssistant.async_add_hass_job(hass, job, 3)
+
+    assert not mock_iscoro.called
+    assert not mock_is_callback.called
+    assert hass.loop.call_soon.mock_calls == [call(job.target, 1)]
+    assert hass.loop.create_task.mock_calls == [call(job.target.return_value)]
+    assert hass.loop.run_in_executor.mock_calls == [
+        call(None, job.target, 3)]
+
+
+def test_async_run_hass_job_calls_callback():
+    """Test a callback job is run right away."""
+    hass = MagicMock()
+    calls = []
+
+    def job():
+        calls.append(1)
+
+    ha.HomeAssistant.async_run_hass_job(hass, ha.HassJob(ha.callback(job)))
+    assert len(calls) == 1
+    assert len(hass.async_add_hass_job.mock_calls) == 0
+
+
+def test_async_run_hass_job_delegates_non_async():
+    """Test a non callback job is scheduled."""
+    hass = MagicMock()
+    calls = []
+
+    def job():
+        calls.append(1)
+
+    ha.HomeAssistant.async_run_hass_job(hass, ha.HassJob(job))
+    assert len(calls) == 0
+    assert len(hass.async_add_hass_job.mock_calls) == 1
+
+
 def test_stage_shutdown():
     """Simulate a shutdown, test calling stuff."""
     hass = get_test_home_assistant()
@@ -268,6 +361,35 @@ class TestEvent(unittest.TestCase):
         }
         self.assertEqual(expected, event.as_dict())
 
+    def test_as_json(self):
+        """Test the JSON representation is computed once."""
+        now = dt_util.utcnow()
+        state = ha.State('light.bowl', 'on', {'brightness': 100})
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'light.bowl',
+            'old_state': None,
+            'new_state': state,
+        }, ha.EventOrigin.local, now)
+
+        expected = {
+            'event_type': EVENT_STATE_CHANGED,
+            'data': {
+                'entity_id': 'light.bowl',
+                'old_state': None,
+                'new_state': json.loads(state.as_json()),
+            },
+            'origin': 'LOCAL',
+            'time_fired': now.isoformat(),
+        }
+        self.assertEqual(expected, json.loads(event.as_json()))
+        self.assertIs(event.as_json(), event.as_json())
+        self.assertIs(event.data_json(), event.data_json())
+
+    def test_data_json_non_string_keys(self):
+        """Test data with non string keys falls back to the encoder."""
+        event = ha.Event('some_type', {1: 'one'})
+        self.assertEqual({'1': 'one'}, json.loads(event.data_json()))
+
 
 class TestEventBus(unittest.TestCase):
     """Test EventBus methods."""
@@ -453,6 +575,13 @@ class TestState(unittest.TestCase):
         state = ha.State('domain.hello', 'world', {'some': 'attr'})
         self.assertEqual(state, ha.State.from_dict(state.as_dict()))
 
+    def test_as_json(self):
+        """Test the JSON representation is computed once."""
+        state = ha.State('domain.hello', 'world', {'some': 'attr'})
+        self.assertEqual(
+            state, ha.State.from_dict(json.loads(state.as_json())))
+        self.assertIs(state.as_json(), state.as_json())
+
     def test_dict_conversion_with_wrong_data(self):
         """Test conversion with wrong data."""
         self.assertIsNone(ha.State.from_dict(None))
@@ -511,6 +640,51 @@ class TestStateMachine(unittest.TestCase):
         states = sorted(state.entity_id for state in self.states.all())
         self.assertEqual(['light.bowl', 'switch.ac'], states)
 
+    def test_domain_index(self):
+        """Test states are indexed by domain."""
+        self.states.set('light.Attic', 'off')
+        self.states.set('light.Bowl', 'off')
+
+        self.assertEqual(
+            ['light.attic', 'light.bowl'],
+            sorted(state.entity_id for state in
+                   self.hass.states.async_all('Light')))
+        self.assertEqual('off', self.states.get('light.bowl').state)
+
+        self.states.remove('light.bowl')
+        self.states.remove('light.attic')
+        self.assertEqual([], self.states.entity_ids('light'))
+        self.assertEqual([], self.hass.states.async_all('light'))
+
+    def test_sorted(self):
+        """Test sorted entity ids are cached until entities change."""
+        self.assertEqual(
+            ('light.bowl', 'switch.ac'),
+            self.hass.states.async_sorted_entity_ids())
+
+        self.states.set('light.Attic', 'on')
+        self.assertEqual(
+            ('light.attic', 'light.bowl'),
+            self.hass.states.async_sorted_entity_ids('light'))
+        self.assertIs(
+            self.hass.states.async_sorted_entity_ids('light'),
+            self.hass.states.async_sorted_entity_ids('light'))
+
+        self.states.set('light.Attic', 'off')
+        self.assertEqual(
+            ['off', 'on'],
+            [state.state for state
+             in self.hass.states.async_all_sorted('light')])
+        self.assertEqual(
+            ['light.attic', 'light.bowl', 'switch.ac'],
+            [state.entity_id for state
+             in self.hass.states.async_all_sorted()])
+
+        self.states.remove('light.attic')
+        self.assertEqual(
+            ('light.bowl',),
+            self.hass.states.async_sorted_entity_ids('light'))
+
     def test_remove(self):
         """Test remove method."""
         events = []
@@ -567,6 +741,24 @@ class TestStateMachine(unittest.TestCase):
         assert state2 is not None
         assert state.last_changed == state2.last_changed
 
+    def test_attributes_shared_on_same_attributes(self):
+        """Test unchanged attributes are shared with the previous state."""
+        self.states.set('light.bowl', 'on', {'brightness': 100})
+        state = self.states.get('light.bowl')
+
+        self.states.set('light.bowl', 'off', {'brightness': 100})
+        state2 = self.states.get('light.bowl')
+        assert state2.state == 'off'
+        assert state2.attributes is state.attributes
+
+        self.states.set('light.bowl', 'on', state2.attributes)
+        assert self.states.get('light.bowl').attributes is state.attributes
+
+        self.states.set('light.bowl', 'on', {'brightness': 50})
+        state3 = self.states.get('light.bowl')
+        assert state3.attributes is not state.attributes
+        assert state3.attributes == {'brightness': 50}
+
     def test_force_update(self):
         """Test force update option."""
         events = []
@@ -953,3 +1145,27 @@ def test_track_task_functions(loop):
         assert hass._track_task
     finally:
         yield from hass.async_stop()
+
+
+@asyncio.coroutine
+def test_async_add_executor_job_pools(loop):
+    """Test executor jobs run in the default or a named pool."""
+    hass = ha.HomeAssistant(loop=loop)
+    hass.config.executor_pool_workers['slow'] = 2
+
+    try:
+        default_thread = yield from hass.async_add_executor_job(
+            lambda: threading.current_thread().name)
+        slow_thread = yield from hass.async_add_executor_job(
+            lambda: threading.current_thread().name, pool='slow')
+
+        assert default_thread.startswith('SyncWorker')
+        assert slow_thread.startswith('slow')
+        assert hass.async_get_executor_pool('slow').max_workers == 2
+
+        stats = hass.async_executor_stats()
+        assert stats['default']['jobs'] == 1
+        assert stats['slow']['jobs'] == 1
+        assert stats['slow']['queued'] == 0
+    finally:
+        yield from hass.async_stop()
@@ -1,6 +1,8 @@
 """Test Home Assistant remote methods and classes."""
 # pylint: disable=protected-access
+import json
 import unittest
+from unittest.mock import patch
 
 from homeassistant import remote, setup, core as ha
 import homeassistant.components.http as http
@@ -203,3 +205,12 @@ class TestRemoteMethods(unittest.TestCase):
 
         now = dt_util.utcnow()
         self.assertEqual(now.isoformat(), ha_json_enc.default(now))
+
+    def test_json_dumps(self):
+        """Test dumping JSON without the optional encoder."""
+        now = dt_util.utcnow()
+
+        with patch('homeassistant.remote.orjson', None):
+            self.assertEqual(
+                {'time': now.isoformat(), 'set': [1]},
+                json.loads(remote.json_dumps({'time': now, 'set': {1}})))
@@ -0,0 +1,82 @@
+"""Test the startup profiler."""
+import asyncio
+from unittest.mock import patch
+
+from homeassistant import loader, setup, startup_profiler
+
+from tests.common import MockModule
+
+
+@asyncio.coroutine
+def test_no_profiler(hass):
+    """Test nothing is recorded when profiling is not enabled."""
+    loader.set_component('comp', MockModule('comp'))
+    assert (yield from setup.async_setup_component(hass, 'comp', {}))
+    assert startup_profiler.DATA_STARTUP_PROFILER not in hass.data
+
+
+@asyncio.coroutine
+def test_records_setup_phases(hass):
+    """Test the setup phases and blocking time of components are recorded."""
+    @asyncio.coroutine
+    def async_setup(hass, config):
+        """Wait for the setup to finish."""
+        yield from asyncio.sleep(0.05, loop=hass.loop)
+        return True
+
+    loader.set_component('dep', MockModule('dep'))
+    loader.set_component('comp', MockModule(
+        'comp', dependencies=['dep'], async_setup=async_setup))
+
+    startup_profiler.async_enable(hass)
+    assert (yield from setup.async_setup_component(hass, 'comp', {}))
+
+    profiler = hass.data[startup_profiler.DATA_STARTUP_PROFILER]
+    record = profiler.records['comp']
+    assert record.dependencies == ['dep']
+    assert set(record.phases) >= {
+        'import', 'config', 'dependencies', 'setup'}
+    assert record.phases['setup'] >= 0.05
+    assert record.blocking < record.phases['setup']
+    assert 'dep' in profiler.records
+
+    assert profiler.critical_path() == ['dep', 'comp']
+
+
+@asyncio.coroutine
+def test_timed_setup_forwards_errors(hass):
+    """Test errors raised by the setup coroutine are propagated."""
+    @asyncio.coroutine
+    def async_setup():
+        """Fail after waiting."""
+        yield from asyncio.sleep(0, loop=hass.loop)
+        raise ValueError
+
+    startup_profiler.async_enable(hass)
+    try:
+        yield from startup_profiler.async_timed_setup(
+            hass, 'comp', async_setup())
+    except ValueError:
+        pass
+    else:
+        assert False, 'ValueError not raised'
+
+    profiler = hass.data[startup_profiler.DATA_STARTUP_PROFILER]
+    assert 'setup' in profiler.records['comp'].phases
+
+
+@asyncio.coroutine
+def test_save_report(hass):
+    """Test the report is saved to the config directory."""
+    startup_profiler.async_enable(hass)
+    with startup_profiler.timed(hass, 'comp', startup_profiler.PHASE_SETUP):
+        pass
+
+    with patch('homeassistant.startup_profiler.save_json') as mock_save:
+        yield from startup_profiler.async_save_report(hass)
+
+    path, report = mock_save.mock_calls[0][1]
+    assert path == hass.config.path(startup_profiler.STARTUP_PROFILE_FILE)
+    assert report['critical_path'] == ['comp']
+    assert list(report['setups']) == ['comp']
+    assert startup_profiler.DATA_STARTUP_PROFILER not in hass.data
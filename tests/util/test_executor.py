@@ -0,0 +1,92 @@
+"""Test the executor pool."""
+import threading
+
+import pytest
+
+from homeassistant.util.executor import ExecutorPool
+
+
+def test_pool_grows_while_jobs_queued():
+    """Test a worker is added for jobs that wait, up to the maximum."""
+    pool = ExecutorPool('test', 2)
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        """Block a worker until released."""
+        started.set()
+        release.wait(5)
+
+    try:
+        futures = [pool.submit(block)]
+        assert started.wait(5)
+        assert pool.stats()['workers'] == 1
+
+        # The only worker is busy
+        futures.append(pool.submit(block))
+        assert pool.stats()['workers'] == 2
+
+        # Never more than the maximum
+        futures.append(pool.submit(block))
+        futures.append(pool.submit(block))
+        futures.append(pool.submit(block))
+        assert pool.stats()['workers'] == 2
+        assert pool.stats()['queued'] >= 3
+
+        release.set()
+        for future in futures:
+            future.result(5)
+
+        stats = pool.stats()
+    finally:
+        release.set()
+        pool.shutdown()
+
+    assert stats['jobs'] == 5
+    assert stats['queued'] == 0
+    assert stats['max_workers'] == 2
+    assert stats['max_wait'] > 0
+    assert stats['total_wait'] >= stats['max_wait']
+
+
+def test_job_results_and_exceptions():
+    """Test results and exceptions of jobs are passed on."""
+    pool = ExecutorPool('test', 1)
+
+    def fail():
+        """Raise an error."""
+        raise ValueError('fail')
+
+    try:
+        assert pool.submit(lambda x, y: x + y, 1, y=2).result(5) == 3
+        assert isinstance(pool.submit(fail).exception(5), ValueError)
+    finally:
+        pool.shutdown()
+
+
+def test_idle_worker_reused():
+    """Test no worker is added while one is free."""
+    pool = ExecutorPool('test', 5)
+
+    try:
+        for _ in range(3):
+            pool.submit(lambda: None).result(5)
+
+        assert pool.stats()['workers'] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_shutdown_runs_submitted_jobs():
+    """Test jobs submitted before shutdown still run."""
+    pool = ExecutorPool('test', 1)
+    release = threading.Event()
+    futures = [pool.submit(release.wait, 5), pool.submit(lambda: 1)]
+
+    release.set()
+    pool.shutdown()
+
+    assert futures[1].result(0) == 1
+
+    with pytest.raises(RuntimeError):
+        pool.submit(lambda: None)